@@ -1,117 +1,116 @@
 """Main executable routine."""
 import argparse
-import io
+import contextlib
+import functools
 import readline  # pylint: disable=unused-import
 import sys
+from collections.abc import Callable, Iterator
 from typing import Optional
 
+from dict import timing
+from dict.cli import (
+    apply_timeout,
+    get_root_parser,
+    open_results_output,
+    parse_args,
+    print_lookup,
+)
 from dict.colors import COLOR_ERROR, COLOR_PROMPT, COLOR_RESET
-from dict.engines import BaseEngine
-from dict.pager import pager
-
-
-class CustomHelpFormatter(argparse.HelpFormatter):
-    """An argparse help formatter which prints the values of choice options
-    only once.
-    """
-
-    def _format_action_invocation(self, action: argparse.Action) -> str:
-        if not action.option_strings or action.nargs == 0:
-            return super()._format_action_invocation(action)
-        default = self._get_default_metavar_for_optional(action)
-        args_string = self._format_args(action, default)
-        return ", ".join(action.option_strings) + " " + args_string
-
-
-def parse_args(args: list[str]) -> argparse.Namespace:
-    """Parse command line arguments.
-
-    :return: parsed command line arguments
-    """
-    root_parser = argparse.ArgumentParser(
-        prog="dict",
-        description="Looks up phrases in a chosen dictionary.",
-        formatter_class=CustomHelpFormatter,
-        add_help=False,
-    )
-    root_parser.add_argument(
-        "-e",
-        "--engine",
-        choices=sum([cls.names for cls in BaseEngine.__subclasses__()], []),
-        help="engine to use",
-    )
-    root_parser.add_argument(
-        "-N",
-        "--no-pager",
-        action="store_false",
-        dest="use_pager",
-        help="disable pager in interactive mode",
-    )
-    root_parser.add_argument("phrase", nargs="?")
-
-    # first round: parse common options, do not interpret --help
-    ret, remaining_args = root_parser.parse_known_args(args)
-
-    # try to get the engine
-    engine: Optional[BaseEngine] = None
-    for cls in BaseEngine.__subclasses__():
-        if ret.engine in cls.names:
-            engine = cls()
-            break
-
-    # construct a child parser, add engine-specific options if applicable
-    main_parser = argparse.ArgumentParser(
-        prog=root_parser.prog,
-        description=root_parser.description,
-        formatter_class=root_parser.formatter_class,
-        parents=[root_parser],
-    )
-    if engine:
-        engine.decorate_arg_parser(main_parser)
-
-    # second round: parse everything, including --help, which raises SystemExit
-    ret = main_parser.parse_args(args + remaining_args)
-
-    # if --help was given, interpreting it raised SystemExit above, so at this
-    # point --engine is required to carry out with the normal program operation
-    if not ret.engine:
-        main_parser.error("the following arguments are required: -e/--engine")
-
-    ret.engine = engine
-    return ret
+
+__all__ = ["main", "parse_args"]
+
+
+@contextlib.contextmanager
+def _record_timings(options: argparse.Namespace) -> Iterator[None]:
+    if not options.timings and not options.trace:
+        yield
+        return
+    with timing.Timings() as timings:
+        try:
+            yield
+        finally:
+            if options.timings:
+                print(timings.format_summary(), file=sys.stderr)
+            if options.trace:
+                timings.write_chrome_trace(options.trace)
 
 
 def main(args: list[str]) -> None:
     """Main script routine."""
-    parsed_args = parse_args(args)
-
-    def work(phrase: str) -> None:
-        """Look up the phrase and display it in the console."""
-        results = list(parsed_args.engine.lookup_phrase(parsed_args, phrase))
-
-        with io.StringIO() as file:
-            if results:
-                parsed_args.engine.print_results(results=results, file=file)
-            else:
-                print(COLOR_ERROR + "no results" + COLOR_RESET, file=file)
-
-            if parsed_args.use_pager:
-                pager(file.getvalue().rstrip() + "\n")
-            else:
-                print(file.getvalue().rstrip())
-
-    if parsed_args.phrase is not None:
-        # one-shot
-        work(parsed_args.phrase)
+    options, _remaining_args = get_root_parser().parse_known_args(args)
+    with _record_timings(options):
+        _run(args, options)
+
+
+def _run(args: list[str], options: argparse.Namespace) -> None:
+    # pylint: disable=import-outside-toplevel
+    if options.daemon:
+        from dict.daemon import DaemonError, serve
+
+        try:
+            serve(options.socket, timeout=options.timeout)
+        except DaemonError as ex:
+            print(COLOR_ERROR + str(ex) + COLOR_RESET, file=sys.stderr)
+            sys.exit(1)
+        return
+
+    # the phrase given on the command line is passed as None, as it might
+    # be known only after parsing the engine-specific options
+    work: Callable[[Optional[str]], int]
+    if options.client:
+        from dict.daemon import Client, DaemonError
+
+        client = Client(options.socket)
+        prompt = options.engine
+        one_shot = options.phrase is not None
+
+        def work(phrase: Optional[str]) -> int:
+            """Pass the lookup to the daemon and display the reply."""
+            try:
+                return client.lookup(
+                    args,
+                    phrase,
+                    functools.partial(open_results_output, options),
+                )
+            except DaemonError as ex:
+                print(COLOR_ERROR + str(ex) + COLOR_RESET, file=sys.stderr)
+                return 1
+
+    else:
+        with timing.span("parse arguments"):
+            parsed_args = parse_args(args)
+        apply_timeout(options.timeout)
+        prompt = parsed_args.engine.primary_name
+        one_shot = parsed_args.phrase is not None
+
+        def work(phrase: Optional[str]) -> int:
+            """Look up the phrase and display it in the console."""
+            print_lookup(
+                parsed_args,
+                parsed_args.phrase if phrase is None else phrase,
+                functools.partial(open_results_output, parsed_args),
+            )
+            return 0
+
+        if parsed_args.live:
+            from dict import live
+
+            if not live.is_supported(parsed_args.engine):
+                get_root_parser().error("--live requires an offline engine")
+            phrase = live.run_live(parsed_args)
+            if phrase:
+                work(phrase)
+            return
+
+    if one_shot:
+        status = work(None)
+        if status:
+            sys.exit(status)
     else:
         # interactive prompt
         while True:
             try:
-                phrase = input(
-                    f"{COLOR_PROMPT}"
-                    f"{parsed_args.engine.primary_name}>"
-                    f"{COLOR_RESET} "
-                )
+                phrase = input(f"{COLOR_PROMPT}{prompt}>{COLOR_RESET} ")
             except (EOFError, KeyboardInterrupt):
                 break
 
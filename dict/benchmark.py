@@ -0,0 +1,569 @@
+"""Benchmarking the lookup, parsing, index building and rendering paths.
+
+The offline engines are run against synthetic dictionaries of configurable
+sizes, generated in a temporary directory, so that nothing is downloaded:
+
+    python -m dict.benchmark -n 10000 100000 -o after.json -c before.json
+
+Each benchmark reports the latency percentiles in milliseconds and, where it
+matters, the peak memory allocated by Python code, as traced by tracemalloc.
+The results can be saved as JSON and compared against a previous run.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from dict.engines.edict2 import Edict2Engine, parse_edict2_line
+from dict.engines.jmdict import (
+    JMDictEngine,
+    build_entries_from_xml,
+    entry_to_line,
+)
+from dict.layout import print_in_columns
+from dict.synthetic import (
+    GeneratorConfig,
+    SyntheticEntry,
+    generate_entries,
+    write_edict2,
+    write_jmdict_xml,
+)
+
+DEFAULT_ENTRIES = [1000, 10000]
+DEFAULT_REPEAT = 20
+DEFAULT_QUERIES = 10
+DEFAULT_SEED = 0
+# the bulk lookup looks up the headword of every this many entries
+BULK_STEP = 20
+
+
+@dataclass
+class Corpus:
+    """Synthetic dictionaries to run the benchmarks against."""
+
+    entries: int
+    edict2_path: Path
+    jmdict_xml_path: Path
+    jmdict_index_path: Path
+    queries: list[str]
+
+
+class _Edict2Engine(Edict2Engine):
+    names = NotImplemented  # do not replace the real engine in the registry
+
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self.path = path
+
+    def get_dictionary_path(self) -> Path:
+        return self.path
+
+
+class _JMDictEngine(JMDictEngine):
+    names = NotImplemented  # do not replace the real engine in the registry
+
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self.path = path
+
+    def get_dictionary_path(self) -> Path:
+        return self.path
+
+
+def create_corpus(
+    directory: Path,
+    entries: int,
+    queries: int = DEFAULT_QUERIES,
+    seed: int = DEFAULT_SEED,
+) -> Corpus:
+    """Generate the synthetic dictionaries.
+
+    :param directory: directory to create the dictionary files in
+    :param entries: number of entries in each dictionary
+    :param queries: number of phrases to look up
+    :param seed: seed of the random generator, for reproducible runs
+    :return: the corpus
+    """
+    config = GeneratorConfig(entries=entries, seed=seed)
+    corpus = Corpus(
+        entries=entries,
+        edict2_path=directory / f"edict2-{entries}.txt",
+        jmdict_xml_path=directory / f"jmdict-{entries}.xml",
+        jmdict_index_path=directory / f"jmdict-{entries}.jsonl",
+        queries=[],
+    )
+
+    # the same entries are generated for both dictionaries
+    with corpus.edict2_path.open("w", encoding="utf-8") as handle:
+        write_edict2(
+            handle,
+            _pick_queries(
+                generate_entries(config),
+                corpus.queries,
+                step=max(1, entries // max(1, queries)),
+                limit=queries,
+            ),
+        )
+    with corpus.jmdict_xml_path.open("w", encoding="utf-8") as handle:
+        write_jmdict_xml(handle, generate_entries(config))
+
+    with corpus.jmdict_index_path.open(
+        "w", encoding="utf-8"
+    ) as handle, _quiet():
+        for entry in build_entries_from_xml(corpus.jmdict_xml_path):
+            print(entry_to_line(entry), file=handle)
+
+    return corpus
+
+
+def _pick_queries(
+    entries: Iterable[SyntheticEntry],
+    queries: list[str],
+    step: int,
+    limit: int,
+) -> Iterator[SyntheticEntry]:
+    # alternates between a spelling, a reading and a word of a gloss
+    for i, entry in enumerate(entries):
+        if i % step == 0 and len(queries) < limit:
+            words = [
+                *entry.kanji[:1],
+                entry.readings[0],
+                entry.senses[0].glosses["eng"][0].split()[-1],
+            ]
+            queries.append(words[len(queries) % len(words)])
+        yield entry
+
+
+@contextlib.contextmanager
+def _quiet() -> Iterator[None]:
+    # silences the progress bars
+    with contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def summarize(durations: list[float]) -> dict[str, float]:
+    """Compute the statistics of the measured durations.
+
+    :param durations: durations in seconds
+    :return: statistics in milliseconds
+    """
+    if len(durations) > 1:
+        percentiles = statistics.quantiles(
+            durations, n=100, method="inclusive"
+        )
+        p50, p90, p99 = percentiles[49], percentiles[89], percentiles[98]
+    else:
+        p50 = p90 = p99 = durations[0]
+    return {
+        "count": len(durations),
+        "mean_ms": statistics.mean(durations) * 1e3,
+        "min_ms": min(durations) * 1e3,
+        "p50_ms": p50 * 1e3,
+        "p90_ms": p90 * 1e3,
+        "p99_ms": p99 * 1e3,
+        "max_ms": max(durations) * 1e3,
+    }
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> tuple[list[float], int]:
+    durations: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    # the peak memory is measured separately, since tracing slows the code
+    # down considerably
+    tracemalloc.start()
+    try:
+        func()
+        _size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return durations, peak
+
+
+def _report(
+    durations: list[float], peak: Optional[int] = None, **extra: Any
+) -> dict[str, Any]:
+    ret: dict[str, Any] = summarize(durations)
+    if peak is not None:
+        ret["peak_memory_kib"] = peak / 1024
+    ret.update(extra)
+    return ret
+
+
+def benchmark_parse(corpus: Corpus, repeat: int) -> dict[str, Any]:
+    """Measure the edict2 line parsing throughput.
+
+    :param corpus: dictionaries to use
+    :param repeat: number of measurements
+    :return: statistics of parsing the whole dictionary
+    """
+    lines = corpus.edict2_path.read_text(encoding="utf-8").splitlines()
+    durations, peak = _measure(
+        lambda: [parse_edict2_line(line) for line in lines], repeat
+    )
+    return _report(
+        durations,
+        peak,
+        lines_per_s=len(lines) / statistics.median(durations),
+    )
+
+
+def benchmark_build(corpus: Corpus, repeat: int) -> dict[str, Any]:
+    """Measure building the JMdict index from the XML file.
+
+    The memory taken by the XML tree itself is allocated by libxml2 and is
+    not included in the peak memory.
+
+    :param corpus: dictionaries to use
+    :param repeat: number of measurements
+    :return: statistics of converting the whole dictionary
+    """
+
+    def build() -> None:
+        with _quiet():
+            for entry in build_entries_from_xml(corpus.jmdict_xml_path):
+                entry_to_line(entry)
+
+    durations, peak = _measure(build, max(1, repeat // 10))
+    return _report(
+        durations,
+        peak,
+        entries_per_s=corpus.entries / statistics.median(durations),
+    )
+
+
+def _benchmark_lookup(
+    engine_factory: Callable[[], Any], corpus: Corpus, repeat: int
+) -> dict[str, Any]:
+    args = argparse.Namespace()
+    engine_factory().lookup_phrase(args, "warm up")  # loads the dictionary
+
+    durations: list[float] = []
+    results = 0
+    for _ in range(repeat):
+        for query in corpus.queries:
+            # a new engine does not reuse the candidates of the last query
+            engine = engine_factory()
+            start = time.perf_counter()
+            results += len(list(engine.lookup_phrase(args, query)))
+            durations.append(time.perf_counter() - start)
+    return _report(durations, results_per_query=results / len(durations))
+
+
+def benchmark_edict2_lookup(corpus: Corpus, repeat: int) -> dict[str, Any]:
+    """Measure the per-query latency of the Edict2 engine.
+
+    :param corpus: dictionaries to use
+    :param repeat: number of times to look up each query
+    :return: statistics of single lookups
+    """
+    return _benchmark_lookup(
+        lambda: _Edict2Engine(corpus.edict2_path), corpus, repeat
+    )
+
+
+def benchmark_jmdict_lookup(corpus: Corpus, repeat: int) -> dict[str, Any]:
+    """Measure the per-query latency of the JMdict engine.
+
+    :param corpus: dictionaries to use
+    :param repeat: number of times to look up each query
+    :return: statistics of single lookups
+    """
+    return _benchmark_lookup(
+        lambda: _JMDictEngine(corpus.jmdict_index_path), corpus, repeat
+    )
+
+
+def benchmark_bulk_lookup(corpus: Corpus, repeat: int) -> dict[str, Any]:
+    """Measure looking up many headwords at once with the Edict2 engine.
+
+    :param corpus: dictionaries to use
+    :param repeat: number of measurements
+    :return: statistics of looking up all the headwords together
+    """
+    with corpus.edict2_path.open(encoding="utf-8") as handle:
+        # the first spelling, without the markers such as (P)
+        phrases = [
+            re.split("[ ;(]", line, maxsplit=1)[0]
+            for line in itertools.islice(handle, 0, None, BULK_STEP)
+        ]
+    args = argparse.Namespace()
+    _Edict2Engine(corpus.edict2_path).lookup_phrase(args, "warm up")
+
+    durations, peak = _measure(
+        lambda: _Edict2Engine(corpus.edict2_path).lookup_many(args, phrases),
+        max(1, repeat // 10),
+    )
+    return _report(
+        durations,
+        peak,
+        phrases=len(phrases),
+        phrases_per_s=len(phrases) / statistics.median(durations),
+    )
+
+
+def benchmark_render(corpus: Corpus, repeat: int) -> dict[str, Any]:
+    """Measure printing the results of both offline engines.
+
+    :param corpus: dictionaries to use
+    :param repeat: number of measurements
+    :return: statistics of printing the results of all the queries
+    """
+    args = argparse.Namespace()
+    edict2_engine = _Edict2Engine(corpus.edict2_path)
+    jmdict_engine = _JMDictEngine(corpus.jmdict_index_path)
+    edict2_results = [
+        result
+        for query in corpus.queries
+        for result in edict2_engine.lookup_phrase(args, query)
+    ]
+    jmdict_results = [
+        result
+        for query in corpus.queries
+        for result in jmdict_engine.lookup_phrase(args, query)
+    ]
+
+    def render() -> None:
+        file = io.StringIO()
+        edict2_engine.print_results(edict2_results, file)
+        jmdict_engine.print_results(jmdict_results, file)
+
+    durations, peak = _measure(render, repeat)
+    return _report(
+        durations, peak, results=len(edict2_results) + len(jmdict_results)
+    )
+
+
+def benchmark_columns(corpus: Corpus, repeat: int) -> dict[str, Any]:
+    """Measure laying out the words in columns, as the thesaurus engines do.
+
+    :param corpus: dictionaries to use
+    :param repeat: number of measurements
+    :return: statistics of printing one word per dictionary entry
+    """
+    items = [
+        entry.readings[0]
+        for entry in generate_entries(GeneratorConfig(corpus.entries))
+    ]
+    durations, peak = _measure(
+        lambda: print_in_columns(items, file=io.StringIO()), repeat
+    )
+    return _report(durations, peak, items=len(items))
+
+
+def benchmark_import(repeat: int) -> dict[str, Any]:
+    """Measure the time of importing the command line program in a fresh
+    interpreter.
+
+    :param repeat: number of measurements
+    :return: statistics of the cumulative import time
+    """
+    durations: list[float] = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import dict.__main__"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+        # import time: self [us] | cumulative | imported package
+        for line in output.splitlines():
+            _self_us, cumulative_us, name = line.split("|")
+            if name.strip() == "dict.__main__":
+                durations.append(int(cumulative_us) / 1e6)
+    return _report(durations)
+
+
+BENCHMARKS: dict[str, Callable[[Corpus, int], dict[str, Any]]] = {
+    "parse": benchmark_parse,
+    "build": benchmark_build,
+    "edict2": benchmark_edict2_lookup,
+    "jmdict": benchmark_jmdict_lookup,
+    "bulk": benchmark_bulk_lookup,
+    "render": benchmark_render,
+    "columns": benchmark_columns,
+}
+IMPORT_BENCHMARK = "import"
+
+
+def run(
+    entries: list[int],
+    benchmarks: list[str],
+    repeat: int = DEFAULT_REPEAT,
+    queries: int = DEFAULT_QUERIES,
+    seed: int = DEFAULT_SEED,
+) -> dict[str, Any]:
+    """Run the benchmarks.
+
+    :param entries: dictionary sizes to run the benchmarks for
+    :param benchmarks: names of the benchmarks to run
+    :param repeat: number of measurements of each benchmark
+    :param queries: number of phrases to look up
+    :param seed: seed of the random generator
+    :return: JSON-serializable report
+    """
+    report: dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "seed": seed,
+        "results": {},
+    }
+    if IMPORT_BENCHMARK in benchmarks:
+        report["results"][IMPORT_BENCHMARK] = benchmark_import(repeat)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in entries:
+            corpus = create_corpus(
+                Path(temp_dir), size, queries=queries, seed=seed
+            )
+            for name, benchmark in BENCHMARKS.items():
+                if name in benchmarks:
+                    report["results"][f"{name}/{size}"] = benchmark(
+                        corpus, repeat
+                    )
+    return report
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """Compare the median times of two runs.
+
+    :param report: current run
+    :param baseline: previous run
+    :return: one line per benchmark present in both runs
+    """
+    lines = []
+    for name, stats in report["results"].items():
+        if name in baseline["results"]:
+            before = baseline["results"][name]["p50_ms"]
+            after = stats["p50_ms"]
+            lines.append(
+                f"{name:16} {before:10.2f} ms -> {after:10.2f} ms "
+                f"({after / before:.2f}x)"
+            )
+    return lines
+
+
+def format_report(report: dict[str, Any]) -> list[str]:
+    """Format the report as a human readable table.
+
+    :param report: report to format
+    :return: one line per benchmark
+    """
+    lines = [
+        f"{'benchmark':16} {'p50':>11} {'p90':>11} {'p99':>11} {'peak':>12}"
+    ]
+    for name, stats in report["results"].items():
+        peak = stats.get("peak_memory_kib")
+        lines.append(
+            f"{name:16} "
+            f"{stats['p50_ms']:8.2f} ms "
+            f"{stats['p90_ms']:8.2f} ms "
+            f"{stats['p99_ms']:8.2f} ms "
+            + (f"{peak:8.0f} KiB" if peak is not None else f"{'-':>12}")
+        )
+    return lines
+
+
+def parse_args(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    :return: parsed command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m dict.benchmark",
+        description=(
+            "Measures the offline engines against synthetic dictionaries, "
+            "the rendering and the start up time."
+        ),
+    )
+    parser.add_argument(
+        "-n",
+        "--entries",
+        type=int,
+        nargs="+",
+        default=DEFAULT_ENTRIES,
+        help="dictionary sizes to run the benchmarks for",
+    )
+    parser.add_argument(
+        "-b",
+        "--benchmark",
+        dest="benchmarks",
+        choices=[*BENCHMARKS, IMPORT_BENCHMARK],
+        nargs="+",
+        default=[*BENCHMARKS, IMPORT_BENCHMARK],
+        help="benchmarks to run",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="number of measurements of each benchmark",
+    )
+    parser.add_argument(
+        "-q",
+        "--queries",
+        type=int,
+        default=DEFAULT_QUERIES,
+        help="number of phrases to look up",
+    )
+    parser.add_argument(
+        "-s",
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help="seed of the dictionary generator",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="save the report as JSON"
+    )
+    parser.add_argument(
+        "-c",
+        "--compare",
+        type=Path,
+        help="compare against a report saved by a previous run",
+    )
+    return parser.parse_args(args)
+
+
+def main(args: list[str]) -> None:
+    """Run the benchmarks and print the report."""
+    parsed_args = parse_args(args)
+    report = run(
+        entries=parsed_args.entries,
+        benchmarks=parsed_args.benchmarks,
+        repeat=parsed_args.repeat,
+        queries=parsed_args.queries,
+        seed=parsed_args.seed,
+    )
+    for line in format_report(report):
+        print(line)
+    if parsed_args.compare:
+        print()
+        for line in compare(
+            report, json.loads(parsed_args.compare.read_text())
+        ):
+            print(line)
+    if parsed_args.output:
+        parsed_args.output.write_text(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,217 @@
+"""Lookup result caches."""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_NEGATIVE_CACHE_TTL = 300.0
+DEFAULT_NEGATIVE_CACHE_SIZE = 1024
+DEFAULT_RESULT_CACHE_TTL = 3600.0
+DEFAULT_RESULT_CACHE_SIZE = 10000
+
+
+class NegativeCache:
+    """Remembers the lookups that yielded no results for a limited time.
+
+    Once the cache is full, the least recently used keys are evicted first.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_NEGATIVE_CACHE_TTL,
+        maxsize: int = DEFAULT_NEGATIVE_CACHE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize self.
+
+        :param ttl: number of seconds to remember a miss for
+        :param maxsize: maximum number of remembered misses
+        :param clock: monotonic time source
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._expiry: OrderedDict[Hashable, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            expiry = self._expiry.get(key)
+            if expiry is None:
+                return False
+            if expiry <= self._clock():
+                del self._expiry[key]
+                return False
+            self._expiry.move_to_end(key)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def add(self, key: Hashable) -> None:
+        """Remember a miss.
+
+        :param key: key of the lookup that yielded no results
+        """
+        with self._lock:
+            self._expiry[key] = self._clock() + self.ttl
+            self._expiry.move_to_end(key)
+            while len(self._expiry) > self.maxsize:
+                self._expiry.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget all misses."""
+        with self._lock:
+            self._expiry.clear()
+
+
+class ResultCache:
+    """Remembers the results of the recent lookups in memory.
+
+    The size of the cache is the total number of the remembered results, so
+    that a few lookups yielding many results cannot take up the memory. Once
+    the cache is full, the results of the least recently used lookups are
+    evicted first.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = DEFAULT_RESULT_CACHE_TTL,
+        maxsize: int = DEFAULT_RESULT_CACHE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize self.
+
+        :param ttl: number of seconds to remember the results for, if empty,
+            for as long as they fit
+        :param maxsize: maximum number of remembered results
+        :param clock: monotonic time source
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.size = 0
+        self._clock = clock
+        self._entries: OrderedDict[
+            Hashable, tuple[Optional[float], list[Any]]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[list[Any]]:
+        """Return the remembered results of a lookup.
+
+        :param key: key of the lookup
+        :return: results, or None if they are not known
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiry, results = entry
+            if expiry is not None and expiry <= self._clock():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return results
+
+    def put(self, key: Hashable, results: list[Any]) -> None:
+        """Remember the results of a lookup.
+
+        :param key: key of the lookup
+        :param results: its results
+        """
+        if len(results) > self.maxsize:
+            return
+        expiry = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expiry, results)
+            self.size += len(results)
+            while self.size > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Forget all results."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+class DiskResultCache:
+    """Remembers the results of the lookups on disk, across the program runs.
+
+    Each lookup is pickled to a separate file named after the hash of its
+    key, so the keys must have a stable representation.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl: Optional[float] = DEFAULT_RESULT_CACHE_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize self.
+
+        :param directory: directory to keep the results in
+        :param ttl: number of seconds to remember the results for, if empty,
+            forever
+        :param clock: wall clock time source
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self._clock = clock
+
+    def _get_path(self, key: Hashable) -> Path:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self.directory / f"{digest}.pickle"
+
+    def get(self, key: Hashable) -> Optional[list[Any]]:
+        """Return the remembered results of a lookup.
+
+        :param key: key of the lookup
+        :return: results, or None if they are not known
+        """
+        try:
+            with self._get_path(key).open("rb") as handle:
+                stored_key, expiry, results = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None  # written by an incompatible version
+        if stored_key != key:
+            return None
+        if expiry is not None and expiry <= self._clock():
+            return None
+        return results
+
+    def put(self, key: Hashable, results: list[Any]) -> None:
+        """Remember the results of a lookup.
+
+        :param key: key of the lookup
+        :param results: its results
+        """
+        expiry = None if self.ttl is None else self._clock() + self.ttl
+        try:
+            data = pickle.dumps((key, expiry, results))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first, so that concurrent readers never
+        # see a partially written entry
+        handle, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(handle, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, self._get_path(key))
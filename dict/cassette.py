@@ -0,0 +1,334 @@
+"""Recording and replaying HTTP responses.
+
+A cassette stores the responses to the requests made through dict.http in a
+JSON file, so that the engines can later be run against the exact same pages
+without network access. Replay can simulate network latency and bandwidth,
+which makes it possible to benchmark the parsing and rendering code paths
+offline:
+
+    python -m dict.cassette record jisho.json -- -e jisho -N test
+    python -m dict.cassette replay jisho.json -l 0.1 -r 50 -- -e jisho test
+"""
+import argparse
+import base64
+import contextlib
+import io
+import json
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from dict import http
+
+# the recorded bodies are already decoded
+_TRANSPORT_HEADERS = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+}
+
+
+class CassetteError(Exception):
+    """Raised when a request cannot be served from a cassette."""
+
+
+class CassetteMode(Enum):
+    """Whether to make real requests and store them, or to serve them."""
+
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+@dataclass
+class Interaction:
+    """A single recorded response."""
+
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+
+    def to_json(self) -> dict[str, Any]:
+        """Convert self to a JSON-serializable dictionary.
+
+        :return: dictionary representation of self
+        """
+        try:
+            body = {"text": self.body.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"base64": base64.b64encode(self.body).decode("ascii")}
+        return {
+            "url": self.url,
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "body": body,
+        }
+
+    @classmethod
+    def from_json(cls, item: dict[str, Any]) -> "Interaction":
+        """Create an interaction from its dictionary representation.
+
+        :param item: dictionary representation of an interaction
+        :return: the interaction
+        """
+        if "text" in item["body"]:
+            body = item["body"]["text"].encode("utf-8")
+        else:
+            body = base64.b64decode(item["body"]["base64"])
+        return cls(
+            url=item["url"],
+            status_code=item["status_code"],
+            headers=item["headers"],
+            body=body,
+        )
+
+
+class _ThrottledReader(io.BytesIO):
+    def __init__(self, data: bytes, bandwidth: float) -> None:
+        super().__init__(data)
+        self.bandwidth = bandwidth
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        data = super().read(size)
+        time.sleep(len(data) / self.bandwidth)
+        return data
+
+
+def _get_request_url(url: str, *args: Any, **kwargs: Any) -> str:
+    params = args[0] if args else kwargs.get("params")
+    return requests.Request("GET", url, params=params).prepare().url or url
+
+
+class Cassette:
+    """A file of recorded HTTP responses.
+
+    Use it as a context manager to route all the requests made through
+    dict.http to the cassette. In the replay mode, the same URL can be
+    requested multiple times: the recorded responses are served in the order
+    they were recorded, and the last one is repeated once they run out.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mode: CassetteMode = CassetteMode.REPLAY,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+    ) -> None:
+        """Initialize self.
+
+        :param path: path to the cassette file
+        :param mode: whether to record or replay the responses
+        :param latency: simulated time to first byte in seconds
+        :param bandwidth: simulated transfer rate in bytes per second, if
+            empty, the whole body is available immediately
+        """
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.interactions: list[Interaction] = []
+        self._positions: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        if mode == CassetteMode.REPLAY:
+            self.load()
+
+    def load(self) -> None:
+        """Load the interactions from the cassette file."""
+        content = json.loads(self.path.read_text())
+        self.interactions = [
+            Interaction.from_json(item) for item in content["interactions"]
+        ]
+
+    def save(self) -> None:
+        """Save the interactions to the cassette file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(
+                {
+                    "interactions": [
+                        item.to_json() for item in self.interactions
+                    ]
+                },
+                ensure_ascii=False,
+                indent=4,
+            )
+        )
+
+    def get(
+        self,
+        send: Callable[..., requests.Response],
+        url: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Serve a GET request.
+
+        :param send: function making the actual request when recording
+        :param url: URL to request
+        :param args: positional arguments of the request
+        :param kwargs: keyword arguments of the request
+        :return: the response
+        """
+        request_url = _get_request_url(url, *args, **kwargs)
+        if self.mode == CassetteMode.RECORD:
+            response = send(url, *args, **kwargs)
+            body = response.content
+            headers = {
+                key: value
+                for key, value in response.headers.items()
+                if key.lower() not in _TRANSPORT_HEADERS
+            }
+            headers["Content-Length"] = str(len(body))
+            interaction = Interaction(
+                url=request_url,
+                status_code=response.status_code,
+                headers=headers,
+                body=body,
+            )
+            with self._lock:
+                self.interactions.append(interaction)
+            return self._make_response(interaction)
+
+        with self._lock:
+            candidates = [
+                item for item in self.interactions if item.url == request_url
+            ]
+            if not candidates:
+                raise CassetteError(f"no recorded response for {request_url}")
+            position = self._positions[request_url]
+            self._positions[request_url] += 1
+        time.sleep(self.latency)
+        return self._make_response(
+            candidates[min(position, len(candidates) - 1)]
+        )
+
+    def _make_response(self, interaction: Interaction) -> requests.Response:
+        response = requests.Response()
+        response.url = interaction.url
+        response.status_code = interaction.status_code
+        response.headers = CaseInsensitiveDict(interaction.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers
+        )
+        if self.mode == CassetteMode.REPLAY and self.bandwidth:
+            response.raw = _ThrottledReader(interaction.body, self.bandwidth)
+        else:
+            # pylint: disable=protected-access
+            response._content = interaction.body
+            response._content_consumed = True  # type: ignore
+        return response
+
+    def __enter__(self) -> "Cassette":
+        http.CASSETTE = self
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        http.CASSETTE = None
+        if self.mode == CassetteMode.RECORD:
+            self.save()
+
+
+def _parse_repeat(value: str) -> int:
+    try:
+        count = int(value)
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(
+            f"expected a number, got {value!r}"
+        ) from ex
+    if count < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return count
+
+
+def parse_args(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    :return: parsed command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m dict.cassette",
+        usage="%(prog)s [options] {record,replay} path -- DICT_ARGS...",
+        description=(
+            "Runs dict while recording the HTTP responses to a cassette, "
+            "or replays them and measures the lookup throughput."
+        ),
+    )
+    parser.add_argument(
+        "mode", choices=[mode.value for mode in CassetteMode], type=str
+    )
+    parser.add_argument("path", type=Path, help="path to the cassette file")
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.0,
+        help="simulated time to first byte in seconds",
+    )
+    parser.add_argument(
+        "-b",
+        "--bandwidth",
+        type=float,
+        help="simulated transfer rate in bytes per second",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=_parse_repeat,
+        default=1,
+        help="number of times to replay the lookup",
+    )
+    dict_args: list[str] = []
+    if "--" in args:
+        index = args.index("--")
+        args, dict_args = args[:index], args[index + 1 :]
+    ret = parser.parse_args(args)
+    ret.dict_args = dict_args
+    return ret
+
+
+def main(args: list[str]) -> None:
+    """Record or replay a cassette."""
+    # pylint: disable=import-outside-toplevel
+    from dict.__main__ import main as dict_main
+
+    parsed_args = parse_args(args)
+    mode = CassetteMode(parsed_args.mode)
+    with Cassette(
+        parsed_args.path,
+        mode=mode,
+        latency=parsed_args.latency,
+        bandwidth=parsed_args.bandwidth,
+    ):
+        if mode == CassetteMode.RECORD:
+            dict_main(parsed_args.dict_args)
+            return
+
+        durations: list[float] = []
+        for _ in range(parsed_args.repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                dict_main(["--no-pager", *parsed_args.dict_args])
+            durations.append(time.perf_counter() - start)
+
+    print(
+        f"{len(durations)} lookups, "
+        f"{len(durations) / sum(durations):.2f} lookups/s, "
+        f"mean {statistics.mean(durations) * 1000:.2f} ms, "
+        f"max {max(durations) * 1000:.2f} ms",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,253 @@
+"""Command line parsing and the lookup routine shared by the front ends."""
+import argparse
+import contextlib
+import itertools
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, ContextManager, NoReturn, Optional
+
+from dict import timing
+from dict.colors import COLOR_ERROR, COLOR_RESET
+from dict.engines import BaseEngine
+from dict.engines.registry import EngineNames, load_engine
+from dict.pager import flush_between, open_output
+from dict.serialize import WRITERS
+
+TEXT_FORMAT = "text"
+
+_NO_RESULTS = object()
+
+
+class CustomHelpFormatter(argparse.HelpFormatter):
+    """An argparse help formatter which prints the values of choice options
+    only once.
+    """
+
+    def _format_action_invocation(self, action: argparse.Action) -> str:
+        if not action.option_strings or action.nargs == 0:
+            return super()._format_action_invocation(action)
+        default = self._get_default_metavar_for_optional(action)
+        args_string = self._format_args(action, default)
+        return ", ".join(action.option_strings) + " " + args_string
+
+
+class UsageError(Exception):
+    """Raised by the StrictArgumentParser instead of exiting the program."""
+
+
+class StrictArgumentParser(argparse.ArgumentParser):
+    """An argument parser which raises an exception on invalid arguments,
+    for the front ends that must not exit.
+    """
+
+    def error(self, message: str) -> NoReturn:
+        raise UsageError(message)
+
+
+def add_timeout_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the option overriding the timeouts of the HTTP requests.
+
+    :param parser: parser to add the option to
+    """
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "give up on an online dictionary that does not respond in time "
+            "(default: depends on the site, usually 5 seconds to connect "
+            "and 15 seconds between the received chunks)"
+        ),
+    )
+
+
+def apply_timeout(timeout: Optional[float]) -> None:
+    """Override the timeouts of the HTTP requests, if there are any.
+
+    dict.http takes a while to import, so it is imported only by the engines
+    making the requests; the timeout is applied once they have been loaded.
+
+    :param timeout: timeout in seconds, if empty, the one of each site
+    """
+    http = sys.modules.get("dict.http")
+    if http is not None:
+        http.SCHEDULER.timeout = timeout
+
+
+def get_root_parser(
+    parser_class: type[argparse.ArgumentParser] = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """Create the parser of the options common to all engines.
+
+    :param parser_class: class of the parser to create
+    :return: argument parser
+    """
+    root_parser = parser_class(
+        prog="dict",
+        description="Looks up phrases in a chosen dictionary.",
+        formatter_class=CustomHelpFormatter,
+        add_help=False,
+    )
+    root_parser.add_argument(
+        "-e",
+        "--engine",
+        choices=EngineNames(),
+        help="engine to use",
+    )
+    root_parser.add_argument(
+        "-N",
+        "--no-pager",
+        action="store_false",
+        dest="use_pager",
+        help="disable pager in interactive mode",
+    )
+    root_parser.add_argument(
+        "-f",
+        "--format",
+        choices=[TEXT_FORMAT, *WRITERS],
+        default=TEXT_FORMAT,
+        help=(
+            "output format; the machine-readable formats write one record "
+            "per result, without colors and without the pager"
+        ),
+    )
+    root_parser.add_argument(
+        "-L",
+        "--live",
+        action="store_true",
+        help="look up the phrase as it is being typed (offline engines only)",
+    )
+    root_parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="also remember the results in this directory, across the runs",
+    )
+    root_parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep the engines loaded and serve lookups over a Unix socket",
+    )
+    root_parser.add_argument(
+        "--client",
+        action="store_true",
+        help="pass the lookups to a running daemon",
+    )
+    root_parser.add_argument(
+        "--socket",
+        type=Path,
+        help="path to the daemon socket",
+    )
+    add_timeout_argument(root_parser)
+    root_parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="print the time taken by each phase of the lookups to stderr",
+    )
+    root_parser.add_argument(
+        "--trace",
+        type=Path,
+        help="save the timings to this file in the Chrome trace format",
+    )
+    root_parser.add_argument("phrase", nargs="?")
+    return root_parser
+
+
+def parse_args(
+    args: list[str],
+    engine_cache: Optional[dict[type[BaseEngine], BaseEngine]] = None,
+    parser_class: type[argparse.ArgumentParser] = argparse.ArgumentParser,
+) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    :param args: command line arguments
+    :param engine_cache: if given, engine instances to reuse, keyed by their
+        classes, to which new instances are added
+    :param parser_class: class of the parsers to use
+    :return: parsed command line arguments
+    """
+    root_parser = get_root_parser(parser_class)
+
+    # first round: parse common options, do not interpret --help
+    ret, remaining_args = root_parser.parse_known_args(args)
+
+    # try to get the engine
+    engine: Optional[BaseEngine] = None
+    if ret.engine:
+        cls = load_engine(ret.engine)
+        if engine_cache is None:
+            engine = cls()
+        else:
+            if cls not in engine_cache:
+                engine_cache[cls] = cls()
+            engine = engine_cache[cls]
+
+    # construct a child parser, add engine-specific options if applicable
+    main_parser = parser_class(
+        prog=root_parser.prog,
+        description=root_parser.description,
+        formatter_class=root_parser.formatter_class,
+        parents=[root_parser],
+    )
+    if engine:
+        engine.decorate_arg_parser(main_parser)
+
+    # second round: parse everything, including --help, which raises SystemExit
+    ret = main_parser.parse_args(args + remaining_args)
+
+    # if --help was given, interpreting it raised SystemExit above, so at this
+    # point --engine is required to carry out with the normal program operation
+    if not ret.engine:
+        main_parser.error("the following arguments are required: -e/--engine")
+
+    ret.engine = engine
+    return ret
+
+
+def print_lookup(
+    args: argparse.Namespace,
+    phrase: str,
+    open_file: Callable[[], ContextManager[IO[str]]],
+    max_results: Optional[int] = None,
+) -> None:
+    """Look up the phrase and print the results.
+
+    The output is opened only once the first result is known, so that the
+    pager does not take over the terminal while waiting for the results.
+
+    :param args: parsed command line arguments
+    :param phrase: phrase to look up
+    :param open_file: function returning a context manager that yields the
+        stream to print to
+    :param max_results: if given, print only this many first results
+    """
+    with timing.span("lookup", phrase=phrase):
+        results = iter(args.engine.lookup(args, phrase))
+        if max_results is not None:
+            results = itertools.islice(results, max_results)
+        first_result = next(results, _NO_RESULTS)
+    if first_result is not _NO_RESULTS:
+        results = itertools.chain([first_result], results)
+
+    # the lazy engines carry on with the lookup while the results are being
+    # rendered, so the render span includes their nested spans
+    with open_file() as file, timing.span("render"):
+        if args.format in WRITERS:
+            WRITERS[args.format](flush_between(results, file=file), file)
+        elif first_result is not _NO_RESULTS:
+            args.engine.print_results(
+                results=flush_between(results, file=file), file=file
+            )
+        else:
+            print(COLOR_ERROR + "no results" + COLOR_RESET, file=file)
+
+
+def open_results_output(args: argparse.Namespace) -> ContextManager[IO[str]]:
+    """Open the stream for printing the results, according to the options.
+
+    :param args: parsed command line arguments
+    :return: a context manager yielding the stream to write to
+    """
+    if args.format in WRITERS:
+        return contextlib.nullcontext(sys.stdout)
+    return open_output(use_pager=args.use_pager)
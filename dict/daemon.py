@@ -0,0 +1,313 @@
+"""A daemon answering the lookups over a Unix socket.
+
+Starting the interpreter, importing the engines and loading the offline
+dictionaries takes much longer than a typical lookup. The daemon does all of
+that once and keeps the engines, along with their HTTP sessions and the
+dictionaries, in memory, while the thin client only passes its command line
+to the daemon and prints the reply.
+
+Each connection carries a single lookup. The client sends one JSON line:
+
+    {"args": [command line arguments], "phrase": phrase or null}
+
+The daemon replies with JSON lines, each being one of:
+
+    {"out": text to print to the standard output}
+    {"err": text to print to the standard error}
+    {"exit": exit status}
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import traceback
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, Any, ContextManager, Optional, cast
+
+from dict.cli import apply_timeout, parse_args, print_lookup
+from dict.colors import COLOR_ERROR, COLOR_RESET
+from dict.engines import BaseEngine
+from dict.pager import open_output
+
+ENCODING = "utf-8"
+
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be reached."""
+
+
+def get_default_socket_path() -> Path:
+    """Return the path of the daemon socket for the current user.
+
+    :return: path within the runtime directory, if there is one, or within
+        the temporary directory otherwise
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "dict.sock"
+    return Path(tempfile.gettempdir()) / f"dict-{os.getuid()}.sock"
+
+
+def _send(file: IO[bytes], **message: Any) -> None:
+    file.write(json.dumps(message).encode(ENCODING) + b"\n")
+    file.flush()
+
+
+class MessageStream(io.TextIOBase):
+    """A text stream forwarding its contents to the client upon flushing."""
+
+    def __init__(self, file: IO[bytes], key: str) -> None:
+        """Initialize self.
+
+        :param file: socket file to write the messages to
+        :param key: message key, "out" or "err"
+        """
+        super().__init__()
+        self.file = file
+        self.key = key
+        self._buffer: list[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:  # type: ignore
+        self._buffer.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        if text:
+            _send(self.file, **{self.key: text})
+
+
+class _ClientArgumentParser(argparse.ArgumentParser):
+    out: IO[str]
+    err: IO[str]
+
+    def _print_message(self, message: str, file: Any = None) -> None:
+        # argparse prints the help to sys.stdout and the errors to sys.stderr
+        if message:
+            (self.err if file is sys.stderr else self.out).write(message)
+
+
+def _get_parser_class(
+    out: IO[str], err: IO[str]
+) -> type[argparse.ArgumentParser]:
+    return type(
+        "ClientArgumentParser",
+        (_ClientArgumentParser,),
+        {"out": out, "err": err},
+    )
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "Daemon"
+
+    def handle(self) -> None:
+        wfile = cast(IO[bytes], self.wfile)
+        line = self.rfile.readline()
+        if not line:
+            return  # a connection probing whether the daemon is running
+        try:
+            request = json.loads(line)
+            status = self.server.lookup(
+                request["args"], request.get("phrase"), wfile
+            )
+            _send(wfile, exit=status)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away, e.g. after quitting the pager
+
+
+class Daemon(socketserver.ThreadingUnixStreamServer):
+    """A server answering the lookups sent by the clients.
+
+    The engines are created once for the whole lifetime of the server and
+    shared among the connections, which are handled in separate threads.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, socket_path: Path, timeout: Optional[float] = None
+    ) -> None:
+        """Initialize self.
+
+        :param socket_path: path of the socket to listen on
+        :param timeout: timeout of the HTTP requests of all the lookups, in
+            seconds, if empty, the one of each site
+        """
+        super().__init__(str(socket_path), _RequestHandler)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.engines: dict[type[BaseEngine], BaseEngine] = {}
+        # the engines are created while parsing, only once for each class
+        self._parse_lock = threading.Lock()
+
+    def lookup(
+        self, args: list[str], phrase: Optional[str], file: IO[bytes]
+    ) -> int:
+        """Carry out a single lookup, sending the output to the client.
+
+        :param args: client's command line arguments
+        :param phrase: phrase to look up, if empty, the one given in the
+            arguments
+        :param file: socket file to write the reply to
+        :return: exit status
+        """
+        out = cast(IO[str], MessageStream(file, "out"))
+        err = cast(IO[str], MessageStream(file, "err"))
+        try:
+            with self._parse_lock:
+                try:
+                    parsed_args = parse_args(
+                        args,
+                        engine_cache=self.engines,
+                        parser_class=_get_parser_class(out, err),
+                    )
+                except SystemExit as ex:
+                    if ex.code is None or isinstance(ex.code, int):
+                        return ex.code or 0
+                    print(ex.code, file=err)
+                    return 1
+                # the requests of all the clients share the same scheduler
+                apply_timeout(self.timeout)
+            if parsed_args.timeout is not None:
+                print(
+                    "dict: error: --timeout applies to all the lookups of "
+                    "the daemon, pass it to dict --daemon instead",
+                    file=err,
+                )
+                return 2
+
+            if phrase is None:
+                phrase = parsed_args.phrase
+            if phrase is None:
+                print("dict: error: no phrase given", file=err)
+                return 2
+
+            # the statistics and the plans of the offline engines
+            parsed_args.diagnostics_file = err
+            print_lookup(
+                parsed_args, phrase, lambda: contextlib.nullcontext(out)
+            )
+            return 0
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception:  # pylint: disable=broad-except
+            # report the failure to the client and keep serving the others
+            print(
+                COLOR_ERROR + traceback.format_exc().rstrip() + COLOR_RESET,
+                file=err,
+            )
+            return 1
+        finally:
+            out.flush()
+            err.flush()
+
+
+def _is_listening(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(
+    socket_path: Optional[Path] = None, timeout: Optional[float] = None
+) -> None:
+    """Serve the lookups until interrupted.
+
+    :param socket_path: path of the socket to listen on, if empty, the
+        default one
+    :param timeout: timeout of the HTTP requests, in seconds, if empty, the
+        one of each site
+    """
+    socket_path = socket_path or get_default_socket_path()
+    if socket_path.exists():
+        if _is_listening(socket_path):
+            raise DaemonError(f"already listening on {socket_path}")
+        socket_path.unlink()  # left behind by a daemon that was killed
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with Daemon(socket_path, timeout) as daemon:
+        print(f"listening on {socket_path}", file=sys.stderr)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+class Client:
+    """Passes the lookups to the daemon and prints its replies."""
+
+    def __init__(self, socket_path: Optional[Path] = None) -> None:
+        """Initialize self.
+
+        :param socket_path: path of the daemon socket, if empty, the default
+            one
+        """
+        self.socket_path = socket_path or get_default_socket_path()
+
+    def lookup(
+        self,
+        args: list[str],
+        phrase: Optional[str],
+        open_file: Callable[[], ContextManager[IO[str]]] = functools.partial(
+            open_output, use_pager=True
+        ),
+    ) -> int:
+        """Look up the phrase using the daemon.
+
+        :param args: command line arguments to pass to the daemon
+        :param phrase: phrase to look up, if empty, the one given in the
+            arguments
+        :param open_file: function returning a context manager that yields
+            the stream to print the reply to
+        :return: exit status reported by the daemon
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(self.socket_path))
+            except OSError as ex:
+                raise DaemonError(
+                    f"cannot connect to the daemon at {self.socket_path}: "
+                    f"{ex.strerror or ex}"
+                ) from ex
+
+            with cast(IO[bytes], sock.makefile("rwb")) as handle:
+                _send(handle, args=args, phrase=phrase)
+                return self._print_reply(handle, open_file)
+
+    @staticmethod
+    def _print_reply(
+        handle: IO[bytes], open_file: Callable[[], ContextManager[IO[str]]]
+    ) -> int:
+        with contextlib.ExitStack() as stack:
+            file: Optional[IO[str]] = None
+            for line in handle:
+                message = json.loads(line)
+                if "out" in message:
+                    if file is None:
+                        file = stack.enter_context(open_file())
+                    file.write(message["out"])
+                    file.flush()
+                elif "err" in message:
+                    sys.stderr.write(message["err"])
+                    sys.stderr.flush()
+                elif "exit" in message:
+                    return int(message["exit"])
+        raise DaemonError("the daemon closed the connection unexpectedly")
@@ -0,0 +1,251 @@
+"""Finding the dictionary forms of the conjugated Japanese words.
+
+The deinflector strips the conjugation suffixes one at a time, e.g.
+
+    食べられなかった → 食べられない (past)
+                   → 食べられる (negative)
+                   → 食べる (potential or passive)
+
+Each rule replaces a suffix of a word of a given class with the suffix of
+another class: the negative "ない" conjugates further like an adjective, the
+polite "ます" takes its own endings, the potential "られる" conjugates like an
+ichidan verb and so on. Since the rules are ambiguous, every reachable form
+is a candidate, constrained by the parts of speech it must have in the
+dictionary, e.g. v1 for 食べる, which rules out most of the wrong guesses.
+"""
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# the conjugated forms of the godan verbs of each class, in the order of
+# the dictionary form, the negative (a) stem, the polite (i) stem, the
+# potential and imperative (e) stem, the volitional (o) stem, the -te form
+# and the past form
+_GODAN_FORMS = {
+    "v5u": ("う", "わ", "い", "え", "お", "って", "った"),
+    "v5k": ("く", "か", "き", "け", "こ", "いて", "いた"),
+    "v5g": ("ぐ", "が", "ぎ", "げ", "ご", "いで", "いだ"),
+    "v5s": ("す", "さ", "し", "せ", "そ", "して", "した"),
+    "v5t": ("つ", "た", "ち", "て", "と", "って", "った"),
+    "v5n": ("ぬ", "な", "に", "ね", "の", "んで", "んだ"),
+    "v5b": ("ぶ", "ば", "び", "べ", "ぼ", "んで", "んだ"),
+    "v5m": ("む", "ま", "み", "め", "も", "んで", "んだ"),
+    "v5r": ("る", "ら", "り", "れ", "ろ", "って", "った"),
+}
+# the special classes conjugate like the regular ones, except for the forms
+# listed here
+_GODAN_SPECIAL_CLASSES = {"v5k": ("v5k-s",), "v5r": ("v5r-i", "v5aru")}
+_GODAN_SPECIAL_FORMS = {"v5k-s": ("って", "った")}  # 行く
+
+# classes of the forms that are not in the dictionary, but conjugate further
+_POLITE = "masu"
+_TE = "te"
+# forms that do not conjugate any further
+_FINAL = ""
+
+_V1 = "v1"
+_ADJ_I = "adj-i"
+_SURU = ("vs-i", "vs-s")
+_KURU = ("vk",)
+
+MAX_STEPS = 8
+
+
+@dataclass(frozen=True)
+class Deinflection:
+    """A candidate dictionary form of a conjugated word."""
+
+    term: str
+    # codes of the parts of speech of which the dictionary form must have
+    # at least one, e.g. v1; empty for the unchanged word
+    parts_of_speech: tuple[str, ...]
+    # conjugations leading from the dictionary form to the word
+    chain: tuple[str, ...]
+
+    def __str__(self) -> str:
+        return " → ".join((self.term,) + self.chain)
+
+
+@dataclass(frozen=True)
+class _Rule:
+    inflected: str
+    base: str
+    # class of the conjugated form, matched against the classes of the
+    # dictionary forms found in the previous steps
+    inflected_class: str
+    base_classes: tuple[str, ...]
+    name: str
+
+
+def _verb_rules(
+    stems: dict[str, str], base: str, classes: tuple[str, ...]
+) -> list[_Rule]:
+    # the suffixes of the conjugated forms, added to the stems: a, i, e, o,
+    # and the -te and past forms, keyed by "te" and "ta"
+    forms = [
+        ("a", "ない", _ADJ_I, "negative"),
+        ("a", "ず", _FINAL, "-zu"),
+        ("a", "れる", _V1, "passive"),
+        ("a", "せる", _V1, "causative"),
+        ("a", "せられる", _V1, "causative passive"),
+        ("i", "ます", _POLITE, "polite"),
+        ("i", "たい", _ADJ_I, "-tai"),
+        ("e", "る", _V1, "potential"),
+        ("e", "", _FINAL, "imperative"),
+        ("e", "ば", _FINAL, "-ba"),
+        ("o", "う", _FINAL, "volitional"),
+        ("te", "", _TE, "-te"),
+        ("ta", "", _FINAL, "past"),
+        ("ta", "ら", _FINAL, "-tara"),
+    ]
+    return [
+        _Rule(stems[stem] + suffix, base, inflected_class, classes, name)
+        for stem, suffix, inflected_class, name in forms
+        if stem in stems
+    ]
+
+
+def _godan_rules() -> list[_Rule]:
+    rules = []
+    for code, forms in _GODAN_FORMS.items():
+        ending, a_stem, i_stem, e_stem, o_stem, te_form, ta_form = forms
+        special_classes = _GODAN_SPECIAL_CLASSES.get(code, ())
+        rules += _verb_rules(
+            {"a": a_stem, "i": i_stem, "e": e_stem, "o": o_stem},
+            ending,
+            (code,) + special_classes,
+        )
+        rules += _verb_rules({"te": te_form, "ta": ta_form}, ending, (code,))
+        for special in special_classes:
+            special_te, special_ta = _GODAN_SPECIAL_FORMS.get(
+                special, (te_form, ta_form)
+            )
+            rules += _verb_rules(
+                {"te": special_te, "ta": special_ta}, ending, (special,)
+            )
+    return rules
+
+
+def _ichidan_rules() -> list[_Rule]:
+    # the ichidan verbs drop the final る, e.g. 食べる → 食べない, but their
+    # passive and causative forms differ from the godan ones
+    rules = _verb_rules(
+        {"a": "", "i": "", "o": "", "te": "て", "ta": "た"}, "る", (_V1,)
+    )
+    return [rule for rule in rules if rule.inflected_class != _V1] + [
+        _Rule("られる", "る", _V1, (_V1,), "potential or passive"),
+        _Rule("れる", "る", _V1, (_V1,), "potential"),
+        _Rule("させる", "る", _V1, (_V1,), "causative"),
+        _Rule("させられる", "る", _V1, (_V1,), "causative passive"),
+        _Rule("よう", "る", _FINAL, (_V1,), "volitional"),
+        _Rule("ろ", "る", _FINAL, (_V1,), "imperative"),
+        _Rule("れば", "る", _FINAL, (_V1,), "-ba"),
+    ]
+
+
+def _irregular_rules() -> list[_Rule]:
+    rules = _verb_rules(
+        {"a": "し", "i": "し", "te": "して", "ta": "した"}, "する", _SURU
+    ) + [
+        _Rule("される", "する", _V1, _SURU, "passive"),
+        _Rule("させる", "する", _V1, _SURU, "causative"),
+        _Rule("できる", "する", _V1, _SURU, "potential"),
+        _Rule("しよう", "する", _FINAL, _SURU, "volitional"),
+        _Rule("しろ", "する", _FINAL, _SURU, "imperative"),
+        _Rule("すれば", "する", _FINAL, _SURU, "-ba"),
+        # the nouns taking する, e.g. 勉強する → 勉強
+        _Rule("する", "", _SURU[0], ("vs",), "suru"),
+    ]
+
+    # 来る is written either in kana or with the kanji, whose reading changes
+    for kuru, ko, ki, ku in (
+        ("くる", "こ", "き", "く"),
+        ("来る", "来", "来", "来"),
+    ):
+        rules += _verb_rules({"te": ki + "て", "ta": ki + "た"}, kuru, _KURU)
+        rules += [
+            _Rule(ko + "ない", kuru, _ADJ_I, _KURU, "negative"),
+            _Rule(ki + "ます", kuru, _POLITE, _KURU, "polite"),
+            _Rule(ki + "たい", kuru, _ADJ_I, _KURU, "-tai"),
+            _Rule(ko + "られる", kuru, _V1, _KURU, "potential or passive"),
+            _Rule(ko + "させる", kuru, _V1, _KURU, "causative"),
+            _Rule(ko + "よう", kuru, _FINAL, _KURU, "volitional"),
+            _Rule(ko + "い", kuru, _FINAL, _KURU, "imperative"),
+            _Rule(ku + "れば", kuru, _FINAL, _KURU, "-ba"),
+        ]
+    return rules
+
+
+def _auxiliary_rules() -> list[_Rule]:
+    rules = [
+        _Rule("くない", "い", _ADJ_I, (_ADJ_I,), "negative"),
+        _Rule("かった", "い", _FINAL, (_ADJ_I,), "past"),
+        _Rule("かったら", "い", _FINAL, (_ADJ_I,), "-tara"),
+        _Rule("くて", "い", _TE, (_ADJ_I,), "-te"),
+        _Rule("ければ", "い", _FINAL, (_ADJ_I,), "-ba"),
+        _Rule("く", "い", _FINAL, (_ADJ_I,), "adverb"),
+        _Rule("さ", "い", _FINAL, (_ADJ_I,), "noun"),
+        _Rule("ません", "ます", _FINAL, (_POLITE,), "negative"),
+        _Rule("ませんでした", "ます", _FINAL, (_POLITE,), "negative past"),
+        _Rule("ました", "ます", _FINAL, (_POLITE,), "past"),
+        _Rule("ましょう", "ます", _FINAL, (_POLITE,), "volitional"),
+        _Rule("まして", "ます", _TE, (_POLITE,), "-te"),
+        _Rule("ちゃう", "て", "v5u", (_TE,), "completion"),
+        _Rule("じゃう", "で", "v5u", (_TE,), "completion"),
+    ]
+    for te in ("て", "で"):
+        rules += [
+            _Rule(te + "いる", te, _V1, (_TE,), "progressive"),
+            _Rule(te + "る", te, _V1, (_TE,), "progressive"),
+            _Rule(te + "しまう", te, "v5u", (_TE,), "completion"),
+            _Rule(te + "おく", te, "v5k", (_TE,), "preparation"),
+        ]
+    return rules
+
+
+_RULES = (
+    _godan_rules() + _ichidan_rules() + _irregular_rules() + _auxiliary_rules()
+)
+
+
+def deinflect(word: str) -> list[Deinflection]:
+    """Find the candidate dictionary forms of a word.
+
+    :param word: possibly conjugated word
+    :return: the word itself, followed by its possible dictionary forms,
+        the ones reached with the fewest steps first
+    """
+    ret = [Deinflection(word, (), ())]
+    # classes of the forms found so far, by the forms
+    seen: dict[str, set[str]] = {}
+    queue: list[tuple[str, tuple[str, ...], tuple[str, ...]]] = [
+        (word, (), ())
+    ]
+    for _step in range(MAX_STEPS):
+        next_queue = []
+        for term, classes, chain in queue:
+            for rule in _RULES:
+                if not term.endswith(rule.inflected):
+                    continue
+                # the word itself may be in any form
+                if chain and rule.inflected_class not in classes:
+                    continue
+                base = term[: len(term) - len(rule.inflected)] + rule.base
+                if not base:
+                    continue
+                new_classes = set(rule.base_classes) - seen.get(base, set())
+                if not new_classes:
+                    continue
+                seen.setdefault(base, set()).update(new_classes)
+                new_chain = (rule.name,) + chain
+                next_queue.append((base, rule.base_classes, new_chain))
+                parts_of_speech = _get_parts_of_speech(rule.base_classes)
+                if parts_of_speech:
+                    ret.append(Deinflection(base, parts_of_speech, new_chain))
+        queue = next_queue
+    return ret
+
+
+def _get_parts_of_speech(classes: Iterable[str]) -> tuple[str, ...]:
+    # the intermediate forms, such as the polite stem, are not in the
+    # dictionary
+    return tuple(name for name in classes if name not in (_POLITE, _TE))
@@ -1,13 +1,33 @@
-"""Definitions of dictionary engines."""
+"""Definitions of dictionary engines.
+
+The engines are imported lazily, on first access, so that importing this
+package does not import the dependencies of every engine.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .base import BaseEngine
-from .edict2 import Edict2Engine
-from .jisho import JishoEngine
-from .jmdict import JMDictEngine
-from .reverso import ReversoEngine
-from .sjp import SJPEngine
-from .synonim import SynonimEngine
-from .urban import UrbanEngine
-from .wordhippo import WordHippoEngine
+
+if TYPE_CHECKING:
+    from .edict2 import Edict2Engine
+    from .jisho import JishoEngine
+    from .jmdict import JMDictEngine
+    from .reverso import ReversoEngine
+    from .sjp import SJPEngine
+    from .synonim import SynonimEngine
+    from .urban import UrbanEngine
+    from .wordhippo import WordHippoEngine
+
+_ENGINE_MODULES = {
+    "Edict2Engine": ".edict2",
+    "JMDictEngine": ".jmdict",
+    "JishoEngine": ".jisho",
+    "ReversoEngine": ".reverso",
+    "SJPEngine": ".sjp",
+    "SynonimEngine": ".synonim",
+    "UrbanEngine": ".urban",
+    "WordHippoEngine": ".wordhippo",
+}
 
 __all__ = [
     "BaseEngine",
@@ -18,4 +38,13 @@ __all__ = [
     "SJPEngine",
     "SynonimEngine",
     "UrbanEngine",
+    "WordHippoEngine",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _ENGINE_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(
+        importlib.import_module(_ENGINE_MODULES[name], __name__), name
+    )
@@ -1,7 +1,17 @@
 """Definition of the BaseEngine."""
 import argparse
-from collections.abc import Iterable
-from typing import IO, Generic, TypeVar
+from collections.abc import Hashable, Iterable
+from typing import IO, Any, Generic, Optional, TypeVar, Union
+
+from dict.cache import (
+    DEFAULT_NEGATIVE_CACHE_SIZE,
+    DEFAULT_RESULT_CACHE_SIZE,
+    DEFAULT_RESULT_CACHE_TTL,
+    DiskResultCache,
+    NegativeCache,
+    ResultCache,
+)
+from dict.engines.registry import register_engine
 
 TResult = TypeVar("TResult")
 
@@ -11,6 +21,38 @@ class BaseEngine(Generic[TResult]):
 
     names: list[str] = NotImplemented
 
+    # names of the parsed command line arguments that affect the results
+    cache_key_args: list[str] = []
+
+    # how long to remember the lookups that yielded no results, in seconds;
+    # None disables the negative cache
+    negative_cache_ttl: Optional[float] = None
+    negative_cache_size: int = DEFAULT_NEGATIVE_CACHE_SIZE
+
+    # how long to remember the results, in seconds; None keeps them until
+    # the data version changes
+    result_cache_ttl: Optional[float] = DEFAULT_RESULT_CACHE_TTL
+    # maximum number of results remembered in memory; 0 disables the cache
+    result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.names is not NotImplemented:
+            register_engine(cls)
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        self.negative_cache: Optional[NegativeCache] = None
+        if self.negative_cache_ttl is not None:
+            self.negative_cache = NegativeCache(
+                ttl=self.negative_cache_ttl, maxsize=self.negative_cache_size
+            )
+        self.result_cache: Optional[ResultCache] = None
+        if self.result_cache_size:
+            self.result_cache = ResultCache(
+                ttl=self.result_cache_ttl, maxsize=self.result_cache_size
+            )
+
     @property
     def primary_name(self) -> str:
         """Return the primary name of this engine.
@@ -26,6 +68,85 @@ class BaseEngine(Generic[TResult]):
         :param parser: parser to configure
         """
 
+    def get_cache_key(self, args: argparse.Namespace, phrase: str) -> Hashable:
+        """Return a key identifying the results of the given lookup.
+
+        :param args: parsed command line arguments
+        :param phrase: phrase to look up
+        :return: the key
+        """
+        return (
+            self.primary_name,
+            tuple(getattr(args, name, None) for name in self.cache_key_args),
+            phrase,
+        )
+
+    def get_data_version(self) -> Hashable:
+        """Return the version of the data the results are derived from.
+
+        The remembered results are discarded whenever the version changes,
+        e.g. when a dictionary file is rebuilt.
+
+        :return: version
+        """
+        return None
+
+    def get_result_caches(
+        self, args: argparse.Namespace
+    ) -> list[Union[ResultCache, DiskResultCache]]:
+        """Return the caches to remember the results in, fastest first.
+
+        :param args: parsed command line arguments
+        :return: caches
+        """
+        caches: list[Union[ResultCache, DiskResultCache]] = []
+        if self.result_cache is not None:
+            caches.append(self.result_cache)
+        cache_dir = getattr(args, "cache_dir", None)
+        if cache_dir:
+            caches.append(
+                DiskResultCache(
+                    cache_dir / self.primary_name, ttl=self.result_cache_ttl
+                )
+            )
+        return caches
+
+    def lookup(
+        self, args: argparse.Namespace, phrase: str
+    ) -> Iterable[TResult]:
+        """Look up the given phrase, answering repeated lookups locally.
+
+        :param args: parsed command line arguments
+        :param phrase: phrase to look up
+        :return: a generator of results
+        """
+        key = self.get_cache_key(args, phrase)
+        if self.negative_cache is not None and key in self.negative_cache:
+            return
+
+        caches = self.get_result_caches(args)
+        versioned_key = (key, self.get_data_version()) if caches else None
+        for i, cache in enumerate(caches):
+            cached_results = cache.get(versioned_key)
+            if cached_results is not None:
+                for faster_cache in caches[:i]:
+                    faster_cache.put(versioned_key, cached_results)
+                yield from cached_results
+                return
+
+        found = False
+        results: list[TResult] = []
+        for result in self.lookup_phrase(args, phrase):
+            found = True
+            if caches:
+                results.append(result)
+            yield result
+
+        if self.negative_cache is not None and not found:
+            self.negative_cache.add(key)
+        for cache in caches:
+            cache.put(versioned_key, results)
+
     def lookup_phrase(
         self, args: argparse.Namespace, phrase: str
     ) -> Iterable[TResult]:
@@ -1,18 +1,19 @@
 """Definition of the Edict2Engine."""
-import argparse
+import dataclasses
 import gzip
 import re
+import shutil
 from collections.abc import Iterable
 from dataclasses import dataclass
-from io import BytesIO
 from pathlib import Path
 from typing import IO, Any, Optional
 
 import xdg
 
+from dict import timing
 from dict.colors import COLOR_HIGHLIGHT, COLOR_RESET
-from dict.engines.base import BaseEngine
-from dict.http import download
+from dict.deinflect import Deinflection
+from dict.engines.offline import OfflineEngine
 
 PART_OF_SPEECH_CODES = (
     "adj-i adj-na adj-no adj-pn adj-t adj-f adj adv adv-to aux aux-v aux-adj "
@@ -44,6 +45,7 @@ _RE_TAGS = re.compile(
 )
 
 DOWNLOAD_URL = "http://ftp.edrdg.org/pub/Nihongo/edict2.gz"
+DOWNLOAD_SEGMENTS = 4
 CACHE_PATH = Path(xdg.XDG_CACHE_HOME) / "edict2.txt"
 
 
@@ -76,6 +78,8 @@ class Edict2Result:
     tags: list[str]
     ent_seq: Optional[str]
     has_audio: bool
+    # set by the deinflected lookups
+    deinflection: Optional[Deinflection] = None
 
 
 def _extract_tags(
@@ -202,16 +206,26 @@ def download_edict2_if_needed() -> None:
     if CACHE_PATH.exists():
         return
 
+    # dict.http and requests take a while to import, which the lookups in
+    # the downloaded dictionary can do without
+    # pylint: disable=import-outside-toplevel
+    from dict.http import BLOCK_SIZE, download
+
     CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with BytesIO() as handle:
-        download(
-            DOWNLOAD_URL,
-            description="downloading the dictionary",
-            handle=handle,
-        )
-        CACHE_PATH.write_text(
-            gzip.decompress(handle.getvalue()).decode("euc-jp")
-        )
+    archive_path = CACHE_PATH.with_name(CACHE_PATH.name + ".gz")
+    download(
+        DOWNLOAD_URL,
+        description="downloading the dictionary",
+        path=archive_path,
+        segments=DOWNLOAD_SEGMENTS,
+    )
+    temp_path = CACHE_PATH.with_name(CACHE_PATH.name + ".tmp")
+    with timing.span("decompress"):
+        with gzip.open(archive_path, "rt", encoding="euc-jp") as source:
+            with temp_path.open("w", encoding="utf-8") as target:
+                shutil.copyfileobj(source, target, BLOCK_SIZE)
+    temp_path.replace(CACHE_PATH)
+    archive_path.unlink()
 
 
 def get_result_weight(
@@ -243,47 +257,55 @@ def get_result_weight(
     return None
 
 
-class Edict2Engine(BaseEngine[Edict2Result]):
+class Edict2Engine(OfflineEngine[Edict2Result]):
     """Edict2 engine (a Japanese textfile dictionary).
 
     Downloads Edict EUC-JP gzipped file, where each entry is represented by a
-    single physical line. The search process is divided into two steps: first
-    the physical lines are filtered by checking if they contain a given phrase.
-    The ones that match are then parsed into logic entries and further
-    filtered, this time within specific fields.
+    single physical line.
     """
 
     names = ["edict", "edict2"]
 
-    def lookup_phrase(
-        self, args: argparse.Namespace, phrase: str
-    ) -> Iterable[Edict2Result]:
+    def get_dictionary_path(self) -> Path:
         download_edict2_if_needed()
-
-        physical_pattern = re.compile(
-            phrase.lstrip("^").rstrip("$"), flags=re.I
-        )
-        logic_pattern = re.compile(phrase, flags=re.I)
-
-        results: list[tuple[Edict2Result, Any]] = []
-
-        with CACHE_PATH.open("r") as handle:
-            for line in handle:
-                if not physical_pattern.search(line):
-                    continue
-
-                result = parse_edict2_line(line)
-                weight = get_result_weight(logic_pattern, result)
-                if weight is not None:
-                    results.append((result, weight))
-
-        results.sort(key=lambda item: item[1], reverse=True)
-        return [result for result, weight in results]
+        return CACHE_PATH
+
+    def parse_line(self, line: str) -> Edict2Result:
+        return parse_edict2_line(line)
+
+    def get_result_weight(
+        self, logic_pattern: re.Pattern[str], result: Edict2Result
+    ) -> Optional[Any]:
+        return get_result_weight(logic_pattern, result)
+
+    def get_headwords(self, result: Edict2Result) -> Iterable[str]:
+        for jap in result.japanese:
+            yield jap.kanji
+            yield jap.kana
+
+    def get_parts_of_speech(self, result: Edict2Result) -> Iterable[str]:
+        yield from result.tags
+        for glossary in result.glossaries:
+            yield from glossary.tags
+
+    def annotate_deinflection(
+        self, result: Edict2Result, deinflection: Deinflection
+    ) -> Edict2Result:
+        return dataclasses.replace(result, deinflection=deinflection)
+
+    def get_search_terms(self, result: Edict2Result) -> Iterable[str]:
+        for jap in result.japanese:
+            yield jap.kana
+            yield jap.kanji
+        for glossary in result.glossaries:
+            yield glossary.english
 
     def print_results(
         self, results: Iterable[Edict2Result], file: IO[str]
     ) -> None:
         for result in results:
+            if result.deinflection:
+                print(result.deinflection, file=file)
             print("({})".format(",".join(result.tags)), file=file)
             for jap in result.japanese:
                 print(
@@ -1,14 +1,19 @@
 """Definition of the JishoEngine."""
 import argparse
 from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import IO, Optional
-
-import requests
+from typing import IO, Any, Optional
 
+from dict import http, timing
+from dict.cache import DEFAULT_NEGATIVE_CACHE_TTL
 from dict.colors import COLOR_HIGHLIGHT, COLOR_RESET
 from dict.engines.base import BaseEngine
 
+API_URL = "http://jisho.org/api/v1/search/words"
+PAGE_SIZE = 20  # number of entries the API returns per page
+DEFAULT_LIMIT = 100
+
 
 @dataclass
 class JishoResultJapaneseInfo:
@@ -26,20 +31,78 @@ class JishoResult:
     meanings: list[str]
 
 
+def _fetch_page(phrase: str, page: int) -> list[dict[str, Any]]:
+    params: dict[str, Any] = {"keyword": phrase}
+    if page > 1:
+        params["page"] = page
+    response = http.get(API_URL, params)
+    response.raise_for_status()
+    with timing.span("decode json"):
+        return response.json()["data"]
+
+
+def iter_pages(phrase: str, max_pages: int) -> Iterable[list[dict[str, Any]]]:
+    """Fetch consecutive result pages for the given phrase.
+
+    The next page is requested as soon as the previous one turns out to be
+    full, so it downloads while the caller consumes the previous one, but
+    no request is wasted on the pages past the last one. Iteration stops at
+    the first page that is not full.
+
+    :param phrase: phrase to look up
+    :param max_pages: maximum number of pages to fetch
+    :return: a generator of raw API entries, one list per page
+    """
+    if max_pages <= 0:
+        return
+    executor = ThreadPoolExecutor(max_workers=1)
+    pending: Optional[Future[list[dict[str, Any]]]] = executor.submit(
+        _fetch_page, phrase, 1
+    )
+    page = 1
+    try:
+        while pending is not None:
+            entries = pending.result()
+            pending = None
+            if len(entries) >= PAGE_SIZE and page < max_pages:
+                page += 1
+                pending = executor.submit(_fetch_page, phrase, page)
+            yield entries
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 class JishoEngine(BaseEngine[JishoResult]):
     """Jisho.org engine."""
 
     names = ["jisho"]
+    cache_key_args = ["limit"]
+    negative_cache_ttl = DEFAULT_NEGATIVE_CACHE_TTL
+
+    @staticmethod
+    def decorate_arg_parser(parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "-l",
+            "--limit",
+            type=int,
+            default=DEFAULT_LIMIT,
+            help=f"maximum number of results (default: {DEFAULT_LIMIT})",
+        )
 
     def lookup_phrase(
         self, args: argparse.Namespace, phrase: str
     ) -> Iterable[JishoResult]:
-        url = "http://jisho.org/api/v1/search/words"
-        response = requests.get(url, {"keyword": phrase})
-        response.raise_for_status()
-        content = response.json()
-
-        for entry in content["data"]:
+        limit: int = args.limit
+        if limit <= 0:
+            return
+        max_pages = (limit + PAGE_SIZE - 1) // PAGE_SIZE
+
+        entries = (
+            entry
+            for page in iter_pages(phrase, max_pages=max_pages)
+            for entry in page
+        )
+        for _, entry in zip(range(limit), entries):
             yield JishoResult(
                 japanese=[
                     JishoResultJapaneseInfo(
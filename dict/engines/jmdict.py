@@ -1,23 +1,26 @@
 """Definition of the JMDict."""
-import argparse
+import dataclasses
+import functools
 import gzip
 import json
 import re
+import shutil
 from collections.abc import Iterable
 from dataclasses import dataclass
-from io import BytesIO
 from pathlib import Path
 from typing import IO, Any, Optional, cast
 
-import lxml
+import lxml.etree
 import xdg
 from tqdm import tqdm
 
+from dict import timing
 from dict.colors import COLOR_HIGHLIGHT, COLOR_RESET
-from dict.engines.base import BaseEngine
-from dict.http import download
+from dict.deinflect import Deinflection
+from dict.engines.offline import OfflineEngine
 
 DOWNLOAD_URL = "http://ftp.edrdg.org/pub/Nihongo/JMdict_e.gz"
+DOWNLOAD_SEGMENTS = 4
 XML_CACHE_PATH = Path(xdg.XDG_CACHE_HOME) / "jmdict.xml"
 INDEX_CACHE_PATH = Path(xdg.XDG_CACHE_HOME) / "jmdict.jsonl"
 
@@ -29,6 +32,33 @@ COMMON_TAGS = (
     "gai1",
 )  # same as (P) marker in edict2
 
+# the parts of speech are stored as the descriptions of their entities,
+# listed here for the conjugated words
+PART_OF_SPEECH_DESCRIPTIONS = {
+    "adj-i": "adjective (keiyoushi)",
+    "v1": "Ichidan verb",
+    "v5aru": "Godan verb - -aru special class",
+    "v5b": "Godan verb with `bu' ending",
+    "v5g": "Godan verb with `gu' ending",
+    "v5k": "Godan verb with `ku' ending",
+    "v5k-s": "Godan verb - Iku/Yuku special class",
+    "v5m": "Godan verb with `mu' ending",
+    "v5n": "Godan verb with `nu' ending",
+    "v5r": "Godan verb with `ru' ending",
+    "v5r-i": "Godan verb with `ru' ending (irregular verb)",
+    "v5s": "Godan verb with `su' ending",
+    "v5t": "Godan verb with `tsu' ending",
+    "v5u": "Godan verb with `u' ending",
+    "vk": "Kuru verb - special class",
+    "vs": "noun or participle which takes the aux. verb suru",
+    "vs-i": "suru verb - included",
+    "vs-s": "suru verb - special class",
+}
+_PART_OF_SPEECH_CODES = {
+    description: code
+    for code, description in PART_OF_SPEECH_DESCRIPTIONS.items()
+}
+
 
 def uniq(seq):
     """Return unique elements in the input collection, preserving the order.
@@ -75,6 +105,8 @@ class JMDictResult:
     kanji: list[JMDictKanji]
     readings: list[JMDictReading]
     senses: list[JMDictSense]
+    # set by the deinflected lookups
+    deinflection: Optional[Deinflection] = None
 
     @property
     def tags(self) -> Iterable[str]:
@@ -88,6 +120,110 @@ class JMDictResult:
             + sum([sense.parts_of_speech for sense in self.senses], [])
         )
 
+    @property
+    def item(self) -> list[Any]:
+        """Return the compact representation stored in the index.
+
+        :return: JSON-compatible list
+        """
+        return entry_to_item(self)
+
+
+class LazyJMDictResult(JMDictResult):
+    """A JMDict result backed by its line of the index.
+
+    The line is decoded only once a field is accessed, and the nested kanji,
+    readings and senses are built only for the fields that are used, so that
+    the results rejected by the logic filter, which works on the decoded
+    lists, never build them.
+    """
+
+    # the fields are computed from the line instead
+    # pylint: disable=super-init-not-called
+    def __init__(
+        self, line: str, deinflection: Optional[Deinflection] = None
+    ) -> None:
+        """Initialize self.
+
+        :param line: single line representation of the entry
+        :param deinflection: set by the deinflected lookups
+        """
+        self.line = line
+        self.deinflection = deinflection
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # pickle just the line rather than the decoded fields
+        return (type(self), (self.line, self.deinflection))
+
+    @functools.cached_property
+    def item(self) -> list[Any]:
+        return json.loads(self.line)
+
+    @functools.cached_property
+    def ent_seq(self) -> int:  # type: ignore[override]
+        """Decode the sequence number of the entry.
+
+        :return: sequence number
+        """
+        return self.item[0]
+
+    @functools.cached_property
+    def kanji(self) -> list[JMDictKanji]:  # type: ignore[override]
+        """Decode the kanji spellings of the entry.
+
+        :return: kanji spellings
+        """
+        return _kanji_from_item(self.item[1])
+
+    @functools.cached_property
+    def readings(self) -> list[JMDictReading]:  # type: ignore[override]
+        """Decode the readings of the entry.
+
+        :return: readings
+        """
+        return _readings_from_item(self.item[2])
+
+    @functools.cached_property
+    def senses(self) -> list[JMDictSense]:  # type: ignore[override]
+        """Decode the senses of the entry.
+
+        :return: senses
+        """
+        return _senses_from_item(self.item[3])
+
+
+def entry_to_item(entry: JMDictResult) -> list[Any]:
+    """Convert a JMDict result to the compact representation of the index.
+
+    :param entry: entry to convert
+    :return: JSON-compatible list of the sequence number, kanji, readings and
+        senses
+    """
+    return [
+        entry.ent_seq,
+        [
+            {"k": kanji.kanji, **({"p": kanji.pri} if kanji.pri else {})}
+            for kanji in entry.kanji
+        ],
+        [
+            {
+                "r": reading.reading,
+                **({"p": reading.pri} if reading.pri else {}),
+            }
+            for reading in entry.readings
+        ],
+        [
+            {
+                "m": sense.meanings,
+                "p": sense.parts_of_speech,
+                **({"M": sense.miscellaneous} if sense.miscellaneous else {}),
+                **({"f": sense.fields} if sense.fields else {}),
+                **({"i": sense.information} if sense.information else {}),
+            }
+            for sense in entry.senses
+        ],
+    ]
+
 
 def entry_to_line(entry: JMDictResult) -> str:
     """Convert a JMDict result to a JSONL index line.
@@ -99,68 +235,51 @@ def entry_to_line(entry: JMDictResult) -> str:
     :return: single line representation of the entry
     """
     return json.dumps(
-        [
-            entry.ent_seq,
-            [
-                {"k": kanji.kanji, **({"p": kanji.pri} if kanji.pri else {})}
-                for kanji in entry.kanji
-            ],
-            [
-                {
-                    "r": reading.reading,
-                    **({"p": reading.pri} if reading.pri else {}),
-                }
-                for reading in entry.readings
-            ],
-            [
-                {
-                    "m": sense.meanings,
-                    "p": sense.parts_of_speech,
-                    **(
-                        {"M": sense.miscellaneous}
-                        if sense.miscellaneous
-                        else {}
-                    ),
-                    **({"f": sense.fields} if sense.fields else {}),
-                    **({"i": sense.information} if sense.information else {}),
-                }
-                for sense in entry.senses
-            ],
-        ],
+        entry_to_item(entry),
         ensure_ascii=False,
         check_circular=False,
         separators=(",", ":"),
     )
 
 
+def _kanji_from_item(kanji: list[dict[str, Any]]) -> list[JMDictKanji]:
+    return [
+        JMDictKanji(kanji=item["k"], pri=item.get("p", [])) for item in kanji
+    ]
+
+
+def _readings_from_item(readings: list[dict[str, Any]]) -> list[JMDictReading]:
+    return [
+        JMDictReading(reading=item["r"], pri=item.get("p", []))
+        for item in readings
+    ]
+
+
+def _senses_from_item(senses: list[dict[str, Any]]) -> list[JMDictSense]:
+    return [
+        JMDictSense(
+            meanings=item["m"],
+            parts_of_speech=item["p"],
+            miscellaneous=item.get("M", []),
+            fields=item.get("f", []),
+            information=item.get("i"),
+        )
+        for item in senses
+    ]
+
+
 def entry_from_line(line: str) -> JMDictResult:
     """Convert a JSONL index line to a JMDict result.
 
     :param entry: single line representation of entry
     :return: converted entry
     """
-    item = json.loads(line)
-    ent_seq, kanji, readings, senses = item
+    ent_seq, kanji, readings, senses = json.loads(line)
     return JMDictResult(
         ent_seq=ent_seq,
-        kanji=[
-            JMDictKanji(kanji=kanji["k"], pri=kanji.get("p", []))
-            for kanji in kanji
-        ],
-        readings=[
-            JMDictReading(reading=reading["r"], pri=reading.get("p", []))
-            for reading in readings
-        ],
-        senses=[
-            JMDictSense(
-                meanings=sense["m"],
-                parts_of_speech=sense["p"],
-                miscellaneous=sense.get("M", []),
-                fields=sense.get("f", []),
-                information=sense.get("i"),
-            )
-            for sense in senses
-        ],
+        kanji=_kanji_from_item(kanji),
+        readings=_readings_from_item(readings),
+        senses=_senses_from_item(senses),
     )
 
 
@@ -169,16 +288,26 @@ def download_jmdict_xml_if_needed() -> None:
     if XML_CACHE_PATH.exists():
         return
 
+    # dict.http and requests take a while to import, which the lookups in
+    # the downloaded dictionary can do without
+    # pylint: disable=import-outside-toplevel
+    from dict.http import BLOCK_SIZE, download
+
     XML_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with BytesIO() as handle:
-        download(
-            DOWNLOAD_URL,
-            description="downloading the dictionary",
-            handle=handle,
-        )
-        XML_CACHE_PATH.write_text(
-            gzip.decompress(handle.getvalue()).decode("utf-8")
-        )
+    archive_path = XML_CACHE_PATH.with_name(XML_CACHE_PATH.name + ".gz")
+    download(
+        DOWNLOAD_URL,
+        description="downloading the dictionary",
+        path=archive_path,
+        segments=DOWNLOAD_SEGMENTS,
+    )
+    temp_path = XML_CACHE_PATH.with_name(XML_CACHE_PATH.name + ".tmp")
+    with timing.span("decompress"):
+        with gzip.open(archive_path, "rt", encoding="utf-8") as source:
+            with temp_path.open("w", encoding="utf-8") as target:
+                shutil.copyfileobj(source, target, BLOCK_SIZE)
+    temp_path.replace(XML_CACHE_PATH)
+    archive_path.unlink()
 
 
 def build_entries_from_xml(path: Path) -> Iterable[JMDictResult]:
@@ -227,7 +356,9 @@ def create_jmdict_index_if_needed() -> None:
     if INDEX_CACHE_PATH.exists():
         return
 
-    with INDEX_CACHE_PATH.open("w") as handle:
+    with timing.span("build index"), INDEX_CACHE_PATH.open(
+        "w", encoding="utf-8"
+    ) as handle:
         for entry in build_entries_from_xml(XML_CACHE_PATH):
             print(entry_to_line(entry), file=handle)
 
@@ -240,28 +371,37 @@ def get_result_weight(
     Used to filter and sort the results. Higher values are displayed first.
     Weight set to none means the result shouldn't be displayed.
 
+    The result is matched in its compact representation, so that the lazy
+    results don't build their fields.
+
     :param result: result to get the weight for
     :param logic_pattern: pattern to look for in the result
     :return: result's weight if it matches the logic pattern, None otherwise
     """
-    subject_groups = (
-        [kanji.kanji for kanji in result.kanji],
-        [reading.reading for reading in result.readings],
-        [meaning for sense in result.senses for meaning in sense.meanings],
+    _ent_seq, kanji, readings, senses = result.item
+    if not (
+        any(logic_pattern.search(item["k"]) for item in kanji)
+        or any(logic_pattern.search(item["r"]) for item in readings)
+        or any(
+            logic_pattern.search(meaning)
+            for item in senses
+            for meaning in item["m"]
+        )
+    ):
+        return None
+
+    # only the kanji and the readings carry the priority tags
+    return (
+        any(
+            common_tag in item.get("p", ())
+            for item in kanji + readings
+            for common_tag in COMMON_TAGS
+        ),
+        -(sum(len(item["r"]) for item in readings)) / len(readings),
     )
 
-    for subject_group in subject_groups:
-        if any(logic_pattern.search(subject) for subject in subject_group):
-            return (
-                any(common_tag in result.tags for common_tag in COMMON_TAGS),
-                -(sum(len(reading.reading) for reading in result.readings))
-                / len(result.readings),
-            )
-
-    return None
-
 
-class JMDictEngine(BaseEngine[JMDictResult]):
+class JMDictEngine(OfflineEngine[JMDictResult]):
     """JMDict engine (a Japanese textfile dictionary).
 
     Downloads JMDict UTF-8 gzipped file and transforms it into an index file,
@@ -274,36 +414,53 @@ class JMDictEngine(BaseEngine[JMDictResult]):
 
     names = ["jmdict"]
 
-    def lookup_phrase(
-        self, args: argparse.Namespace, phrase: str
-    ) -> Iterable[JMDictResult]:
+    def get_dictionary_path(self) -> Path:
         download_jmdict_xml_if_needed()
         create_jmdict_index_if_needed()
-
-        physical_pattern = re.compile(
-            phrase.lstrip("^").rstrip("$"), flags=re.I
-        )
-        logic_pattern = re.compile(phrase, flags=re.I)
-
-        results: list[tuple[JMDictResult, Any]] = []
-
-        with INDEX_CACHE_PATH.open("r") as handle:
-            for line in handle:
-                if not physical_pattern.search(line):
-                    continue
-
-                result = entry_from_line(line)
-                weight = get_result_weight(logic_pattern, result)
-                if weight is not None:
-                    results.append((result, weight))
-
-        results.sort(key=lambda item: item[1], reverse=True)
-        return [result for result, weight in results]
+        return INDEX_CACHE_PATH
+
+    def parse_line(self, line: str) -> JMDictResult:
+        return LazyJMDictResult(line)
+
+    def get_result_weight(
+        self, logic_pattern: re.Pattern[str], result: JMDictResult
+    ) -> Optional[Any]:
+        return get_result_weight(logic_pattern, result)
+
+    def get_headwords(self, result: JMDictResult) -> Iterable[str]:
+        _ent_seq, kanji, readings, _senses = result.item
+        for item in kanji:
+            yield item["k"]
+        for item in readings:
+            yield item["r"]
+
+    def get_parts_of_speech(self, result: JMDictResult) -> Iterable[str]:
+        for item in result.item[3]:
+            for part_of_speech in item["p"]:
+                yield _PART_OF_SPEECH_CODES.get(part_of_speech, part_of_speech)
+
+    def annotate_deinflection(
+        self, result: JMDictResult, deinflection: Deinflection
+    ) -> JMDictResult:
+        if isinstance(result, LazyJMDictResult):
+            return LazyJMDictResult(result.line, deinflection)
+        return dataclasses.replace(result, deinflection=deinflection)
+
+    def get_search_terms(self, result: JMDictResult) -> Iterable[str]:
+        _ent_seq, kanji, readings, senses = result.item
+        for item in kanji:
+            yield item["k"]
+        for item in readings:
+            yield item["r"]
+        for item in senses:
+            yield from item["m"]
 
     def print_results(
         self, results: Iterable[JMDictResult], file: IO[str]
     ) -> None:
         for result in results:
+            if result.deinflection:
+                print(result.deinflection, file=file)
             for kanji in result.kanji:
                 print(COLOR_HIGHLIGHT, end="", file=file)
                 print(kanji.kanji, end="", file=file)
@@ -317,7 +474,7 @@ class JMDictEngine(BaseEngine[JMDictResult]):
             print("]", file=file)
             for sense in result.senses:
                 if sense.information:
-                    print(sense.information)
+                    print(sense.information, file=file)
                 for meaning in sense.meanings:
                     print(meaning, file=file)
             print(file=file)
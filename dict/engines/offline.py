@@ -0,0 +1,952 @@
+"""Base of the engines using local dictionary files."""
+import argparse
+import dataclasses
+import re
+import sys
+import threading
+from array import array
+from collections.abc import Hashable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Optional, Union
+
+from dict import timing
+from dict.cache import DiskResultCache, ResultCache
+from dict.deinflect import Deinflection, deinflect
+from dict.engines.base import BaseEngine, TResult
+from dict.planner import (
+    PLAN_FULL_SCAN,
+    PLAN_FUZZY,
+    PLAN_INDEX,
+    PLAN_LITERAL_SCAN,
+    PLAN_REFINE,
+    Candidates,
+    QueryPlan,
+    plan_query,
+)
+from dict.trigram import TrigramIndex, fold
+
+# the candidates of a query are remembered only if they take at most this
+# fraction of the dictionary, to bound the memory overhead
+MAX_CANDIDATES_FRACTION = 0.25
+
+_RE_SPECIAL = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+_CACHE: dict[Path, tuple[tuple[int, int], str]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _get_version(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_dictionary(path: Path) -> str:
+    """Read a dictionary file, keeping its contents in memory.
+
+    Subsequent calls return the same text without touching the disk, unless
+    the file has been modified in the meantime, so that long running
+    processes answer lookups without reloading the dictionary.
+
+    :param path: path to the dictionary file
+    :return: contents of the file
+    """
+    version = _get_version(path)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        text = path.read_text(encoding="utf-8")
+        _CACHE[path] = (version, text)
+        return text
+
+
+def iter_matching_lines(text: str, pattern: re.Pattern[str]) -> Iterator[str]:
+    """Find the lines matching a pattern, as if each line was searched
+    separately.
+
+    Searching the whole text at once is much faster than searching each line
+    on its own. The pattern should be compiled with re.MULTILINE, so that ^
+    and $ match at the line boundaries. A match that spans several lines
+    yields the line it begins on; the callers are expected to verify the
+    yielded lines anyway.
+
+    :param text: text to search
+    :param pattern: pattern to look for
+    :return: a generator of matching lines, including the line terminators
+    """
+    pos = 0
+    while match := pattern.search(text, pos):
+        start = text.rfind("\n", 0, match.start()) + 1
+        if start == len(text):
+            break
+        end = text.find("\n", match.start())
+        end = len(text) if end == -1 else end + 1
+        yield text[start:end]
+        if end >= len(text):
+            break
+        pos = end
+
+
+def iter_lines_containing(
+    text: str, haystack: str, literal: str
+) -> Iterator[str]:
+    """Find the lines containing a literal.
+
+    :param text: text to return the lines of
+    :param haystack: text to search, of the same length as the text, e.g.
+        the text itself or its lowercase version
+    :param literal: substring to look for
+    :return: a generator of matching lines, including the line terminators
+    """
+    pos = 0
+    while (index := haystack.find(literal, pos)) != -1:
+        start = haystack.rfind("\n", 0, index) + 1
+        end = haystack.find("\n", index)
+        end = len(text) if end == -1 else end + 1
+        yield text[start:end]
+        pos = end
+
+
+def fold_ascii(text: str) -> str:
+    """Convert a text to lowercase without changing its length, so that
+    searching it for a lowercase ASCII substring finds the case-insensitive
+    matches of the substring.
+
+    :param text: text to convert
+    :return: lowercase text
+    """
+    # the dotted I is the only character whose lowercase version is longer,
+    # and the dotless i and the long s are matched by re.IGNORECASE as i and s
+    return (
+        text.replace("\u0130", "i")
+        .lower()
+        .replace("\u0131", "i")
+        .replace("\u017f", "s")
+    )
+
+
+def get_trie_pattern(literals: Iterable[str]) -> str:
+    """Combine the literals into a regular expression matching any of them.
+
+    The alternatives sharing a prefix are nested under it, e.g. "eat(?:en)?"
+    for "eat" and "eaten", so that the regular expression engine follows
+    only the branches matching the next character instead of trying every
+    literal at every position. At each position, the longest literal is
+    matched. The literals are compared as they are, so to match them
+    case-insensitively, their case must be folded first; otherwise "Eat" and
+    "eaten" end up in separate branches, and only the first one is tried.
+
+    :param literals: non-empty literals
+    :return: pattern matching any of the literals
+    """
+    trie: dict[str, Any] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _get_node_pattern(trie)
+
+
+def _get_node_pattern(node: dict[str, Any]) -> str:
+    alternatives = [
+        re.escape(char) + _get_node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    group = "(?:" + "|".join(alternatives) + ")"
+    if "" in node:
+        return group + "?" if alternatives else ""
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return group
+
+
+def find_lines_containing_any(
+    text: str, literals: Iterable[str]
+) -> dict[str, dict[int, str]]:
+    """Find the lines containing each of the literals in a single pass.
+
+    :param text: text to search
+    :param literals: non-empty literals to look for, matched
+        case-insensitively
+    :return: the lines containing each literal, by their offsets in the
+        text, in the order of their occurrence
+    """
+    literals = set(literals)
+    hits: dict[str, dict[int, str]] = {}
+    for literal in literals:
+        hits.setdefault(fold(literal), {})
+    # unlike fold(), fold_ascii() keeps the lengths of the literals
+    folded = {fold_ascii(literal) for literal in literals}
+    lengths = sorted({len(literal) for literal in folded})
+    pattern = re.compile(get_trie_pattern(folded), re.I)
+    for line_start, line, found in _iter_line_matches(text, pattern):
+        # the shorter literals matching at the same position are the
+        # prefixes of the longest one
+        for length in lengths:
+            if length > len(found):
+                break
+            lines = hits.get(fold(found[:length]))
+            if lines is not None:
+                lines[line_start] = line
+    return {literal: hits[fold(literal)] for literal in literals}
+
+
+def _iter_line_matches(
+    text: str, pattern: re.Pattern[str]
+) -> Iterator[tuple[int, str, str]]:
+    line_start = line_end = 0
+    line = ""
+    pos = 0
+    while match := pattern.search(text, pos):
+        start = match.start()
+        if start >= line_end:
+            line_start = text.rfind("\n", 0, start) + 1
+            line_end = text.find("\n", start)
+            line_end = len(text) if line_end == -1 else line_end + 1
+            line = text[line_start:line_end]
+        yield line_start, line, match.group()
+        # the next occurrence may overlap this one, e.g. "ten" in "eaten"
+        pos = start + 1
+
+
+def is_refinement(previous: str, phrase: str) -> bool:
+    """Check whether every line containing the phrase also contains the
+    previous phrase, both being matched case-insensitively.
+
+    Only literal phrases are compared; for the others, the answer is False.
+
+    :param previous: previous phrase
+    :param phrase: new phrase
+    :return: whether the phrase refines the previous one
+    """
+    if _RE_SPECIAL.search(previous) or _RE_SPECIAL.search(phrase):
+        return False
+    if previous in phrase:
+        return True
+    # the case conversion of some non-ASCII characters changes their length,
+    # which makes the containment check unreliable
+    return (
+        previous.isascii()
+        and phrase.isascii()
+        and previous.lower() in phrase.lower()
+    )
+
+
+@dataclass(frozen=True)
+class _LiteralQuery:
+    literals: list[str]
+    logic_pattern: re.Pattern[str]
+    deinflections: dict[str, list[Deinflection]]
+
+
+def _get_literal_query(
+    args: argparse.Namespace, phrase: str
+) -> Optional[_LiteralQuery]:
+    if getattr(args, "fuzzy", 0) > 0:
+        return None
+    if getattr(args, "deinflect", False):
+        with timing.span("deinflect"):
+            deinflections = _group_deinflections(phrase)
+        return _LiteralQuery(
+            list(deinflections),
+            re.compile(_get_deinflection_phrase(deinflections), flags=re.I),
+            deinflections,
+        )
+    if phrase and not _RE_SPECIAL.search(phrase):
+        return _LiteralQuery([phrase], re.compile(phrase, flags=re.I), {})
+    return None
+
+
+def _group_deinflections(word: str) -> dict[str, list[Deinflection]]:
+    ret: dict[str, list[Deinflection]] = {}
+    for deinflection in deinflect(word):
+        ret.setdefault(deinflection.term, []).append(deinflection)
+    return ret
+
+
+def _get_deinflection_phrase(
+    deinflections: dict[str, list[Deinflection]]
+) -> str:
+    return "^(?:" + "|".join(map(re.escape, deinflections)) + ")$"
+
+
+@dataclass
+class SearchStats:
+    """Counters of the search funnel of an offline engine.
+
+    Each stage narrows down the entries passed on by the previous one; the
+    ratios between the stages tell how selective the heuristics are.
+    """
+
+    lookups: int = 0
+    lines_scanned: int = 0  # physical lines searched for the phrase
+    physical_hits: int = 0  # physical lines containing the phrase
+    lines_parsed: int = 0  # hits parsed into logic entries
+    logic_matches: int = 0  # entries matching the phrase in their fields
+    results_returned: int = 0
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        """Return the fraction of the physical hits that are actual matches.
+
+        :return: precision of the physical prefilter, if there were any hits
+        """
+        if not self.physical_hits:
+            return None
+        return self.logic_matches / self.physical_hits
+
+    def add(self, other: "SearchStats") -> None:
+        """Add the counters of another search to self.
+
+        :param other: counters to add
+        """
+        for field in dataclasses.fields(self):
+            setattr(
+                self,
+                field.name,
+                getattr(self, field.name) + getattr(other, field.name),
+            )
+
+    def format(self) -> str:
+        """Format the counters as a single line.
+
+        :return: human readable summary
+        """
+        hit_ratio = self.hit_ratio
+        return (
+            f"lines scanned: {self.lines_scanned}, "
+            f"physical hits: {self.physical_hits}, "
+            f"lines parsed: {self.lines_parsed}, "
+            f"logic matches: {self.logic_matches}"
+            + (f" ({hit_ratio:.0%} of hits)" if hit_ratio is not None else "")
+            + f", results returned: {self.results_returned}"
+        )
+
+
+def _get_diagnostics_file(args: argparse.Namespace) -> IO[str]:
+    # the daemon sends the diagnostics of a lookup to its client
+    return getattr(args, "diagnostics_file", None) or sys.stderr
+
+
+class _TextViews:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._line_starts: Optional[array] = None
+        self._folded: Optional[str] = None
+
+    def get_line_starts(self) -> array:
+        """Find the physical lines of the text, upon the first call.
+
+        :return: offsets of the lines
+        """
+        if self._line_starts is None:
+            starts = array("Q", [0])
+            starts.extend(
+                match.end() for match in re.finditer("\n", self.text)
+            )
+            if starts[-1] == len(self.text):
+                starts.pop()
+            self._line_starts = starts
+        return self._line_starts
+
+    def get_folded(self) -> str:
+        """Fold the case of the text, upon the first call.
+
+        :return: the text with its case folded, of the same length
+        """
+        if self._folded is None:
+            self._folded = fold_ascii(self.text)
+        return self._folded
+
+
+class OfflineEngine(BaseEngine[TResult]):
+    """Base engine for the dictionaries whose entries are stored one per
+    physical line of a local file.
+
+    The search process is divided into two steps: first the physical lines
+    are filtered by checking if they contain a given phrase. The ones that
+    match are then parsed into logic entries and further filtered, this time
+    within specific fields.
+
+    The lines matched by the last query are remembered, so that when the next
+    query refines it, e.g. "tabe" followed by "taber", only these lines are
+    searched again rather than the whole dictionary. Otherwise, only the
+    lines containing the literals required by the query are searched, found
+    with a substring search or, with --index, in the trigram index of the
+    dictionary (see dict.planner).
+
+    With --fuzzy, the entries are looked up in a trigram index of their
+    search terms instead, which tolerates typos. The index is built upon the
+    first such lookup and saved next to the dictionary file.
+
+    With --deinflect, the entries are looked up by the candidate dictionary
+    forms of a conjugated Japanese word, all at once, and annotated with the
+    conjugations leading to the word (see dict.deinflect).
+
+    With --stats, or if collect_search_stats is set, the number of entries
+    passing each step is counted in last_search_stats for the last lookup and
+    in search_stats for all the lookups so far.
+    """
+
+    cache_key_args = ["fuzzy", "deinflect"]
+
+    # counting the lines of a full scan takes another pass over the text
+    collect_search_stats = False
+
+    # the results are invalidated by the dictionary version instead
+    result_cache_ttl = None
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        super().__init__()
+        self.last_search_stats: Optional[SearchStats] = None
+        self.search_stats = SearchStats()
+        self._candidates: Optional[Candidates] = None
+        self._text_views: Optional[_TextViews] = None
+        self._trigram_index: Optional[TrigramIndex] = None
+        self._stats_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+
+    @staticmethod
+    def decorate_arg_parser(parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help=(
+                "print the number of entries passing each step of the search "
+                "to stderr; bypasses the result cache"
+            ),
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help=(
+                "print the way of searching the dictionary to stderr; "
+                "bypasses the result cache"
+            ),
+        )
+        parser.add_argument(
+            "--index",
+            action="store_true",
+            help=(
+                "look up the literals of the phrase in a trigram index, "
+                "loading or building it first; pays off in the long running "
+                "modes"
+            ),
+        )
+        parser.add_argument(
+            "--fuzzy",
+            type=int,
+            default=0,
+            metavar="N",
+            help=(
+                "find the entries with a reading, spelling or meaning "
+                "within N typos of the phrase, which is taken literally"
+            ),
+        )
+        parser.add_argument(
+            "--deinflect",
+            action="store_true",
+            help=(
+                "find the dictionary forms of a conjugated Japanese word, "
+                "e.g. 食べる for 食べられなかった; the phrase is taken literally"
+            ),
+        )
+
+    def get_result_caches(
+        self, args: argparse.Namespace
+    ) -> list[Union[ResultCache, DiskResultCache]]:
+        if getattr(args, "stats", False) or getattr(args, "explain", False):
+            return []  # report an actual search
+        return super().get_result_caches(args)
+
+    def get_data_version(self) -> Hashable:
+        path = self.get_dictionary_path()
+        stat = path.stat()
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    def get_dictionary_path(self) -> Path:
+        """Prepare the dictionary file, e.g. by downloading it.
+
+        :return: path to the dictionary file
+        """
+        raise NotImplementedError("not implemented")  # pragma: no cover
+
+    def parse_line(self, line: str) -> TResult:
+        """Parse a physical line of the dictionary into a result.
+
+        :param line: line to parse
+        :return: parsed entry
+        """
+        raise NotImplementedError("not implemented")  # pragma: no cover
+
+    def get_result_weight(
+        self, logic_pattern: re.Pattern[str], result: TResult
+    ) -> Optional[Any]:
+        """Return a weight for a given result and a logic pattern.
+
+        :param logic_pattern: pattern to look for in the result
+        :param result: result to get the weight for
+        :return: result's weight if it matches the logic pattern, None
+            otherwise; higher values are displayed first
+        """
+        raise NotImplementedError("not implemented")  # pragma: no cover
+
+    def get_search_terms(self, result: TResult) -> Iterable[str]:
+        """Return the terms of a result to be found by the fuzzy lookups.
+
+        :param result: parsed entry
+        :return: the fields matched by get_result_weight, such as readings,
+            spellings and meanings
+        """
+        raise NotImplementedError("not implemented")  # pragma: no cover
+
+    def get_headwords(self, result: TResult) -> Iterable[str]:
+        """Return the forms of a result to be found by the deinflected
+        lookups.
+
+        :param result: parsed entry
+        :return: spellings and readings
+        """
+        raise NotImplementedError("not implemented")  # pragma: no cover
+
+    def get_parts_of_speech(self, result: TResult) -> Iterable[str]:
+        """Return the parts of speech of a result.
+
+        :param result: parsed entry
+        :return: EDICT2 codes of the parts of speech, such as v1 or adj-i
+        """
+        raise NotImplementedError("not implemented")  # pragma: no cover
+
+    def annotate_deinflection(
+        self, result: TResult, deinflection: Deinflection
+    ) -> TResult:
+        """Attach the conjugations of the looked up word to a result.
+
+        :param result: parsed entry
+        :param deinflection: the dictionary form matching the entry
+        :return: annotated result
+        """
+        raise NotImplementedError("not implemented")  # pragma: no cover
+
+    def match_deinflection(
+        self, result: TResult, deinflections: dict[str, list[Deinflection]]
+    ) -> Optional[Deinflection]:
+        """Find the candidate dictionary form matching a result.
+
+        :param result: parsed entry
+        :param deinflections: candidate dictionary forms, by their terms
+        :return: the candidate with the shortest chain among the ones
+            spelled as one of the headwords of the result and having one of
+            its parts of speech, if any
+        """
+        parts_of_speech: Optional[set[str]] = None
+        ret: Optional[Deinflection] = None
+        for headword in self.get_headwords(result):
+            for deinflection in deinflections.get(headword, []):
+                if ret is not None and len(ret.chain) <= len(
+                    deinflection.chain
+                ):
+                    continue
+                if deinflection.parts_of_speech:
+                    if parts_of_speech is None:
+                        parts_of_speech = set(self.get_parts_of_speech(result))
+                    if parts_of_speech.isdisjoint(
+                        deinflection.parts_of_speech
+                    ):
+                        continue
+                ret = deinflection
+        return ret
+
+    def plan_query(
+        self, args: argparse.Namespace, path: Path, text: str, phrase: str
+    ) -> QueryPlan:
+        """Choose the way of finding the lines possibly matching the phrase.
+
+        :param args: parsed command line arguments
+        :param path: path to the dictionary file
+        :param text: contents of the dictionary
+        :param phrase: regular expression to look for, matched
+            case-insensitively
+        :return: the plan
+        """
+        candidates = self._candidates
+        if (
+            candidates
+            and candidates.text is text
+            and is_refinement(
+                candidates.phrase, phrase.lstrip("^").rstrip("$")
+            )
+        ):
+            return QueryPlan(PLAN_REFINE, candidates=candidates)
+
+        index = self._trigram_index
+        if getattr(args, "index", False):
+            index = self.get_trigram_index(path, text)
+        elif index is not None and index.version != _get_version(path):
+            index = None
+        return plan_query(phrase, index)
+
+    def find_lines(
+        self,
+        text: str,
+        phrase: str,
+        stats: Optional[SearchStats] = None,
+        plan: Optional[QueryPlan] = None,
+    ) -> list[str]:
+        """Find the physical lines of the dictionary containing the phrase.
+
+        :param text: contents of the dictionary
+        :param phrase: regular expression to look for, matched
+            case-insensitively
+        :param stats: counters to update with the number of the searched and
+            the matching lines
+        :param plan: way of finding the lines, by default the refinement of
+            the previous query if possible, otherwise the full scan
+        :return: matching lines
+        """
+        pattern = re.compile(phrase, flags=re.I | re.M)
+        if plan is None:
+            # the engine is shared by the threads of the daemon and the
+            # server, so the candidates are read only once
+            candidates = self._candidates
+            if (
+                candidates
+                and candidates.text is text
+                and is_refinement(candidates.phrase, phrase)
+            ):
+                plan = QueryPlan(PLAN_REFINE, candidates=candidates)
+            else:
+                plan = QueryPlan(PLAN_FULL_SCAN)
+
+        lines_scanned = 0
+        if plan.strategy == PLAN_REFINE:
+            assert plan.candidates
+            lines = list(iter_matching_lines(plan.candidates.lines, pattern))
+            lines_scanned = plan.candidates.line_count
+        elif plan.strategy in (PLAN_INDEX, PLAN_LITERAL_SCAN):
+            found = self._find_candidate_lines(text, plan)
+            lines = list(iter_matching_lines("".join(found), pattern))
+            lines_scanned = len(found)
+        else:
+            lines = list(iter_matching_lines(text, pattern))
+            if stats is not None:
+                lines_scanned = len(self._get_line_starts(text))
+
+        joined = "".join(lines)
+        if len(joined) <= len(text) * MAX_CANDIDATES_FRACTION:
+            self._candidates = Candidates(
+                text=text, phrase=phrase, lines=joined, line_count=len(lines)
+            )
+        else:
+            self._candidates = None
+
+        if stats is not None:
+            stats.lines_scanned += lines_scanned
+            stats.physical_hits += len(lines)
+        return lines
+
+    def _find_candidate_lines(self, text: str, plan: QueryPlan) -> list[str]:
+        if plan.strategy == PLAN_INDEX:
+            assert plan.index
+            trigrams: set[str] = set()
+            for literal in plan.literals:
+                trigrams.update(literal.get_trigrams())
+            return self._get_lines(
+                text, plan.index.find_lines_containing(trigrams)
+            )
+
+        (literal,) = plan.literals
+        needle = literal.text.lower()
+        if needle == literal.text.upper():
+            # no cased characters, e.g. kana, so the text can be searched
+            # as it is
+            return list(iter_lines_containing(text, text, needle))
+        folded = self._get_text_views(text).get_folded()
+        return list(iter_lines_containing(text, folded, needle))
+
+    def _get_lines(self, text: str, line_numbers: Iterable[int]) -> list[str]:
+        starts = self._get_line_starts(text)
+        lines = []
+        for line_number in line_numbers:
+            end = (
+                starts[line_number + 1]
+                if line_number + 1 < len(starts)
+                else len(text)
+            )
+            lines.append(text[starts[line_number] : end])
+        return lines
+
+    def _get_line_starts(self, text: str) -> array:
+        return self._get_text_views(text).get_line_starts()
+
+    def _get_text_views(self, text: str) -> _TextViews:
+        # finding the lines and folding the case take a while, so they are
+        # done once per dictionary version
+        views = self._text_views
+        if views is None or views.text is not text:
+            views = self._text_views = _TextViews(text)
+        return views
+
+    def get_trigram_index(self, path: Path, text: str) -> TrigramIndex:
+        """Load or build the trigram index of the dictionary.
+
+        :param path: path to the dictionary file
+        :param text: contents of the dictionary
+        :return: the index
+        """
+        version = _get_version(path)
+        with self._index_lock:
+            index = self._trigram_index
+            if index is not None and index.version == version:
+                return index
+            index_path = path.with_name(path.name + ".trigrams")
+            index = TrigramIndex.load(index_path, version)
+            if index is None:
+                with timing.span("build trigram index"):
+                    index = TrigramIndex.build(
+                        version, map(self._get_line_terms, text.split("\n"))
+                    )
+                index.save(index_path)
+            self._trigram_index = index
+            return index
+
+    def _get_line_terms(self, line: str) -> Iterable[str]:
+        if not line:
+            return []
+        try:
+            return self.get_search_terms(self.parse_line(line + "\n"))
+        except (IndexError, KeyError, ValueError):
+            return []  # not an entry, e.g. the header of EDICT2
+
+    def find_fuzzy_lines(
+        self,
+        path: Path,
+        text: str,
+        phrase: str,
+        max_distance: int,
+        stats: Optional[SearchStats] = None,
+    ) -> dict[str, int]:
+        """Find the physical lines of the dictionary with a search term
+        within a given edit distance of the phrase.
+
+        :param path: path to the dictionary file
+        :param text: contents of the dictionary
+        :param phrase: phrase to look for
+        :param max_distance: maximum number of edits
+        :param stats: counters to update with the number of the matching
+            lines
+        :return: edit distance of the closest term of each matching line
+        """
+        index = self.get_trigram_index(path, text)
+        distances = sorted(index.find_lines(phrase, max_distance).items())
+        lines = self._get_lines(
+            text, (line_number for line_number, _distance in distances)
+        )
+        ret = {
+            line: distance
+            for line, (_line_number, distance) in zip(lines, distances)
+        }
+        if stats is not None:
+            stats.physical_hits += len(ret)
+        return ret
+
+    def lookup_phrase(
+        self, args: argparse.Namespace, phrase: str
+    ) -> Iterable[TResult]:
+        with timing.span("prepare dictionary"):
+            path = self.get_dictionary_path()
+        with timing.span("read dictionary"):
+            text = read_dictionary(path)
+        stats = (
+            SearchStats(lookups=1) if self._is_counting_stats(args) else None
+        )
+
+        max_distance: int = getattr(args, "fuzzy", 0)
+        distances: dict[str, int] = {}
+        deinflections: dict[str, list[Deinflection]] = {}
+        if max_distance > 0:
+            self.explain(args, QueryPlan(PLAN_FUZZY))
+            with timing.span("fuzzy search"):
+                distances = self.find_fuzzy_lines(
+                    path, text, phrase, max_distance, stats
+                )
+            lines = list(distances)
+            # the index has already matched the terms, the pattern is used
+            # only to weigh the results
+            logic_pattern = re.compile("")
+        else:
+            if getattr(args, "deinflect", False):
+                with timing.span("deinflect"):
+                    deinflections = _group_deinflections(phrase)
+                # look up all the candidates in a single pass
+                phrase = _get_deinflection_phrase(deinflections)
+            logic_pattern = re.compile(phrase, flags=re.I)
+            with timing.span("plan"):
+                plan = self.plan_query(args, path, text, phrase)
+            self.explain(args, plan)
+            with timing.span("scan"):
+                lines = self.find_lines(
+                    text, phrase.lstrip("^").rstrip("$"), stats, plan
+                )
+
+        with timing.span("parse", lines=len(lines)):
+            parsed = [self.parse_line(line) for line in lines]
+        with timing.span("rank"):
+            results = self.rank_results(
+                logic_pattern, lines, parsed, distances, deinflections
+            )
+
+        if stats is not None:
+            stats.lines_parsed = len(parsed)
+            stats.logic_matches = stats.results_returned = len(results)
+            self.record_search_stats(args, stats)
+        return results
+
+    def lookup_many(
+        self, args: argparse.Namespace, phrases: Iterable[str]
+    ) -> dict[str, list[TResult]]:
+        """Look up many phrases at once, scanning the dictionary only once.
+
+        The literal phrases, or the candidate dictionary forms of each phrase
+        with --deinflect, are combined into a single pattern, and each line
+        it finds is passed on to the phrases it contains. The other phrases,
+        such as the regular expressions, as well as all the phrases with
+        --fuzzy, are looked up one by one.
+
+        :param args: parsed command line arguments
+        :param phrases: phrases to look up
+        :return: the results of each distinct phrase, the same as the ones of
+            lookup_phrase, in the order of the phrases
+        """
+        with timing.span("prepare dictionary"):
+            path = self.get_dictionary_path()
+        with timing.span("read dictionary"):
+            text = read_dictionary(path)
+
+        queries: dict[str, _LiteralQuery] = {}
+        ret: dict[str, list[TResult]] = {}
+        for phrase in phrases:
+            if phrase not in ret:
+                ret[phrase] = []
+                query = _get_literal_query(args, phrase)
+                if query is not None:
+                    queries[phrase] = query
+        for phrase in ret:
+            if phrase not in queries:
+                ret[phrase] = list(self.lookup_phrase(args, phrase))
+        if queries:
+            ret.update(self._lookup_literal_queries(args, text, queries))
+        return ret
+
+    def _lookup_literal_queries(
+        self,
+        args: argparse.Namespace,
+        text: str,
+        queries: dict[str, _LiteralQuery],
+    ) -> dict[str, list[TResult]]:
+        ret: dict[str, list[TResult]] = {}
+        stats = SearchStats(lookups=len(queries))
+        with timing.span("scan", phrases=len(queries)):
+            hits = find_lines_containing_any(
+                text,
+                (
+                    literal
+                    for query in queries.values()
+                    for literal in query.literals
+                ),
+            )
+        if self._is_counting_stats(args):
+            stats.lines_scanned = len(self._get_line_starts(text))
+
+        # a line found for several phrases is parsed only once
+        parsed: dict[int, TResult] = {}
+        for phrase, query in queries.items():
+            lines: dict[int, str] = {}
+            for literal in query.literals:
+                lines.update(hits[literal])
+            offsets = sorted(lines)
+            with timing.span("parse", lines=len(offsets)):
+                for offset in offsets:
+                    if offset not in parsed:
+                        parsed[offset] = self.parse_line(lines[offset])
+            with timing.span("rank"):
+                ret[phrase] = self.rank_results(
+                    query.logic_pattern,
+                    [lines[offset] for offset in offsets],
+                    [parsed[offset] for offset in offsets],
+                    {},
+                    query.deinflections,
+                )
+            stats.physical_hits += len(offsets)
+            stats.logic_matches += len(ret[phrase])
+        stats.lines_parsed = len(parsed)
+        stats.results_returned = stats.logic_matches
+
+        if self._is_counting_stats(args):
+            self.record_search_stats(args, stats)
+        return ret
+
+    def rank_results(
+        self,
+        logic_pattern: re.Pattern[str],
+        lines: list[str],
+        parsed: list[TResult],
+        distances: dict[str, int],
+        deinflections: dict[str, list[Deinflection]],
+    ) -> list[TResult]:
+        """Filter the parsed lines with the full pattern and sort them.
+
+        :param logic_pattern: pattern the results must match
+        :param lines: candidate lines
+        :param parsed: results parsed from the lines
+        :param distances: edit distances of the fuzzy matches, by the lines
+        :param deinflections: candidate dictionary forms, by the terms
+        :return: the matching results, the closest and heaviest first
+        """
+        results: list[tuple[TResult, Any]] = []
+        for line, result in zip(lines, parsed):
+            weight = self.get_result_weight(logic_pattern, result)
+            if weight is None:
+                continue
+            # the closest matches go first
+            distance = distances.get(line, 0)
+            if deinflections:
+                match = self.match_deinflection(result, deinflections)
+                if match is None:
+                    continue
+                if match.chain:
+                    result = self.annotate_deinflection(result, match)
+                distance = len(match.chain)
+            results.append((result, (-distance, weight)))
+        results.sort(key=lambda item: item[1], reverse=True)
+        return [result for result, _weight in results]
+
+    def explain(self, args: argparse.Namespace, plan: QueryPlan) -> None:
+        """Print the plan of a lookup if requested.
+
+        :param args: parsed command line arguments
+        :param plan: chosen plan
+        """
+        if getattr(args, "explain", False):
+            print(f"plan: {plan}", file=_get_diagnostics_file(args))
+
+    def _is_counting_stats(self, args: argparse.Namespace) -> bool:
+        return self.collect_search_stats or getattr(args, "stats", False)
+
+    def record_search_stats(
+        self, args: argparse.Namespace, stats: SearchStats
+    ) -> None:
+        """Remember the counters of a lookup and print them if requested.
+
+        :param args: parsed command line arguments
+        :param stats: counters of the lookup
+        """
+        with self._stats_lock:
+            self.last_search_stats = stats
+            self.search_stats.add(stats)
+        if getattr(args, "stats", False):
+            print(stats.format(), file=_get_diagnostics_file(args))
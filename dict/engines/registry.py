@@ -0,0 +1,107 @@
+"""Registry of the dictionary engines.
+
+Engines are identified by their names and imported only when needed, so that
+looking up a phrase with one engine does not pay for importing the
+dependencies of all the others. Besides the built-in engines, third party
+packages can provide their own engines through the "dict.engines" entry point
+group, where the entry point name is the engine name and its value points to
+a BaseEngine subclass.
+"""
+import functools
+import importlib
+from collections.abc import Collection, Iterator
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dict.engines.base import BaseEngine
+
+ENTRY_POINT_GROUP = "dict.engines"
+
+BUILTIN_ENGINES = {
+    "edict": "dict.engines.edict2:Edict2Engine",
+    "edict2": "dict.engines.edict2:Edict2Engine",
+    "jisho": "dict.engines.jisho:JishoEngine",
+    "jmdict": "dict.engines.jmdict:JMDictEngine",
+    "reverso": "dict.engines.reverso:ReversoEngine",
+    "sjp": "dict.engines.sjp:SJPEngine",
+    "synonim": "dict.engines.synonim:SynonimEngine",
+    "urban": "dict.engines.urban:UrbanEngine",
+    "wordhippo": "dict.engines.wordhippo:WordHippoEngine",
+}
+
+_LOADED_ENGINES: dict[str, type["BaseEngine[Any]"]] = {}
+
+
+def register_engine(cls: type["BaseEngine[Any]"]) -> None:
+    """Make an already imported engine available under its names.
+
+    Called automatically for every BaseEngine subclass.
+
+    :param cls: engine class to register
+    """
+    for name in cls.names:
+        _LOADED_ENGINES[name] = cls
+
+
+@functools.lru_cache(maxsize=None)
+def get_plugin_engines() -> dict[str, str]:
+    """Return the engines provided by the installed packages.
+
+    :return: a mapping of the engine names to their import paths
+    """
+    # pylint: disable=import-outside-toplevel
+    from importlib.metadata import entry_points
+
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, "select"):
+        group = all_entry_points.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10
+        group = all_entry_points.get(ENTRY_POINT_GROUP, [])  # type: ignore
+    return {entry_point.name: entry_point.value for entry_point in group}
+
+
+def get_engine_names() -> list[str]:
+    """Return the names of all the available engines.
+
+    :return: engine names
+    """
+    names = [*BUILTIN_ENGINES, *get_plugin_engines(), *_LOADED_ENGINES]
+    return list(dict.fromkeys(names))
+
+
+def load_engine(name: str) -> type["BaseEngine[Any]"]:
+    """Import the engine with the given name.
+
+    :param name: engine name
+    :return: engine class
+    """
+    if name in _LOADED_ENGINES:
+        return _LOADED_ENGINES[name]
+    path = BUILTIN_ENGINES.get(name) or get_plugin_engines().get(name)
+    if not path:
+        raise KeyError(f"unknown engine: {name}")
+    module_name, _, class_name = path.partition(":")
+    cls = getattr(importlib.import_module(module_name), class_name)
+    _LOADED_ENGINES[name] = cls
+    return cls
+
+
+class EngineNames(Collection[str]):
+    """A lazy collection of the engine names, suitable for argparse choices.
+
+    Checking whether a built-in or an already imported engine is available
+    does not scan the installed packages for plugins.
+    """
+
+    def __contains__(self, name: object) -> bool:
+        return (
+            name in _LOADED_ENGINES
+            or name in BUILTIN_ENGINES
+            or name in get_plugin_engines()
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(get_engine_names())
+
+    def __len__(self) -> int:
+        return len(get_engine_names())
@@ -5,12 +5,13 @@ from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import IO
 
-import lxml.etree
-import requests
+from lxml.cssselect import CSSSelector
 
+from dict import http
+from dict.cache import DEFAULT_NEGATIVE_CACHE_TTL
 from dict.colors import COLOR_HIGHLIGHT, COLOR_RESET
 from dict.engines.base import BaseEngine
-from dict.text import expand_sgml, strip_html
+from dict.html import css_matcher, get_text, iter_response_elements
 
 BASE_URL = "http://context.reverso.net/translation"
 USER_AGENT = (
@@ -32,6 +33,11 @@ LANG_MAP = {
     "ru": "russian",
 }
 
+_IS_EXAMPLE = css_matcher("div.example")
+_SELECT_SOURCE = CSSSelector("div.src span.text", translator="html")
+_SELECT_TARGET = CSSSelector("div.trg span.text", translator="html")
+_HIGHLIGHT = (COLOR_HIGHLIGHT, COLOR_RESET)
+
 
 @dataclass
 class ReversoResult:
@@ -41,19 +47,12 @@ class ReversoResult:
     target: str
 
 
-def _format_html(node: lxml.etree.Element) -> str:
-    html = lxml.etree.tostring(node, encoding="unicode")
-    html = html.replace("<em>", COLOR_HIGHLIGHT).replace("</em>", COLOR_RESET)
-    html = expand_sgml(html)
-    html = strip_html(html)
-    html = html.strip()
-    return html
-
-
 class ReversoEngine(BaseEngine[ReversoResult]):
     """Reverso.net engine."""
 
     names = ["reverso"]
+    cache_key_args = ["src_lang", "dst_lang", "conjugate"]
+    negative_cache_ttl = DEFAULT_NEGATIVE_CACHE_TTL
 
     @staticmethod
     def decorate_arg_parser(parser: argparse.ArgumentParser) -> None:
@@ -93,22 +92,28 @@ class ReversoEngine(BaseEngine[ReversoResult]):
             f"{urllib.parse.quote(phrase)}?d={conjugate:d}"
         )
 
-        response = requests.get(
-            url, {"d": int(conjugate)}, headers={"User-Agent": USER_AGENT}
+        response = http.get(
+            url,
+            {"d": int(conjugate)},
+            headers={"User-Agent": USER_AGENT},
+            stream=True,
         )
-        if response.status_code == 404:
-            return
-        response.raise_for_status()
-        content = response.text
-
-        doc = lxml.etree.HTML(content)
-        for example_node in doc.cssselect("div.example"):
-            src_node = example_node.cssselect("div.src span.text")[0]
-            dst_node = example_node.cssselect("div.trg span.text")[0]
-            yield ReversoResult(
-                source=_format_html(src_node),
-                target=_format_html(dst_node),
-            )
+        try:
+            if response.status_code == 404:
+                return
+            response.raise_for_status()
+
+            for example_node in iter_response_elements(response, tags="div"):
+                if not _IS_EXAMPLE(example_node):
+                    continue
+                src_node = _SELECT_SOURCE(example_node)[0]
+                dst_node = _SELECT_TARGET(example_node)[0]
+                yield ReversoResult(
+                    source=get_text(src_node, _HIGHLIGHT).strip(),
+                    target=get_text(dst_node, _HIGHLIGHT).strip(),
+                )
+        finally:
+            response.close()
 
     def print_results(
         self, results: Iterable[ReversoResult], file: IO[str]
@@ -2,16 +2,20 @@
 import argparse
 import re
 import urllib.parse
+from collections import deque
 from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import IO
+from typing import IO, Optional
 
-import lxml.html
-import requests
+import lxml.etree
 
+from dict import http
+from dict.cache import DEFAULT_NEGATIVE_CACHE_TTL
 from dict.colors import COLOR_HIGHLIGHT, COLOR_RESET
 from dict.engines.base import BaseEngine
-from dict.text import expand_sgml, strip_html
+from dict.html import get_text, iter_response_elements
+
+_RE_DEFINITION_STYLE = re.compile("medium.*sans-serif")
 
 
 @dataclass
@@ -22,45 +26,52 @@ class SJPResult:
     definitions: list[str]
 
 
-def _collect_text(node):
-    doc = lxml.html.document_fromstring(lxml.html.tostring(node))
-    for br_node in doc.xpath("*//br"):
-        br_node.tail = "\n" + br_node.tail if br_node.tail else "\n"
-    return doc.text_content()
-
-
 class SJPEngine(BaseEngine[SJPResult]):
     """Słownik Języka Polskiego engine."""
 
     names = ["sjp"]
+    negative_cache_ttl = DEFAULT_NEGATIVE_CACHE_TTL
 
     def lookup_phrase(
         self, args: argparse.Namespace, phrase: str
     ) -> Iterable[SJPResult]:
         url = f"http://sjp.pl/{urllib.parse.quote(phrase)}"
-        response = requests.get(url)
-        response.raise_for_status()
-        content = response.text
+        response = http.get(url, stream=True)
+        try:
+            response.raise_for_status()
+
+            # a header's definitions end at the next sibling <hr> or <h1>,
+            # so a header can be processed once such a sibling has been
+            # parsed
+            headers: deque[lxml.etree.Element] = deque()
+            for node in iter_response_elements(response, tags=("h1", "hr")):
+                while headers and headers[0].getparent() is node.getparent():
+                    if result := self._parse_header(headers.popleft()):
+                        yield result
+                if node.tag == "h1":
+                    headers.append(node)
+
+            for header in headers:
+                if result := self._parse_header(header):
+                    yield result
+        finally:
+            response.close()
 
-        doc = lxml.html.fromstring(content)
-        for header in doc.cssselect("h1"):
-            term = strip_html(
-                expand_sgml(lxml.etree.tostring(header, encoding="unicode"))
-            ).strip()
-            if term.endswith("✕"):
-                continue
+    @staticmethod
+    def _parse_header(header: lxml.etree.Element) -> Optional[SJPResult]:
+        term = get_text(header).strip()
+        if term.endswith("✕"):
+            return None
 
-            definitions = []
-            for node in header.itersiblings():
-                if re.search(
-                    "medium.*sans-serif", node.attrib.get("style", "")
-                ):
-                    text = _collect_text(node).strip()
-                    text = re.sub(r"\n\s+", "\n", text)
-                    definitions.append(text)
-                if node.tag == "hr" or node.tag == "h1":
-                    break
-            yield SJPResult(term=term, definitions=definitions)
+        definitions = []
+        for node in header.itersiblings():
+            if _RE_DEFINITION_STYLE.search(node.attrib.get("style", "")):
+                text = get_text(node).strip()
+                text = re.sub(r"\n\s+", "\n", text)
+                definitions.append(text)
+            if node.tag == "hr" or node.tag == "h1":
+                break
+        return SJPResult(term=term, definitions=definitions)
 
     def print_results(
         self, results: Iterable[SJPResult], file: IO[str]
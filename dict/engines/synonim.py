@@ -5,17 +5,28 @@ from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import IO, Optional
 
-import lxml.html
+import lxml.etree
 import requests
+from lxml.cssselect import CSSSelector
 
+from dict import http
+from dict.cache import DEFAULT_NEGATIVE_CACHE_TTL
 from dict.colors import COLOR_HIGHLIGHT, COLOR_RESET
 from dict.engines.base import BaseEngine
-from dict.pager import print_in_columns
+from dict.html import css_matcher, get_text, iter_response_elements
+from dict.layout import display_width, print_in_columns
+from dict.pager import with_column_size
 
 USER_AGENT = (
     "Mozilla/5.0 (X11; Linux x86_64; rv:10.0) Gecko/20100101 Firefox/10.0"
 )
 
+_IS_ALL_SYNONYMS = css_matcher("#mall")
+_IS_GROUP = lxml.etree.XPath("self::span[ancestor::*[@id = 'mgru']]")
+_SELECT_LINKS = CSSSelector("a", translator="html")
+_SELECT_GROUP_HEADER = CSSSelector("h3 a", translator="html")
+_SELECT_GROUP_LINKS = CSSSelector("ul li a", translator="html")
+
 
 @dataclass
 class SynonimResult:
@@ -29,6 +40,7 @@ class SynonimEngine(BaseEngine[SynonimResult]):
     """synonim.net engine."""
 
     names = ["synonim"]
+    negative_cache_ttl = DEFAULT_NEGATIVE_CACHE_TTL
 
     def __init__(self) -> None:
         """Initialize self."""
@@ -45,33 +57,52 @@ class SynonimEngine(BaseEngine[SynonimResult]):
     ) -> Iterable[SynonimResult]:
         url = f"https://synonim.net/synonim/{urllib.parse.quote(phrase)}"
 
-        response = self.session.get(url)
-        if response.status_code == 404:
-            return
-        response.raise_for_status()
-        content = response.text
-
-        doc = lxml.html.fromstring(content)
-
-        yield SynonimResult(
-            meaning="wszystkie wyrazy",
-            synonyms=[node.text for node in doc.cssselect("#mall a")],
-        )
-
-        for group in doc.cssselect("#mgru span"):
-            header = group.cssselect("h3 a")
-            yield SynonimResult(
-                meaning=header[0].text if header else None,
-                synonyms=[node.text for node in group.cssselect("ul li a")],
-            )
+        response = http.get(url, session=self.session, stream=True)
+        try:
+            if response.status_code == 404:
+                return
+            response.raise_for_status()
+
+            # the list of all synonyms always goes first; hold back any groups
+            # that precede it in the document
+            all_synonyms: Optional[SynonimResult] = None
+            groups: list[SynonimResult] = []
+
+            for node in iter_response_elements(response, tags=("div", "span")):
+                if all_synonyms is None and _IS_ALL_SYNONYMS(node):
+                    all_synonyms = SynonimResult(
+                        meaning="wszystkie wyrazy",
+                        synonyms=list(map(get_text, _SELECT_LINKS(node))),
+                    )
+                    yield all_synonyms
+                    yield from groups
+                    groups.clear()
+                elif node.tag == "span" and _IS_GROUP(node):
+                    header = _SELECT_GROUP_HEADER(node)
+                    group = SynonimResult(
+                        meaning=get_text(header[0]) if header else None,
+                        synonyms=list(
+                            map(get_text, _SELECT_GROUP_LINKS(node))
+                        ),
+                    )
+                    if all_synonyms is None:
+                        groups.append(group)
+                    else:
+                        yield group
+        finally:
+            response.close()
+
+        if all_synonyms is None:
+            yield SynonimResult(meaning="wszystkie wyrazy", synonyms=[])
+            yield from groups
 
     def print_results(
         self, results: Iterable[SynonimResult], file: IO[str]
     ) -> None:
-        column_size = max(
-            len(synonym) for result in results for synonym in result.synonyms
-        )
-        for result in results:
+        for result, column_size in with_column_size(
+            results,
+            lambda result: max(map(display_width, result.synonyms), default=0),
+        ):
             print(f"{COLOR_HIGHLIGHT}{result.meaning}{COLOR_RESET}", file=file)
             print_in_columns(
                 result.synonyms, file=file, column_size=column_size
@@ -4,8 +4,8 @@ from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import IO
 
-import requests
-
+from dict import http, timing
+from dict.cache import DEFAULT_NEGATIVE_CACHE_TTL
 from dict.colors import COLOR_HIGHLIGHT, COLOR_RESET
 from dict.engines.base import BaseEngine
 from dict.text import wrap_long_text
@@ -27,14 +27,16 @@ class UrbanEngine(BaseEngine[UrbanResult]):
     """Urban Dictionary engine."""
 
     names = ["urban"]
+    negative_cache_ttl = DEFAULT_NEGATIVE_CACHE_TTL
 
     def lookup_phrase(
         self, args: argparse.Namespace, phrase: str
     ) -> Iterable[UrbanResult]:
         url = "http://api.urbandictionary.com/v0/define"
-        response = requests.get(url, {"term": phrase})
+        response = http.get(url, {"term": phrase})
         response.raise_for_status()
-        content = response.json()
+        with timing.span("decode json"):
+            content = response.json()
 
         for entry in list(
             sorted(content["list"], key=lambda item: -item["thumbs_up"])
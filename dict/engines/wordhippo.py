@@ -6,12 +6,15 @@ from enum import IntEnum
 from typing import IO, Optional
 from urllib.parse import quote
 
-import lxml.etree
-import requests
+from lxml.cssselect import CSSSelector
 
+from dict import http
+from dict.cache import DEFAULT_NEGATIVE_CACHE_TTL
 from dict.colors import COLOR_HIGHLIGHT, COLOR_RESET
 from dict.engines.base import BaseEngine
-from dict.pager import print_in_columns
+from dict.html import css_matcher, get_text, iter_response_elements
+from dict.layout import display_width, print_in_columns
+from dict.pager import with_column_size
 
 MEANINGS_URL = (
     "https://www.wordhippo.com/what-is/the-meaning-of-the-word/{}.html"
@@ -21,6 +24,11 @@ USER_AGENT = (
     "Mozilla/5.0 (X11; Linux x86_64; rv:10.0) Gecko/20100101 Firefox/10.0"
 )
 
+_IS_WORD_DESC = css_matcher("div.tabdesc")
+_IS_WORD_TYPE = css_matcher("div.defv2wordtype")
+_SELECT_RELATED_WORDS = CSSSelector("div.wb a", translator="html")
+_SELECT_MEANINGS = CSSSelector(".topleveldefinition li", translator="html")
+
 
 class WordHippoLookupMode(IntEnum):
     """WordHippo engine lookup target."""
@@ -29,10 +37,6 @@ class WordHippoLookupMode(IntEnum):
     MEANINGS = 2
 
 
-def _get_text_from_node(node: lxml.etree.Element) -> str:
-    return "".join(node.itertext())
-
-
 @dataclass
 class BaseWordHippoResult:
     """Base WordHippo engine result."""
@@ -67,7 +71,7 @@ class WordHippoMeaningResult(BaseWordHippoResult):
 
     @property
     def column_size(self) -> int:
-        return max(map(len, self.meanings))
+        return max(map(display_width, self.meanings))
 
     def print_to_stream(self, file: IO[str], column_size: int) -> None:
         print(COLOR_HIGHLIGHT + self.word_type + COLOR_RESET, file=file)
@@ -85,7 +89,7 @@ class WordHippoSynonymResult(BaseWordHippoResult):
 
     @property
     def column_size(self) -> int:
-        return max(map(len, self.synonyms))
+        return max(map(display_width, self.synonyms))
 
     def print_to_stream(self, file: IO[str], column_size: int) -> None:
         print(
@@ -105,6 +109,8 @@ class WordHippoEngine(BaseEngine[BaseWordHippoResult]):
     """WordHippo engine."""
 
     names = ["wordhippo"]
+    cache_key_args = ["lookup_mode"]
+    negative_cache_ttl = DEFAULT_NEGATIVE_CACHE_TTL
 
     @staticmethod
     def decorate_arg_parser(parser: argparse.ArgumentParser) -> None:
@@ -142,17 +148,26 @@ class WordHippoEngine(BaseEngine[BaseWordHippoResult]):
         :return: a generator of synonyms
         """
         url = SYNONYMS_URL.format(quote(phrase))
-        response = requests.get(url, headers={"User-Agent": USER_AGENT})
-        response.raise_for_status()
-        doc = lxml.etree.HTML(response.text)
-        for word_desc_node in doc.cssselect("div.tabdesc"):
-            word_type_node = word_desc_node.getprevious()
-            related_word_nodes = word_desc_node.getnext().cssselect("div.wb a")
-            yield WordHippoSynonymResult(
-                word_type=(word_type_node.text or "").strip(),
-                word_desc=_get_text_from_node(word_desc_node),
-                synonyms=list(map(_get_text_from_node, related_word_nodes)),
-            )
+        response = http.get(
+            url, headers={"User-Agent": USER_AGENT}, stream=True
+        )
+        try:
+            response.raise_for_status()
+            # a description is followed by its list of words, wait for
+            # the list
+            for node in iter_response_elements(response, tags="div"):
+                word_desc_node = node.getprevious()
+                if not _IS_WORD_DESC(word_desc_node):
+                    continue
+                word_type_node = word_desc_node.getprevious()
+                related_word_nodes = _SELECT_RELATED_WORDS(node)
+                yield WordHippoSynonymResult(
+                    word_type=(word_type_node.text or "").strip(),
+                    word_desc=get_text(word_desc_node),
+                    synonyms=list(map(get_text, related_word_nodes)),
+                )
+        finally:
+            response.close()
 
     @staticmethod
     def get_meanings(phrase: str) -> Iterable[WordHippoMeaningResult]:
@@ -162,21 +177,29 @@ class WordHippoEngine(BaseEngine[BaseWordHippoResult]):
         :return: a generator of meanings
         """
         url = MEANINGS_URL.format(quote(phrase))
-        response = requests.get(url, headers={"User-Agent": USER_AGENT})
-        response.raise_for_status()
-        doc = lxml.etree.HTML(response.text)
-        for word_type_node in doc.cssselect("div.defv2wordtype"):
-            meaning_word_nodes = word_type_node.getnext().cssselect(
-                ".topleveldefinition li"
-            )
-            yield WordHippoMeaningResult(
-                word_type=_get_text_from_node(word_type_node),
-                meanings=list(map(_get_text_from_node, meaning_word_nodes)),
-            )
+        response = http.get(
+            url, headers={"User-Agent": USER_AGENT}, stream=True
+        )
+        try:
+            response.raise_for_status()
+            # a word type is followed by its list of meanings, wait for
+            # the list
+            for node in iter_response_elements(response, tags="div"):
+                word_type_node = node.getprevious()
+                if not _IS_WORD_TYPE(word_type_node):
+                    continue
+                meaning_word_nodes = _SELECT_MEANINGS(node)
+                yield WordHippoMeaningResult(
+                    word_type=get_text(word_type_node),
+                    meanings=list(map(get_text, meaning_word_nodes)),
+                )
+        finally:
+            response.close()
 
     def print_results(
         self, results: Iterable[BaseWordHippoResult], file: IO[str]
     ) -> None:
-        column_size = max(result.column_size for result in results)
-        for result in results:
+        for result, column_size in with_column_size(
+            results, lambda result: result.column_size
+        ):
             result.print_to_stream(file=file, column_size=column_size)
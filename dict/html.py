@@ -0,0 +1,118 @@
+"""HTML utilities."""
+from collections.abc import Callable, Iterable, Iterator
+from typing import Union
+
+import lxml.etree
+import requests
+from cssselect import HTMLTranslator
+
+from dict import timing
+
+CHUNK_SIZE = 16 * 1024
+
+TMatcher = Callable[[lxml.etree.Element], bool]
+
+
+def css_matcher(css: str) -> TMatcher:
+    """Compile a simple CSS selector to a function testing a single element.
+
+    Unlike lxml.cssselect.CSSSelector, which searches the whole subtree, the
+    resulting function checks only whether the given element itself matches
+    the selector. This makes it suitable for filtering the elements produced
+    by an incremental parser. Combinators are not supported. Comments and
+    missing nodes never match.
+
+    :param css: CSS selector to compile
+    :return: a function telling whether an element matches the selector
+    """
+    xpath = lxml.etree.XPath(
+        HTMLTranslator().css_to_xpath(css, prefix="self::")
+    )
+    return lambda node: (
+        node is not None and isinstance(node.tag, str) and bool(xpath(node))
+    )
+
+
+def get_text(
+    node: lxml.etree.Element, highlight: tuple[str, str] = ("", "")
+) -> str:
+    """Extract the text of an element, walking its subtree once.
+
+    The entities are already decoded by the parser, so the text needs no
+    further processing, unlike the serialized HTML. Line breaks are inserted
+    for the <br> elements and the contents of the <em> elements are
+    surrounded by the highlight markers. Comments are skipped, and so is the
+    tail of the element itself.
+
+    :param node: element to extract the text of
+    :param highlight: markers to put before and after the emphasized text,
+        e.g. the color codes
+    :return: text of the element and its descendants
+    """
+    parts: list[str] = []
+    _collect_text(node, highlight, parts)
+    return "".join(parts)
+
+
+def _collect_text(
+    node: lxml.etree.Element, highlight: tuple[str, str], parts: list[str]
+) -> None:
+    if node.tag == "br":
+        parts.append("\n")
+    elif node.tag == "em":
+        parts.append(highlight[0])
+    # the text of a comment is its contents, unlike its tail
+    if isinstance(node.tag, str) and node.text:
+        parts.append(node.text)
+    for child in node:
+        _collect_text(child, highlight, parts)
+        if child.tail:
+            parts.append(child.tail)
+    if node.tag == "em":
+        parts.append(highlight[1])
+
+
+def iter_elements(
+    chunks: Iterable[Union[str, bytes]], tags: Union[str, tuple[str, ...]]
+) -> Iterator[lxml.etree.Element]:
+    """Parse HTML incrementally and yield elements as soon as they are closed.
+
+    The elements stay attached to the document tree, so it is possible to
+    inspect their preceding siblings and ancestors, but not anything that
+    follows them in the document.
+
+    :param chunks: chunks of the HTML document
+    :param tags: names of the tags to yield
+    :return: a generator of closed elements, in the document order
+    """
+    parser = lxml.etree.HTMLPullParser(events=("end",), tag=tags)
+    for chunk in chunks:
+        with timing.span("parse html"):
+            parser.feed(chunk)
+        for _event, node in parser.read_events():
+            yield node
+    with timing.span("parse html"):
+        parser.close()
+    for _event, node in parser.read_events():
+        yield node
+
+
+def iter_response_elements(
+    response: requests.Response, tags: Union[str, tuple[str, ...]]
+) -> Iterator[lxml.etree.Element]:
+    """Parse a streamed HTTP response while it is still being downloaded.
+
+    :param response: response of a request made with stream=True
+    :param tags: names of the tags to yield
+    :return: a generator of closed elements, in the document order
+    """
+    try:
+        yield from iter_elements(
+            timing.iter_spans(
+                "receive",
+                response.iter_content(CHUNK_SIZE, decode_unicode=True),
+            ),
+            tags=tags,
+        )
+    finally:
+        response.close()
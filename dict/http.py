@@ -1,26 +1,822 @@
 """HTTP utilities."""
-from typing import IO
+import email.utils
+import functools
+import hashlib
+import shutil
+import threading
+import time
+import urllib.parse
+import weakref
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
 
 import requests
-from tqdm import tqdm
 
+from dict import timing
 
-def download(url: str, description: str, handle: IO[bytes]) -> None:
-    """Download a given URL to a given stream and show a progressbar.
+if TYPE_CHECKING:  # pragma: no cover
+    from tqdm import tqdm
+
+    from dict.cassette import Cassette
+
+MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER = 1.0
+MAX_RETRY_AFTER = 60.0
+
+BLOCK_SIZE = 1024 * 1024
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+DOWNLOAD_TIMEOUT = (10.0, 60.0)  # connect and read timeouts in seconds
+DEFAULT_TIMEOUT = (5.0, 15.0)
+
+# responses counted by the circuit breakers as failures, like the timeouts
+FAILURE_STATUS_CODES = {500, 502, 503, 504}
+
+# the latency percentiles are estimated from this many recent requests, once
+# there are at least MIN_LATENCY_SAMPLES of them
+LATENCY_WINDOW = 100
+MIN_LATENCY_SAMPLES = 10
+# the faster requests are never duplicated
+MIN_HEDGE_DELAY = 0.1
+
+
+@dataclass
+class HostPolicy:
+    """Throttling policy of a single host."""
+
+    rate: float  # sustained number of requests per second
+    burst: int  # number of requests that can be made back to back
+    max_concurrency: int  # number of requests that can be in flight at once
+    # connect and read timeouts in seconds, unless given with the request
+    timeout: tuple[float, float] = DEFAULT_TIMEOUT
+    # percentile of the recent latencies, e.g. 0.95, after which a second,
+    # identical GET request is made if the first one has not been answered
+    # yet; None disables the hedged requests
+    hedge_percentile: Optional[float] = None
+    # number of consecutive failures after which the requests fail fast, and
+    # the number of seconds after which a request is tried again
+    failure_threshold: int = 5
+    recovery_time: float = 30.0
+
+
+DEFAULT_POLICY = HostPolicy(rate=5.0, burst=5, max_concurrency=4)
+HOST_POLICIES = {
+    "www.wordhippo.com": HostPolicy(rate=1.0, burst=2, max_concurrency=2),
+    "context.reverso.net": HostPolicy(rate=1.0, burst=2, max_concurrency=2),
+    "jisho.org": HostPolicy(
+        rate=3.0, burst=3, max_concurrency=3, hedge_percentile=0.95
+    ),
+    "synonim.net": HostPolicy(rate=2.0, burst=2, max_concurrency=2),
+    "sjp.pl": HostPolicy(rate=2.0, burst=2, max_concurrency=2),
+}
+
+
+class TokenBucket:
+    """A thread-safe token bucket.
+
+    Reservations are served in the order they were made: once the bucket is
+    empty, each subsequent reservation goes further into debt and has to wait
+    proportionally longer.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize self.
+
+        :param rate: number of tokens added per second
+        :param capacity: maximum number of tokens
+        :param clock: monotonic time source
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token from the bucket.
+
+        :return: number of seconds to wait before the token can be used
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate, self._not_before - now)
+
+    def try_reserve(self) -> bool:
+        """Take a token from the bucket, unless it would have to be waited
+        for.
+
+        :return: whether the token was taken
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            if self._tokens < 1 or self._not_before > now:
+                return False
+            self._tokens -= 1
+            return True
+
+    def pause(self, seconds: float) -> None:
+        """Make the following reservations wait for at least given time.
+
+        :param seconds: number of seconds to wait
+        """
+        with self._lock:
+            self._not_before = max(self._not_before, self._clock() + seconds)
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """Parse the value of the Retry-After HTTP header.
+
+    :param value: either a number of seconds or a HTTP date
+    :return: number of seconds to wait
+    """
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return DEFAULT_RETRY_AFTER
+        seconds = date.timestamp() - time.time()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of making a request to a host that keeps failing."""
+
+
+class CircuitBreaker:
+    """Stops the requests to a host after repeated failures.
+
+    Once a given number of consecutive requests fail, the circuit opens and
+    the requests are refused for a while. Then a single trial request is let
+    through: its success closes the circuit again, its failure reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_time: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize self.
+
+        :param failure_threshold: number of consecutive failures opening the
+            circuit
+        :param recovery_time: number of seconds after which a trial request
+            is let through
+        :param clock: monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # identifier of the thread that was let through with the trial
+        # request
+        self._trial: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check whether a request can be made.
+
+        :return: False if the circuit is open, or if the trial request is
+            still in flight
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if (
+                self._trial is not None
+                or self._clock() - self._opened_at < self.recovery_time
+            ):
+                return False
+            self._trial = threading.get_ident()
+            return True
+
+    def finish_attempt(self) -> None:
+        """Let another trial request through if the one allowed to the
+        current thread ended without an outcome, e.g. with an error unrelated
+        to the host.
+        """
+        with self._lock:
+            if self._trial == threading.get_ident():
+                self._trial = None
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = None
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit if there were too
+        many of them in a row.
+        """
+        with self._lock:
+            self._failures += 1
+            self._trial = None
+            if self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+class _HostState:
+    def __init__(self, policy: HostPolicy, clock: Callable[[], float]) -> None:
+        self.policy = policy
+        self.bucket = TokenBucket(
+            rate=policy.rate, capacity=policy.burst, clock=clock
+        )
+        self.semaphore = threading.BoundedSemaphore(policy.max_concurrency)
+        self.breaker = CircuitBreaker(
+            policy.failure_threshold, policy.recovery_time, clock=clock
+        )
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+
+def _get_hedge_delay(state: _HostState) -> Optional[float]:
+    percentile = state.policy.hedge_percentile
+    if percentile is None or len(state.latencies) < MIN_LATENCY_SAMPLES:
+        return None
+    latencies = sorted(state.latencies)
+    index = min(len(latencies) - 1, int(percentile * len(latencies)))
+    return max(MIN_HEDGE_DELAY, latencies[index])
+
+
+def _run_in_thread(func: Callable[[], requests.Response]) -> Future:
+    future: Future = Future()
+
+    def run() -> None:
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(func())
+        except BaseException as ex:  # pylint: disable=broad-except
+            future.set_exception(ex)
+
+    # a daemon thread does not hold up the exit while a losing request
+    # runs into its timeout
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _release_on_close(
+    response: requests.Response, release: Callable[[], None]
+) -> None:
+    lock = threading.Lock()
+    released = False
+
+    def release_once() -> None:
+        nonlocal released
+        with lock:
+            if released:
+                return
+            released = True
+        release()
+
+    close = response.close
+
+    def close_and_release() -> None:
+        try:
+            close()
+        finally:
+            release_once()
+
+    response.close = close_and_release  # type: ignore[method-assign]
+    # in case the caller drops the response without closing it
+    weakref.finalize(response, release_once)
+
+
+def _close_response(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class RequestScheduler:
+    """Throttles HTTP requests according to per-host policies.
+
+    Each host gets its own token bucket limiting the request rate and its own
+    cap on the number of concurrent requests; a streamed response counts
+    against the cap until it is closed. Responses with the 429 status
+    code, or the 503 status code with a Retry-After header, put the whole
+    host on hold for the requested time and the request is retried.
+
+    The requests time out after the scheduler's timeout, if it is set, or
+    according to the policy of the host, unless given a timeout explicitly.
+    The connection errors, the timeouts and the server
+    errors are counted by the circuit breaker of the host, which makes the
+    requests to a failing host raise CircuitOpenError right away. With
+    hedge_percentile, a GET request that takes longer than that percentile of
+    the recent ones is duplicated, and the response that arrives first is
+    used; no duplicate is made if the host has no spare capacity.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[dict[str, HostPolicy]] = None,
+        default_policy: HostPolicy = DEFAULT_POLICY,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize self.
+
+        :param policies: policies for specific host names
+        :param default_policy: policy for the hosts not listed in policies
+        :param clock: monotonic time source
+        :param sleep: function used to wait
+        """
+        self.policies = policies or {}
+        self.default_policy = default_policy
+        # overrides the timeouts of the policies, e.g. with --timeout
+        self.timeout: Optional[float] = None
+        self._clock = clock
+        self._sleep = sleep
+        self._hosts: dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def _get_host_state(self, host: str) -> _HostState:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _HostState(
+                    self.policies.get(host, self.default_policy),
+                    clock=self._clock,
+                )
+            return self._hosts[host]
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *args: Any,
+        session: Optional[requests.Session] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Make a throttled request.
+
+        :param method: HTTP method, such as GET or HEAD
+        :param url: URL to request
+        :param args: positional arguments passed to the requests API
+        :param session: session to use instead of the global requests API
+        :param kwargs: keyword arguments passed to the requests API
+        :return: the response
+        """
+        host = urllib.parse.urlsplit(url).hostname or ""
+        state = self._get_host_state(host)
+        send = getattr(
+            session if session is not None else requests, method.lower()
+        )
+        kwargs.setdefault("timeout", self.timeout or state.policy.timeout)
+        streamed = bool(kwargs.get("stream"))
+        attempt = 0
+        while True:
+            if not state.breaker.allow():
+                raise CircuitOpenError(
+                    f"{host} keeps failing, not trying again for now"
+                )
+            request = functools.partial(send, url, *args, **kwargs)
+            hedge_delay = _get_hedge_delay(state) if method == "GET" else None
+            try:
+                if hedge_delay is None:
+                    response = self._send(state, request, streamed)
+                else:
+                    response = self._send_hedged(
+                        state, hedge_delay, request, streamed
+                    )
+            finally:
+                state.breaker.finish_attempt()
+
+            if attempt == MAX_RETRIES or not (
+                response.status_code == 429
+                or (
+                    response.status_code == 503
+                    and "Retry-After" in response.headers
+                )
+            ):
+                return response
+
+            state.bucket.pause(
+                parse_retry_after(response.headers.get("Retry-After"))
+            )
+            response.close()
+            attempt += 1
+
+    def _send(
+        self,
+        state: _HostState,
+        request: Callable[[], requests.Response],
+        streamed: bool,
+    ) -> requests.Response:
+        state.semaphore.acquire()
+        try:
+            self._sleep(state.bucket.reserve())
+        except BaseException:
+            state.semaphore.release()
+            raise
+        return self._send_in_slot(state, request, streamed)
+
+    def _send_in_slot(
+        self,
+        state: _HostState,
+        request: Callable[[], requests.Response],
+        streamed: bool,
+    ) -> requests.Response:
+        # the body of a streamed response is downloaded while the caller
+        # reads it, so the slot is only given back once it is closed
+        try:
+            response = self._send_measured(state, request)
+        except BaseException:
+            state.semaphore.release()
+            raise
+        if streamed:
+            _release_on_close(response, state.semaphore.release)
+        else:
+            state.semaphore.release()
+        return response
+
+    def _send_measured(
+        self, state: _HostState, request: Callable[[], requests.Response]
+    ) -> requests.Response:
+        start = self._clock()
+        try:
+            response = request()
+        except requests.RequestException:
+            state.breaker.record_failure()
+            raise
+        state.latencies.append(self._clock() - start)
+        if response.status_code in FAILURE_STATUS_CODES:
+            state.breaker.record_failure()
+        else:
+            state.breaker.record_success()
+        return response
+
+    def _send_hedged(
+        self,
+        state: _HostState,
+        delay: float,
+        request: Callable[[], requests.Response],
+        streamed: bool,
+    ) -> requests.Response:
+        first = _run_in_thread(lambda: self._send(state, request, streamed))
+        if wait([first], timeout=delay).done:
+            return first.result()
+
+        # the duplicate must not wait for the throttling, or add to the load
+        # of a host that is already busy
+        if not state.semaphore.acquire(blocking=False):
+            return first.result()
+        if not state.bucket.try_reserve():
+            state.semaphore.release()
+            return first.result()
+
+        futures = {
+            first,
+            _run_in_thread(
+                lambda: self._send_in_slot(state, request, streamed)
+            ),
+        }
+        pending = futures
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # an error is returned only if both requests fail
+            succeeded = [
+                future for future in done if future.exception() is None
+            ]
+            if succeeded or not pending:
+                winner = (succeeded or list(done))[0]
+                for loser in futures - {winner}:
+                    loser.add_done_callback(_close_response)
+                return winner.result()
+
+    def get(self, url: str, *args: Any, **kwargs: Any) -> requests.Response:
+        """Make a throttled GET request.
+
+        :param url: URL to request
+        :param args: positional arguments passed to the requests API
+        :param kwargs: keyword arguments passed to the request method
+        :return: the response
+        """
+        return self.request("GET", url, *args, **kwargs)
+
+
+SCHEDULER = RequestScheduler(HOST_POLICIES)
+CASSETTE: Optional["Cassette"] = None  # set by entering a Cassette
+
+
+def get(url: str, *args: Any, **kwargs: Any) -> requests.Response:
+    """Make a GET request through the shared request scheduler.
+
+    If a cassette is in use, the request is recorded to it or served from it.
+
+    :param url: URL to request
+    :param args: positional arguments passed to RequestScheduler.get
+    :param kwargs: keyword arguments passed to RequestScheduler.get
+    :return: the response
+    """
+    with timing.span("http", url=url):
+        if CASSETTE is not None:
+            return CASSETTE.get(SCHEDULER.get, url, *args, **kwargs)
+        return SCHEDULER.get(url, *args, **kwargs)
+
+
+def head(url: str, **kwargs: Any) -> requests.Response:
+    """Make a HEAD request through the shared request scheduler.
+
+    :param url: URL to request
+    :param kwargs: keyword arguments passed to RequestScheduler.request
+    :return: the response
+    """
+    return SCHEDULER.request("HEAD", url, **kwargs)
+
+
+class DownloadError(Exception):
+    """Raised when a downloaded file is incomplete or corrupted."""
+
+
+def _get_validator(headers: Any) -> Optional[str]:
+    # weak entity tags cannot be used with If-Range
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _read_validator(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8") or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_validator(path: Path, validator: Optional[str]) -> None:
+    if validator is None:
+        path.unlink(missing_ok=True)
+    else:
+        path.write_text(validator, encoding="utf-8")
+
+
+def _get_segments(
+    url: str, segments: int
+) -> Optional[tuple[list[range], Optional[str]]]:
+    if segments <= 1 or CASSETTE is not None:
+        return None
+    response = head(url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+    if response.status_code != 200:
+        return None
+    size = int(response.headers.get("Content-Length", 0))
+    if response.headers.get("Accept-Ranges") != "bytes" or size < (
+        MIN_SEGMENT_SIZE * 2
+    ):
+        return None
+    segments = min(segments, size // MIN_SEGMENT_SIZE)
+    bounds = [size * i // segments for i in range(segments + 1)]
+    ranges = [range(start, end) for start, end in zip(bounds, bounds[1:])]
+    return ranges, _get_validator(response.headers)
+
+
+def _download_segment(
+    url: str,
+    path: Path,
+    segment: Optional[range],
+    validator_path: Path,
+    progress_bar: "tqdm",
+) -> Optional[int]:
+    """Download a segment of a file, resuming the previous attempt.
+
+    :param url: URL to download
+    :param path: path to the partial file
+    :param segment: byte range to download, if empty, the whole file
+    :param validator_path: path to the file holding the ETag or the
+        modification time of the version of the file being downloaded
+    :param progress_bar: progress bar to update
+    :return: expected size of the partial file, if known
+    """
+    offset = path.stat().st_size if path.exists() else 0
+    start = (segment.start if segment is not None else 0) + offset
+    if segment is not None and start >= segment.stop:
+        return len(segment)
+
+    headers = {}
+    if offset or segment is not None:
+        end = segment.stop - 1 if segment is not None else ""
+        headers["Range"] = f"bytes={start}-{end}"
+        # if the file has changed since, the server sends all of it
+        validator = _read_validator(validator_path)
+        if validator is not None:
+            headers["If-Range"] = validator
+    response = get(
+        url,
+        stream=True,
+        timeout=DOWNLOAD_TIMEOUT,
+        **({"headers": headers} if headers else {}),
+    )
+    if segment is None and response.status_code == 200:
+        _write_validator(validator_path, _get_validator(response.headers))
+    # the response holds a connection of the host until it is closed
+    try:
+        return _save_segment(response, path, segment, offset, progress_bar)
+    finally:
+        response.close()
+
+
+def _save_segment(
+    response: requests.Response,
+    path: Path,
+    segment: Optional[range],
+    offset: int,
+    progress_bar: "tqdm",
+) -> Optional[int]:
+    if response.status_code == 416 and segment is None:
+        return None  # the previous attempt got everything
+    if response.status_code == 206:
+        mode = "ab"
+    elif segment is not None:
+        raise DownloadError(
+            "the server ignored the requested byte range, "
+            "or the file has changed during the download"
+        )
+    else:
+        response.raise_for_status()
+        progress_bar.update(-offset)
+        offset = 0
+        mode = "wb"
+
+    size: Optional[int] = None
+    if "Content-Length" in response.headers and (
+        "Content-Encoding" not in response.headers
+    ):
+        size = offset + int(response.headers["Content-Length"])
+        if segment is None:
+            progress_bar.total = size
+            progress_bar.refresh()
+
+    with path.open(mode) as handle:
+        for data in response.iter_content(BLOCK_SIZE):
+            progress_bar.update(len(data))
+            handle.write(data)
+    return len(segment) if segment is not None else size
+
+
+def _concatenate(sources: list[Path], target: Path) -> None:
+    with target.open("wb") as handle:
+        for source in sources:
+            with source.open("rb") as source_handle:
+                shutil.copyfileobj(source_handle, handle, BLOCK_SIZE)
+    for source in sources:
+        source.unlink()
+
+
+def _verify(path: Path, size: Optional[int], sha256: Optional[str]) -> None:
+    if size is not None and path.stat().st_size != size:
+        raise DownloadError(
+            f"expected {size} bytes, got {path.stat().st_size} bytes"
+        )
+    if sha256 is not None:
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            while data := handle.read(BLOCK_SIZE):
+                digest.update(data)
+        if digest.hexdigest() != sha256.lower():
+            raise DownloadError("checksum mismatch")
+
+
+def download(
+    url: str,
+    description: str,
+    path: Path,
+    sha256: Optional[str] = None,
+    segments: int = 1,
+) -> None:
+    """Download a given URL to a given file and show a progressbar.
+
+    The data is first written to partial files next to the target path. If
+    the download gets interrupted, the next call resumes it from where it
+    stopped using HTTP range requests, unless the file has changed in the
+    meantime according to its ETag or modification time. If segments is
+    greater than one and the server supports range requests, the file is
+    split into that many segments that are downloaded in parallel. The file
+    is moved to its target path only once it has been verified.
 
     :param url: URL to download
     :param description: description to show in the progressbar
-    :param handle: stream to write to
+    :param path: path to save the file to
+    :param sha256: expected SHA-256 checksum of the file, in hex
+    :param segments: maximum number of parallel connections
     """
-    response = requests.get(url, stream=True)
-    total_size_in_bytes = int(response.headers.get("Content-Length", 0))
-    block_size = 1024
+    with timing.span("download", url=url):
+        _download(url, description, path, sha256, segments)
+
+
+def _get_parts(
+    url: str, path: Path, segments: int, validator_path: Path
+) -> tuple[Optional[list[range]], list[tuple[Path, Optional[range]]]]:
+    probe = _get_segments(url, segments)
+    if not probe:
+        part_path = path.with_name(path.name + ".part")
+        # without a validator, the partial file might be of any version
+        if _read_validator(validator_path) is None:
+            part_path.unlink(missing_ok=True)
+        return None, [(part_path, None)]
+
+    ranges, validator = probe
+    parts: list[tuple[Path, Optional[range]]] = [
+        (path.with_name(f"{path.name}.part{i}"), segment)
+        for i, segment in enumerate(ranges)
+    ]
+    # the parts of a different version of the file cannot be resumed
+    if validator is None or validator != _read_validator(validator_path):
+        for part, _segment in parts:
+            part.unlink(missing_ok=True)
+    _write_validator(validator_path, validator)
+    return ranges, parts
+
+
+def _download_parts(
+    url: str,
+    description: str,
+    ranges: Optional[list[range]],
+    parts: list[tuple[Path, Optional[range]]],
+    validator_path: Path,
+) -> list[Optional[int]]:
+    # imported here, as it is only needed for the offline dictionaries
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    from tqdm import tqdm
+
+    done = sum(part.stat().st_size for part, _ in parts if part.exists())
     with tqdm(
         desc=description,
-        total=total_size_in_bytes,
+        total=ranges[-1].stop if ranges else None,
+        initial=done,
         unit="iB",
         unit_scale=True,
     ) as progress_bar:
-        for data in response.iter_content(block_size):
-            progress_bar.update(len(data))
-            handle.write(data)
+        with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            futures = [
+                executor.submit(
+                    _download_segment,
+                    url,
+                    part,
+                    segment,
+                    validator_path,
+                    progress_bar,
+                )
+                for part, segment in parts
+            ]
+            try:
+                return [future.result() for future in futures]
+            except DownloadError:
+                for part, _segment in parts:
+                    part.unlink(missing_ok=True)
+                validator_path.unlink(missing_ok=True)
+                raise
+
+
+def _download(
+    url: str,
+    description: str,
+    path: Path,
+    sha256: Optional[str],
+    segments: int,
+) -> None:
+    part_path = path.with_name(path.name + ".part")
+    validator_path = path.with_name(path.name + ".validator")
+    ranges, parts = _get_parts(url, path, segments, validator_path)
+
+    sizes = _download_parts(url, description, ranges, parts, validator_path)
+
+    if ranges:
+        _concatenate([part for part, _segment in parts], part_path)
+
+    try:
+        _verify(part_path, ranges[-1].stop if ranges else sizes[0], sha256)
+    except DownloadError:
+        part_path.unlink()
+        raise
+    finally:
+        validator_path.unlink(missing_ok=True)
+    part_path.replace(path)
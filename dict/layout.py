@@ -0,0 +1,68 @@
+"""Laying out text in the terminal."""
+import functools
+import shutil
+import unicodedata
+from collections.abc import Iterable
+from typing import IO
+
+
+@functools.lru_cache(maxsize=None)
+def char_width(char: str) -> int:
+    """Return the number of terminal cells taken by a single character.
+
+    :param char: character to measure
+    :return: 0 for combining and formatting characters, 2 for wide and
+        full-width East Asian characters, 1 otherwise
+    """
+    if unicodedata.combining(char) or unicodedata.category(char) in (
+        "Me",
+        "Mn",
+        "Cf",
+    ):
+        return 0
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return 2
+    return 1
+
+
+def display_width(text: str) -> int:
+    """Return the number of terminal cells taken by the text.
+
+    :param text: text to measure
+    :return: display width
+    """
+    if text.isascii():
+        return len(text)
+    return sum(map(char_width, text))
+
+
+def print_in_columns(
+    items: Iterable[str], file: IO[str], column_size: int = 0
+) -> None:
+    """Print items in columns, filling the terminal horizontally.
+
+    :param items: list of phrases to print in columns
+    :param file: output stream
+    :param column_size: max item width, if empty, calculate automatically
+    """
+    cells = [f"- {item} " for item in items]
+    widths = [display_width(cell) for cell in cells]
+    if not column_size:
+        column_size = max(widths, default=5)
+    term_size = shutil.get_terminal_size()
+    columns = max(1, term_size.columns // column_size)
+
+    for start in range(0, len(cells), columns):
+        row_cells = cells[start : start + columns]
+        row_widths = widths[start : start + columns]
+        padded = "".join(
+            cell + " " * (column_size - width)
+            for cell, width in zip(row_cells, row_widths)
+        )
+        row = padded.rstrip()
+        row_width = sum(max(width, column_size) for width in row_widths)
+        row_width -= display_width(padded[len(row) :])
+        print(
+            row, end="\n" if row_width < term_size.columns else "", file=file
+        )
+    print(file=file)
@@ -0,0 +1,120 @@
+"""Looking up the phrase as it is being typed."""
+import argparse
+import contextlib
+import io
+import re
+import shutil
+import sys
+from collections.abc import Iterator
+from typing import IO, Optional
+
+from dict.cli import print_lookup
+from dict.colors import COLOR_ERROR, COLOR_PROMPT, COLOR_RESET
+from dict.engines.base import BaseEngine
+from dict.engines.offline import OfflineEngine
+from dict.layout import display_width
+
+KEYS_QUIT = ("", "\x03", "\x04", "\x1B")
+KEYS_SUBMIT = ("\n", "\r")
+KEYS_BACKSPACE = ("\x7F", "\b")
+KEY_CLEAR = "\x15"  # ctrl-u
+
+CLEAR_SCREEN = "\x1B[H\x1B[2J"
+
+
+@contextlib.contextmanager
+def _cbreak(keys: IO[str]) -> Iterator[None]:
+    if not keys.isatty():
+        yield
+        return
+
+    # pylint: disable=import-outside-toplevel
+    import termios
+    import tty
+
+    attributes = termios.tcgetattr(keys.fileno())
+    tty.setcbreak(keys.fileno())
+    try:
+        yield
+    finally:
+        termios.tcsetattr(keys.fileno(), termios.TCSADRAIN, attributes)
+
+
+def is_supported(engine: BaseEngine) -> bool:
+    """Check whether the engine is fast enough to look up every keystroke.
+
+    :param engine: engine to check
+    :return: whether the engine uses a local dictionary
+    """
+    return isinstance(engine, OfflineEngine)
+
+
+def render(args: argparse.Namespace, phrase: str, file: IO[str]) -> None:
+    """Redraw the screen with the prompt and the results for the phrase.
+
+    :param args: parsed command line arguments
+    :param phrase: phrase typed so far
+    :param file: terminal to draw on
+    """
+    # each result takes at least one of the rows below the prompt, so the
+    # ones that would not fit are not even rendered
+    rows = max(shutil.get_terminal_size().lines - 1, 0)
+    buffer = io.StringIO()
+    if phrase:
+        try:
+            print_lookup(
+                args,
+                phrase,
+                lambda: contextlib.nullcontext(buffer),
+                max_results=rows,
+            )
+        except re.error:
+            print(
+                COLOR_ERROR + "incomplete pattern" + COLOR_RESET, file=buffer
+            )
+    lines = buffer.getvalue().rstrip().splitlines()[:rows]
+
+    prompt = f"{args.engine.primary_name}> "
+    file.write(CLEAR_SCREEN)
+    file.write(f"{COLOR_PROMPT}{prompt[:-1]}{COLOR_RESET} {phrase}")
+    for line in lines:
+        file.write("\n" + line)
+    # put the cursor back at the end of the prompt
+    column = display_width(prompt + phrase) + 1
+    file.write(f"\x1B[1;{column}H")
+    file.flush()
+
+
+def run_live(
+    args: argparse.Namespace,
+    keys: Optional[IO[str]] = None,
+    file: Optional[IO[str]] = None,
+) -> Optional[str]:
+    """Look up the phrase after each keystroke until the user submits it or
+    quits.
+
+    :param args: parsed command line arguments
+    :param keys: stream to read the keystrokes from, by default stdin
+    :param file: terminal to draw on, by default stdout
+    :return: the submitted phrase, or None if the user quit
+    """
+    keys = keys or sys.stdin
+    file = file or sys.stdout
+    phrase: Optional[str] = args.phrase or ""
+    with _cbreak(keys):
+        while phrase is not None:
+            render(args, phrase, file)
+            key = keys.read(1)
+            if key in KEYS_SUBMIT:
+                break
+            if key in KEYS_QUIT:
+                phrase = None
+            elif key in KEYS_BACKSPACE:
+                phrase = phrase[:-1]
+            elif key == KEY_CLEAR:
+                phrase = ""
+            elif key.isprintable():
+                phrase += key
+    file.write(CLEAR_SCREEN)
+    file.flush()
+    return phrase
@@ -1,62 +1,147 @@
 """Utilities related to terminal output."""
+import contextlib
 import io
-import shutil
+import itertools
 import subprocess
-from collections.abc import Iterable
-from typing import IO
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from typing import IO, TypeVar, cast
 
+T = TypeVar("T")
 
-def pager(text: str) -> None:
-    """Page through text in the terminal by feeding it to another program."""
+COLUMN_LOOKAHEAD = 16
+
+
+class RstripStream(io.TextIOBase):
+    """A text stream that drops the trailing whitespace of its contents.
+
+    Whitespace is held back until some more text arrives, so the output is
+    the same as if the whole text was collected and passed through
+    str.rstrip(), followed by a single newline written upon closing, but the
+    text can be forwarded to the underlying stream as it is produced.
+    """
+
+    def __init__(self, file: IO[str]) -> None:
+        """Initialize self.
+
+        :param file: underlying stream
+        """
+        super().__init__()
+        self.file = file
+        self._pending = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:  # type: ignore
+        text = self._pending + text
+        head = text.rstrip()
+        self._pending = text[len(head) :]
+        if head:
+            self.file.write(head)
+        return len(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.file.write("\n")
+            self.file.flush()
+        super().close()
+
+
+@contextlib.contextmanager
+def pager() -> Iterator[IO[str]]:
+    """Page through text in the terminal by feeding it to another program.
+
+    The text written to the yielded stream is passed to the pager as soon as
+    the stream is flushed, so the pager can display the first screen while
+    the rest of the text is still being produced.
+
+    :return: a context manager yielding the stream to write to
+    """
     proc = subprocess.Popen(  # pylint: disable=consider-using-with
         "less -C -r", shell=True, stdin=subprocess.PIPE
     )
 
-    if proc.stdin:
-        try:
-            with io.TextIOWrapper(
-                proc.stdin, errors="backslashreplace"
-            ) as pipe:
+    try:
+        if proc.stdin:
+            pipe = io.TextIOWrapper(proc.stdin, errors="backslashreplace")
+            try:
+                yield pipe
+            except KeyboardInterrupt:
+                # We've hereby abandoned whatever text hasn't been written,
+                # but the pager is still in control of the terminal.
+                pass
+            except BrokenPipeError:
+                pass  # The pager program has been quit.
+            finally:
                 try:
-                    pipe.write(text)
-                except KeyboardInterrupt:
-                    # We've hereby abandoned whatever text hasn't been written,
-                    # but the pager is still in control of the terminal.
+                    pipe.close()
+                except BrokenPipeError:
                     pass
-        except OSError:
-            pass  # Ignore broken pipes caused by quitting the pager program.
-
-    while True:
-        try:
-            proc.wait()
-            break
-        except KeyboardInterrupt:
-            # Ignore ctl-c like the pager itself does.  Otherwise the pager is
-            # left running and the terminal is in raw mode and unusable.
-            pass
-
-
-def print_in_columns(
-    items: Iterable[str], file: IO[str], column_size: int = 0
-) -> None:
-    """Print items in columns, filling the terminal horizontally.
-
-    :param items: list of phrases to print in columns
-    :param file: output stream
-    :param column_size: max item length, if empty, calculate automatically
-    """
-    items = [f"- {item} " for item in items]
-    if not column_size:
-        column_size = max((len(item) for item in items), default=5)
-    term_size = shutil.get_terminal_size()
-    columns = term_size.columns // column_size
-    while items:
-        row = ""
-        for _ in range(columns):
-            if not items:
+    finally:
+        while True:
+            try:
+                proc.wait()
                 break
-            item = items.pop(0)
-            row += f"{item:<{column_size}s}"
-        row = row.rstrip()
-        print(row, end="\n" if len(row) < term_size.columns else "", file=file)
-    print(file=file)
+            except KeyboardInterrupt:
+                # Ignore ctl-c like the pager itself does.  Otherwise the
+                # pager is left running and the terminal is in raw mode and
+                # unusable.
+                pass
+
+
+@contextlib.contextmanager
+def open_output(use_pager: bool) -> Iterator[IO[str]]:
+    """Open a stream for printing the results to the terminal.
+
+    Trailing whitespace is removed from the output.
+
+    :param use_pager: whether to pass the output through a pager
+    :return: a context manager yielding the stream to write to
+    """
+    with contextlib.ExitStack() as stack:
+        file = stack.enter_context(pager()) if use_pager else sys.stdout
+        with RstripStream(file) as stream:
+            yield cast(IO[str], stream)
+
+
+def flush_between(items: Iterable[T], file: IO[str]) -> Iterable[T]:
+    """Flush the stream every time the next item is requested.
+
+    Used to pass what has been printed so far to the terminal before waiting
+    for the next result.
+
+    :param items: items to iterate over
+    :param file: stream to flush
+    :return: a generator of the same items
+    """
+    for item in items:
+        yield item
+        file.flush()
+
+
+def with_column_size(
+    items: Iterable[T],
+    get_column_size: Callable[[T], int],
+    lookahead: int = COLUMN_LOOKAHEAD,
+) -> Iterable[tuple[T, int]]:
+    """Pair the items with a column size to lay them out consistently.
+
+    The column size is the maximum of the sizes of the first few items, so
+    that the items can be printed before all of them are known. It grows if
+    any of the subsequent items turns out to be larger.
+
+    :param items: items to iterate over
+    :param get_column_size: function returning the column size of an item
+    :param lookahead: number of items to examine before yielding the first
+    :return: a generator of items and their column sizes
+    """
+    iterator = iter(items)
+    head = list(itertools.islice(iterator, lookahead))
+    column_size = max(map(get_column_size, head), default=0)
+    for item in itertools.chain(head, iterator):
+        column_size = max(column_size, get_column_size(item))
+        yield item, column_size
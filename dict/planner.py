@@ -0,0 +1,200 @@
+"""Planning the searches of the offline dictionaries.
+
+Every match of a regular expression contains its required literals, e.g. a
+field matching "^食べ.*る$" begins with "食べ" and ends with "る". Instead of
+evaluating the expression against every line of the dictionary, the lines
+containing these literals are looked up first, either in the trigram index
+or with a plain substring search, and only they are confirmed with the full
+expression.
+"""
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from dict.trigram import TrigramIndex, fold, get_trigrams
+
+if sys.version_info >= (3, 11):
+    # pylint: disable=no-name-in-module
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+else:
+    import sre_parse  # pylint: disable=deprecated-module
+
+# the opcodes are generated at run time
+# pylint: disable=no-member
+
+# search the lines matched by the previous, broader phrase
+PLAN_REFINE = "refine"
+# search the lines with a term containing the trigrams of the literals
+PLAN_INDEX = "index"
+# search the lines containing the longest literal
+PLAN_LITERAL_SCAN = "literal scan"
+# search every line
+PLAN_FULL_SCAN = "full scan"
+# search the terms within the edit distance of the phrase
+PLAN_FUZZY = "fuzzy"
+
+_REPEATS = {
+    sre_parse.MAX_REPEAT,
+    sre_parse.MIN_REPEAT,
+    getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT),
+}
+_STARTS = {sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING}
+_ENDS = {sre_parse.AT_END, sre_parse.AT_END_STRING}
+
+
+@dataclass(frozen=True)
+class RequiredLiteral:
+    """A substring of every match of a regular expression."""
+
+    text: str
+    # whether the matched field begins or ends with the substring
+    anchored_start: bool = False
+    anchored_end: bool = False
+
+    def __str__(self) -> str:
+        return (
+            ("^" if self.anchored_start else "")
+            + self.text
+            + ("$" if self.anchored_end else "")
+        )
+
+    def get_trigrams(self) -> set[str]:
+        """Return the trigrams of the terms containing the literal.
+
+        :return: trigrams in the format of the trigram index
+        """
+        folded = fold(self.text)
+        # the indexed terms are stripped, and so are their padded trigrams
+        return get_trigrams(
+            folded.strip(),
+            at_start=self.anchored_start and not folded[:1].isspace(),
+            at_end=self.anchored_end and not folded[-1:].isspace(),
+        )
+
+    @property
+    def is_scannable(self) -> bool:
+        """Whether the literal can be found with a plain substring search in
+        the lowercase dictionary.
+
+        :return: whether its cased characters, if any, are ASCII
+        """
+        return bool(self.text) and all(
+            char.isascii() or char.lower() == char.upper()
+            for char in self.text
+        )
+
+
+@dataclass(frozen=True)
+class Candidates:
+    """The lines matched by a query, searched again by its refinements."""
+
+    text: str  # contents of the dictionary
+    phrase: str
+    lines: str
+    line_count: int
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """The way of finding the lines possibly matching a phrase."""
+
+    strategy: str
+    literals: tuple[RequiredLiteral, ...] = ()
+    index: Optional[TrigramIndex] = field(
+        default=None, repr=False, compare=False
+    )
+    # the lines to refine, kept with the plan, as the later queries replace
+    # the ones remembered by the engine
+    candidates: Optional[Candidates] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def __str__(self) -> str:
+        if not self.literals:
+            return self.strategy
+        return self.strategy + ": " + ", ".join(map(str, self.literals))
+
+
+@dataclass
+class _Run:
+    literals: list[RequiredLiteral]
+    chars: list[str] = field(default_factory=list)
+    anchored_start: bool = False
+
+
+def _flush(run: _Run, anchored_end: bool = False) -> None:
+    if run.chars:
+        run.literals.append(
+            RequiredLiteral(
+                "".join(run.chars), run.anchored_start, anchored_end
+            )
+        )
+    run.chars = []
+    run.anchored_start = False
+
+
+def _collect(items: Any, run: _Run) -> None:
+    for opcode, arg in items:
+        if opcode == sre_parse.LITERAL:
+            run.chars.append(chr(arg))
+        elif opcode == sre_parse.SUBPATTERN:
+            # the groups don't interrupt the literals
+            _collect(arg[-1], run)
+        elif opcode == sre_parse.AT and arg in _STARTS:
+            _flush(run)
+            run.anchored_start = True
+        elif opcode == sre_parse.AT and arg in _ENDS:
+            _flush(run, anchored_end=True)
+        elif opcode == sre_parse.AT:
+            pass  # the word boundaries don't consume any characters
+        elif opcode in _REPEATS:
+            _flush(run)
+            min_count, _max_count, body = arg
+            if min_count > 0:
+                body_run = _Run(run.literals)
+                _collect(body, body_run)
+                _flush(body_run)
+        else:
+            # alternatives, character sets, lookarounds etc.
+            _flush(run)
+
+
+def extract_literals(phrase: str) -> list[RequiredLiteral]:
+    """Find the substrings of every match of a regular expression.
+
+    Only the literals outside of the alternatives and the optional parts are
+    found, so the result may be empty even for the patterns that do have
+    required substrings, such as "(abc|xbc)".
+
+    :param phrase: regular expression, matched case-insensitively
+    :return: the required literals, in the order of their occurrence
+    """
+    literals: list[RequiredLiteral] = []
+    run = _Run(literals)
+    _collect(sre_parse.parse(phrase, re.I), run)
+    _flush(run)
+    return literals
+
+
+def plan_query(phrase: str, index: Optional[TrigramIndex] = None) -> QueryPlan:
+    """Choose the way of finding the lines possibly matching a phrase.
+
+    :param phrase: regular expression, matched case-insensitively
+    :param index: trigram index of the dictionary, if it is available
+    :return: the index plan if the index is available and the literals are
+        long enough to have trigrams, otherwise the literal scan if there are
+        any suitable literals, otherwise the full scan
+    """
+    literals = extract_literals(phrase)
+    if index is not None:
+        indexed = tuple(
+            literal for literal in literals if literal.get_trigrams()
+        )
+        if indexed:
+            return QueryPlan(PLAN_INDEX, indexed, index)
+    scannable = [literal for literal in literals if literal.is_scannable]
+    if scannable:
+        longest = max(scannable, key=lambda literal: len(literal.text))
+        return QueryPlan(PLAN_LITERAL_SCAN, (longest,))
+    return QueryPlan(PLAN_FULL_SCAN)
@@ -0,0 +1,76 @@
+"""Serializing the results to JSON."""
+import dataclasses
+import json
+from collections.abc import Callable, Iterable
+from typing import IO, Any
+
+_FIELD_NAMES: dict[type, tuple[str, ...]] = {}
+
+
+def _get_field_names(cls: type) -> tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = tuple(field.name for field in dataclasses.fields(cls))
+        _FIELD_NAMES[cls] = names
+    return names
+
+
+def _default(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {
+            name: getattr(obj, name) for name in _get_field_names(type(obj))
+        }
+    raise TypeError(
+        f"object of type {type(obj).__name__} is not JSON serializable"
+    )
+
+
+# The encoder handles the containers and the primitive types natively and
+# calls back for the dataclasses, which are converted shallowly, without the
+# deep copies made by dataclasses.asdict().
+_ENCODER = json.JSONEncoder(
+    ensure_ascii=False,
+    check_circular=False,
+    separators=(",", ":"),
+    default=_default,
+)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize an object, possibly containing results, to JSON.
+
+    :param obj: object to serialize
+    :return: compact JSON representation
+    """
+    return _ENCODER.encode(obj)
+
+
+def write_json(results: Iterable[Any], file: IO[str]) -> None:
+    """Write the results as a JSON array, one result at a time.
+
+    :param results: results to write
+    :param file: stream to write to
+    """
+    separator = "["
+    for result in results:
+        file.write(separator)
+        file.write(_ENCODER.encode(result))
+        separator = ",\n"
+    file.write("[]\n" if separator == "[" else "]\n")
+
+
+def write_jsonl(results: Iterable[Any], file: IO[str]) -> None:
+    """Write the results as JSON lines, one line per result.
+
+    :param results: results to write
+    :param file: stream to write to
+    """
+    for result in results:
+        file.write(_ENCODER.encode(result))
+        file.write("\n")
+
+
+WRITERS: dict[str, Callable[[Iterable[Any], IO[str]], None]] = {
+    "json": write_json,
+    "jsonl": write_jsonl,
+}
@@ -0,0 +1,279 @@
+"""An HTTP server answering the lookups with JSON.
+
+GET /lookup?engine=NAME&q=PHRASE looks up the phrase and replies with:
+
+    {"engine": "NAME", "phrase": "PHRASE", "results": [...]}
+
+where the results are the engine's result objects serialized to JSON. Any
+other query parameters are passed to the engine as its command line options,
+e.g. &source-lang=pl becomes --source-lang=pl, and a parameter without a
+value, e.g. &conjugate, becomes a flag. Only the long options defined by the
+engine itself are accepted; the options common to all engines, such as
+--cache-dir or --trace, are not, as they would let the clients write files
+on the server.
+
+The lookups run in a bounded pool of worker threads sharing the engine
+instances, so that the dictionaries are loaded once per process. When all
+the workers are busy and the queue is full, the server replies with 503.
+The time taken by each request is reported in the Server-Timing header and
+in the request log.
+"""
+import argparse
+import http.server
+import socket
+import sys
+import threading
+import time
+import traceback
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Union
+
+from dict import cli
+from dict.engines import BaseEngine
+from dict.engines.registry import load_engine
+from dict.http import SCHEDULER
+from dict.serialize import dumps
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 8
+DEFAULT_BACKLOG = 64
+
+# the engine options that print to the server's stderr
+_EXCLUDED_OPTIONS = {"stats", "explain"}
+
+
+class LookupRequestError(Exception):
+    """Raised when a lookup request is invalid."""
+
+
+def get_lookup_options(engine_name: str) -> set[str]:
+    """Return the options of an engine that can be given in a query.
+
+    :param engine_name: engine name
+    :return: long option names of the engine, without the leading dashes
+    """
+    try:
+        cls = load_engine(engine_name)
+    except KeyError as ex:
+        raise LookupRequestError(f"unknown engine: {engine_name}") from ex
+    parser = argparse.ArgumentParser(add_help=False)
+    cls.decorate_arg_parser(parser)
+    return {
+        option[2:]
+        for action in parser._actions  # pylint: disable=protected-access
+        for option in action.option_strings
+        if option.startswith("--")
+    } - _EXCLUDED_OPTIONS
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    server: "LookupServer"
+    elapsed = 0.0
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Answer a lookup request."""
+        start = time.perf_counter()
+        url = urllib.parse.urlsplit(self.path)
+        status = 200
+        body: dict[str, Any]
+        if url.path != "/lookup":
+            status, body = 404, {"error": f"no such endpoint: {url.path}"}
+        else:
+            try:
+                body = self.server.lookup(
+                    urllib.parse.parse_qs(url.query, keep_blank_values=True)
+                )
+            except LookupRequestError as ex:
+                status, body = 400, {"error": str(ex)}
+            except Exception as ex:  # pylint: disable=broad-except
+                self.log_error("lookup failed: %r", ex)
+                traceback.print_exc()
+                status, body = 500, {"error": str(ex)}
+
+        content = dumps(body).encode()
+        self.elapsed = time.perf_counter() - start
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header(
+            "Server-Timing", f"lookup;dur={self.elapsed * 1e3:.1f}"
+        )
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_request(
+        self, code: Union[int, str] = "-", size: Union[int, str] = "-"
+    ) -> None:
+        self.log_message(
+            '"%s" %s %s %.1fms',
+            self.requestline,
+            code,
+            size,
+            self.elapsed * 1e3,
+        )
+
+
+class LookupServer(http.server.HTTPServer):
+    """A server answering the lookups in a bounded pool of worker threads.
+
+    The engines are created once for the whole lifetime of the server and
+    shared among the workers.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        workers: int = DEFAULT_WORKERS,
+        backlog: int = DEFAULT_BACKLOG,
+    ) -> None:
+        """Initialize self.
+
+        :param address: host and port to listen on
+        :param workers: number of the lookups to carry out concurrently
+        :param backlog: number of the requests to queue when all the workers
+            are busy, before refusing more
+        """
+        super().__init__(address, _RequestHandler)
+        self.engines: dict[type[BaseEngine], BaseEngine] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="dict-lookup"
+        )
+        self._slots = threading.BoundedSemaphore(workers + backlog)
+        self._engines_lock = threading.Lock()
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        # the slot is released once the worker is done with the request
+        # pylint: disable=consider-using-with
+        if not self._slots.acquire(blocking=False):
+            self._refuse(request)
+            self.shutdown_request(request)
+            return
+        self._executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # pylint: disable=broad-except
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    @staticmethod
+    def _refuse(request: socket.socket) -> None:
+        try:
+            request.sendall(
+                b"HTTP/1.0 503 Service Unavailable\r\n"
+                b"Retry-After: 1\r\n"
+                b"Content-Length: 0\r\n"
+                b"\r\n"
+            )
+        except OSError:
+            pass
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+    def lookup(self, params: dict[str, list[str]]) -> dict[str, Any]:
+        """Carry out a single lookup.
+
+        :param params: query parameters of the request
+        :return: response body
+        """
+        params = dict(params)
+        engine_name = next(iter(params.pop("engine", [])), None)
+        phrase = next(iter(params.pop("q", [])), None)
+        if not engine_name or phrase is None:
+            raise LookupRequestError(
+                "the engine and q parameters are required"
+            )
+
+        allowed_options = get_lookup_options(engine_name)
+        args = ["-e", engine_name]
+        for key, values in params.items():
+            if key not in allowed_options:
+                raise LookupRequestError(f"unsupported parameter: {key}")
+            for value in values:
+                args.append(f"--{key}={value}" if value else f"--{key}")
+
+        try:
+            with self._engines_lock:
+                parsed_args = cli.parse_args(
+                    args,
+                    engine_cache=self.engines,
+                    parser_class=cli.StrictArgumentParser,
+                )
+        except cli.UsageError as ex:
+            raise LookupRequestError(str(ex)) from ex
+        except SystemExit as ex:
+            raise LookupRequestError("invalid arguments") from ex
+
+        return {
+            "engine": parsed_args.engine.primary_name,
+            "phrase": phrase,
+            "results": list(parsed_args.engine.lookup(parsed_args, phrase)),
+        }
+
+
+def parse_args(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    :return: parsed command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m dict.server",
+        description="Serves the dictionary lookups over HTTP.",
+    )
+    parser.add_argument(
+        "-H", "--host", default=DEFAULT_HOST, help="address to listen on"
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="port to listen on",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="number of concurrent lookups",
+    )
+    parser.add_argument(
+        "-b",
+        "--backlog",
+        type=int,
+        default=DEFAULT_BACKLOG,
+        help="number of requests to queue when all the workers are busy",
+    )
+    cli.add_timeout_argument(parser)
+    return parser.parse_args(args)
+
+
+def main(args: list[str]) -> None:
+    """Serve the lookups until interrupted."""
+    parsed_args = parse_args(args)
+    SCHEDULER.timeout = parsed_args.timeout
+    with LookupServer(
+        (parsed_args.host, parsed_args.port),
+        workers=parsed_args.workers,
+        backlog=parsed_args.backlog,
+    ) as server:
+        print(
+            f"listening on http://{parsed_args.host}:{server.server_port}"
+            "/lookup",
+            file=sys.stderr,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,523 @@
+"""Generating synthetic dictionaries for load testing.
+
+The generated entries resemble the real ones: they have multiple spellings
+and readings, numbered senses, part of speech, miscellaneous and field tags,
+common word markers and audio markers, and can be written both as EDICT2
+lines and as JMdict XML, so that the parsers, the index builders and the
+scans of the offline engines can be exercised at scale without downloading
+anything:
+
+    python -m dict.synthetic edict2 edict2.txt --scale 10
+    python -m dict.synthetic jmdict jmdict.xml -n 50000 --kana-ratio 0.5
+
+The same configuration and seed always produce the same entries, in both
+formats.
+"""
+import argparse
+import random
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Optional
+from xml.sax.saxutils import escape
+
+from dict.engines.edict2 import (
+    DIALECT_CODES,
+    FIELD_OF_APPLICATION_CODES,
+    MISCELLANEOUS_CODES,
+    PART_OF_SPEECH_CODES,
+)
+from dict.engines.jmdict import PART_OF_SPEECH_DESCRIPTIONS
+
+# number of entries in the English edition of JMdict
+JMDICT_ENTRIES = 210_000
+
+FIRST_ENT_SEQ = 1_000_000
+
+# relative frequencies of the most common parts of speech in JMdict
+DEFAULT_POS_WEIGHTS = {
+    "n": 50.0,
+    "vs": 12.0,
+    "adj-na": 6.0,
+    "adj-no": 5.0,
+    "exp": 5.0,
+    "adv": 3.0,
+    "v5r": 2.0,
+    "v1": 2.0,
+    "v5s": 1.0,
+    "v5k": 1.0,
+    "v5u": 1.0,
+    "v5m": 0.5,
+    "v5t": 0.5,
+    "v5g": 0.3,
+    "v5b": 0.2,
+    "v5n": 0.1,
+    "adj-i": 2.0,
+    "n-suf": 1.0,
+    "ctr": 0.5,
+    "int": 0.5,
+}
+
+MISCELLANEOUS_WEIGHTS = {
+    "uk": 10.0,
+    "abbr": 2.0,
+    "col": 2.0,
+    "arch": 1.0,
+    "sl": 1.0,
+    "hon": 0.5,
+    "hum": 0.5,
+    "on-mim": 0.5,
+}
+
+# the JMdict XML uses entities expanding to these descriptions for the tags
+TAG_DESCRIPTIONS = {
+    **PART_OF_SPEECH_DESCRIPTIONS,
+    "n": "noun (common) (futsuumeishi)",
+    "adj-na": "adjectival nouns or quasi-adjectives (keiyodoshi)",
+    "adj-no": "nouns which may take the genitive case particle `no'",
+    "exp": "expressions (phrases, clauses, etc.)",
+    "adv": "adverb (fukushi)",
+    "vt": "transitive verb",
+    "vi": "intransitive verb",
+    "n-suf": "noun, used as a suffix",
+    "ctr": "counter",
+    "int": "interjection (kandoushi)",
+    "uk": "word usually written using kana alone",
+    "abbr": "abbreviation",
+    "col": "colloquialism",
+    "arch": "archaism",
+    "sl": "slang",
+    "hon": "honorific or respectful (sonkeigo) language",
+    "hum": "humble (kenjougo) language",
+    "on-mim": "onomatopoeic or mimetic word",
+}
+
+PRIORITY_TAGS = ("news1", "ichi1", "spec1", "spec2", "gai1", "news2", "ichi2")
+
+KANJI = (
+    "日一国人年大十二本中長出三時行見月分後前生五間上東四今金九入学高円子外"
+    "八六下来気小七山話女北午百書先名川千水半男西電校語土木聞食車何南万毎白"
+    "天母火右読友左休父雨会同事自社発者地業方新場員立開手力問代明動京目通言"
+    "理体田主題意不作用度強公持野以思家世多正安院心界教文元重近考画海売知道"
+)
+HIRAGANA = (
+    "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもや"
+    "ゆよらりるれろわをんがぎぐげござじずぜぞだぢづでどばびぶべぼぱぴぷぺぽ"
+)
+KATAKANA = (
+    "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤ"
+    "ユヨラリルレロワヲンガギグゲゴザジズゼゾダヂヅデドバビブベボパピプペポー"
+)
+
+WORDS = {
+    "eng": (
+        "water fire tree metal earth mountain river field person mouth eye "
+        "hand foot heart flower grass rain snow wind sky sea forest stone "
+        "book school car train station house room door window table chair "
+        "time year month day hour week morning evening night light sound "
+        "word language letter name country city village road bridge market "
+        "money work friend family child mother father teacher student doctor "
+        "large small old new long short high low good bad fast slow early "
+        "late hot cold strong weak bright dark quiet busy easy difficult"
+    ).split(),
+    "ger": (
+        "Wasser Feuer Baum Metall Erde Berg Fluss Feld Mensch Mund Auge Hand "
+        "Fuß Herz Blume Gras Regen Schnee Wind Himmel Meer Wald Stein Buch"
+    ).split(),
+    "fre": (
+        "eau feu arbre métal terre montagne rivière champ personne bouche "
+        "œil main pied cœur fleur herbe pluie neige vent ciel mer forêt"
+    ).split(),
+    "rus": (
+        "вода огонь дерево металл земля гора река поле человек рот глаз "
+        "рука нога сердце цветок трава дождь снег ветер небо море лес"
+    ).split(),
+}
+# ichidan and godan verbs, glossed as "to ..." and marked as transitive or
+# intransitive
+VERB_POS_PREFIXES = ("v1", "v5")
+
+
+@dataclass
+class GeneratorConfig:
+    """Parameters of the generated dictionary."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    entries: int = 1000
+    seed: int = 0
+    # fractions of the entries written with kanji, in hiragana only and in
+    # katakana only (loanwords); normalized to add up to one
+    kanji_ratio: float = 0.75
+    kana_ratio: float = 0.15
+    katakana_ratio: float = 0.10
+    # fraction of the entries marked as common words
+    common_ratio: float = 0.15
+    # fraction of the entries with audio clips, marked in EDICT2 only
+    audio_ratio: float = 0.5
+    # relative frequencies of the parts of speech
+    pos_weights: dict[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_POS_WEIGHTS)
+    )
+    # probabilities of a sense having a miscellaneous and a field tag
+    misc_ratio: float = 0.2
+    field_ratio: float = 0.05
+    max_senses: int = 4
+    max_glosses: int = 4
+    # languages of the glosses; EDICT2 contains only the English ones
+    languages: tuple[str, ...] = ("eng",)
+
+
+@dataclass
+class SyntheticSense:
+    """A single meaning of a generated entry."""
+
+    parts_of_speech: list[str]
+    miscellaneous: list[str]
+    field: Optional[str]
+    glosses: dict[str, list[str]]  # by language
+
+
+@dataclass
+class SyntheticEntry:
+    """A generated dictionary entry."""
+
+    ent_seq: int
+    kanji: list[str]
+    readings: list[str]
+    senses: list[SyntheticSense]
+    priorities: list[str]
+    has_audio: bool
+
+
+class _Generator:
+    def __init__(self, config: GeneratorConfig) -> None:
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.pos_codes = list(config.pos_weights)
+        self.pos_weights = list(config.pos_weights.values())
+        self.misc_codes = list(MISCELLANEOUS_WEIGHTS)
+        self.misc_weights = list(MISCELLANEOUS_WEIGHTS.values())
+        total = config.kanji_ratio + config.kana_ratio + config.katakana_ratio
+        self.script_weights = [
+            config.kanji_ratio / total,
+            config.kana_ratio / total,
+            config.katakana_ratio / total,
+        ]
+
+    def __iter__(self) -> Iterator[SyntheticEntry]:
+        for i in range(self.config.entries):
+            yield self._entry(FIRST_ENT_SEQ + i)
+
+    def _word(self, chars: str, min_length: int, max_length: int) -> str:
+        length = min(max_length, min_length + int(self.rng.expovariate(1.0)))
+        return "".join(self.rng.choices(chars, k=length))
+
+    def _gloss(self, language: str, pos: str) -> str:
+        words = self.rng.choices(WORDS[language], k=self.rng.randint(1, 3))
+        if language == "eng" and pos.startswith(VERB_POS_PREFIXES):
+            words.insert(0, "to")
+        return " ".join(words)
+
+    def _sense(self) -> SyntheticSense:
+        rng = self.rng
+        pos = rng.choices(self.pos_codes, self.pos_weights)
+        if pos[0].startswith(VERB_POS_PREFIXES):
+            pos.append(rng.choice(["vt", "vi"]))
+        return SyntheticSense(
+            parts_of_speech=pos,
+            miscellaneous=(
+                rng.choices(self.misc_codes, self.misc_weights)
+                if rng.random() < self.config.misc_ratio
+                else []
+            ),
+            field=(
+                rng.choice(FIELD_OF_APPLICATION_CODES)
+                if rng.random() < self.config.field_ratio
+                else None
+            ),
+            glosses={
+                language: [
+                    self._gloss(language, pos[0])
+                    for _ in range(rng.randint(1, self.config.max_glosses))
+                ]
+                for language in self.config.languages
+            },
+        )
+
+    def _entry(self, ent_seq: int) -> SyntheticEntry:
+        rng = self.rng
+        script = rng.choices(range(3), self.script_weights)[0]
+        if script == 0:
+            kanji = [self._word(KANJI, 1, 4) for _ in range(rng.randint(1, 3))]
+            readings = [
+                self._word(HIRAGANA, 2, 8) for _ in range(rng.randint(1, 2))
+            ]
+        else:
+            kanji = []
+            readings = [
+                self._word(HIRAGANA if script == 1 else KATAKANA, 2, 8)
+            ]
+        priorities = []
+        if rng.random() < self.config.common_ratio:
+            priorities = rng.sample(PRIORITY_TAGS, rng.randint(1, 2))
+        return SyntheticEntry(
+            ent_seq=ent_seq,
+            kanji=kanji,
+            readings=readings,
+            senses=[
+                self._sense()
+                for _ in range(
+                    min(self.config.max_senses, 1 + int(rng.expovariate(1.5)))
+                )
+            ],
+            priorities=priorities,
+            has_audio=rng.random() < self.config.audio_ratio,
+        )
+
+
+def generate_entries(config: GeneratorConfig) -> Iterator[SyntheticEntry]:
+    """Generate the dictionary entries.
+
+    :param config: parameters of the dictionary
+    :return: a generator of entries
+    """
+    return iter(_Generator(config))
+
+
+def format_edict2_line(entry: SyntheticEntry) -> str:
+    """Format an entry as an EDICT2 line.
+
+    :param entry: entry to format
+    :return: line, including the line terminator
+    """
+    common = bool(entry.priorities)
+    marker = "(P)" if common else ""
+    readings = ";".join([entry.readings[0] + marker, *entry.readings[1:]])
+    if entry.kanji:
+        kanji = ";".join([entry.kanji[0] + marker, *entry.kanji[1:]])
+        head = f"{kanji} [{readings}]"
+    else:
+        head = readings
+
+    parts = []
+    numbered = len(entry.senses) > 1
+    for i, sense in enumerate(entry.senses, 1):
+        tags = f"({','.join(sense.parts_of_speech)}) "
+        if sense.miscellaneous:
+            tags += f"({','.join(sense.miscellaneous)}) "
+        if sense.field:
+            tags += f"{{{sense.field}}} "
+        if numbered:
+            tags += f"({i}) "
+        glosses = sense.glosses.get("eng") or ["?"]
+        parts.append(tags + glosses[0])
+        parts.extend(glosses[1:])
+    if common:
+        parts.append("(P)")
+    audio = "X" if entry.has_audio else ""
+    parts.append(f"EntL{entry.ent_seq}{audio}")
+    return f"{head} /{'/'.join(parts)}/\n"
+
+
+def format_jmdict_entry(entry: SyntheticEntry) -> str:
+    """Format an entry as a JMdict XML element.
+
+    :param entry: entry to format
+    :return: XML, including the line terminator
+    """
+    parts = [f"<entry>\n<ent_seq>{entry.ent_seq}</ent_seq>\n"]
+    for i, kanji in enumerate(entry.kanji):
+        parts.append(f"<k_ele>\n<keb>{kanji}</keb>\n")
+        if i == 0:
+            parts.extend(
+                f"<ke_pri>{pri}</ke_pri>\n" for pri in entry.priorities
+            )
+        parts.append("</k_ele>\n")
+    for i, reading in enumerate(entry.readings):
+        parts.append(f"<r_ele>\n<reb>{reading}</reb>\n")
+        if i == 0:
+            parts.extend(
+                f"<re_pri>{pri}</re_pri>\n" for pri in entry.priorities
+            )
+        parts.append("</r_ele>\n")
+    for sense in entry.senses:
+        parts.append("<sense>\n")
+        parts.extend(f"<pos>&{pos};</pos>\n" for pos in sense.parts_of_speech)
+        if sense.field:
+            parts.append(f"<field>&{sense.field};</field>\n")
+        parts.extend(
+            f"<misc>&{misc};</misc>\n" for misc in sense.miscellaneous
+        )
+        for language, glosses in sense.glosses.items():
+            lang = "" if language == "eng" else f' xml:lang="{language}"'
+            parts.extend(
+                f"<gloss{lang}>{escape(gloss)}</gloss>\n" for gloss in glosses
+            )
+        parts.append("</sense>\n")
+    parts.append("</entry>\n")
+    return "".join(parts)
+
+
+def _get_jmdict_header() -> str:
+    codes = (
+        PART_OF_SPEECH_CODES
+        + MISCELLANEOUS_CODES
+        + FIELD_OF_APPLICATION_CODES
+        + DIALECT_CODES
+    )
+    entities = "".join(
+        f'<!ENTITY {code} "{escape(TAG_DESCRIPTIONS.get(code, code))}">\n'
+        for code in dict.fromkeys(codes)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f"<!DOCTYPE JMdict [\n{entities}]>\n"
+        "<JMdict>\n"
+    )
+
+
+def write_edict2(file: IO[str], entries: Iterable[SyntheticEntry]) -> None:
+    """Write a dictionary in the EDICT2 format.
+
+    :param file: stream to write to
+    :param entries: entries to write
+    """
+    for entry in entries:
+        file.write(format_edict2_line(entry))
+
+
+def write_jmdict_xml(file: IO[str], entries: Iterable[SyntheticEntry]) -> None:
+    """Write a dictionary in the JMdict XML format.
+
+    The tags are written as entity references, declared in the internal
+    subset of the document type definition, as in the original file.
+
+    :param file: stream to write to
+    :param entries: entries to write
+    """
+    file.write(_get_jmdict_header())
+    for entry in entries:
+        file.write(format_jmdict_entry(entry))
+    file.write("</JMdict>\n")
+
+
+WRITERS: dict[str, Callable[[IO[str], Iterable[SyntheticEntry]], None]] = {
+    "edict2": write_edict2,
+    "jmdict": write_jmdict_xml,
+}
+
+
+def _parse_weight(value: str) -> tuple[str, float]:
+    code, _, weight = value.partition("=")
+    try:
+        return code, float(weight or 1.0)
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(
+            f"expected CODE=WEIGHT, got {value!r}"
+        ) from ex
+
+
+def parse_args(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    :return: parsed command line arguments
+    """
+    defaults = GeneratorConfig()
+    parser = argparse.ArgumentParser(
+        prog="python -m dict.synthetic",
+        description="Generates a synthetic dictionary for load testing.",
+    )
+    parser.add_argument("format", choices=WRITERS, help="dictionary format")
+    parser.add_argument(
+        "path", type=Path, help="path to the dictionary file to create"
+    )
+    size_group = parser.add_mutually_exclusive_group()
+    size_group.add_argument(
+        "-n",
+        "--entries",
+        type=int,
+        default=defaults.entries,
+        help="number of entries",
+    )
+    size_group.add_argument(
+        "--scale",
+        type=float,
+        help=f"number of entries as a multiple of JMdict ({JMDICT_ENTRIES})",
+    )
+    parser.add_argument(
+        "-s", "--seed", type=int, default=defaults.seed, help="random seed"
+    )
+    parser.add_argument(
+        "--kanji-ratio",
+        type=float,
+        default=defaults.kanji_ratio,
+        help="relative number of the entries written with kanji",
+    )
+    parser.add_argument(
+        "--kana-ratio",
+        type=float,
+        default=defaults.kana_ratio,
+        help="relative number of the entries written in hiragana only",
+    )
+    parser.add_argument(
+        "--katakana-ratio",
+        type=float,
+        default=defaults.katakana_ratio,
+        help="relative number of the entries written in katakana only",
+    )
+    parser.add_argument(
+        "--common-ratio",
+        type=float,
+        default=defaults.common_ratio,
+        help="fraction of the entries marked as common words",
+    )
+    parser.add_argument(
+        "--pos",
+        type=_parse_weight,
+        action="append",
+        metavar="CODE=WEIGHT",
+        help=(
+            "relative frequency of a part of speech, can be given multiple "
+            "times to replace the default distribution"
+        ),
+    )
+    parser.add_argument(
+        "--languages",
+        nargs="+",
+        choices=WORDS,
+        default=list(defaults.languages),
+        help="languages of the glosses (JMdict only)",
+    )
+    return parser.parse_args(args)
+
+
+def main(args: list[str]) -> None:
+    """Generate the dictionary."""
+    parsed_args = parse_args(args)
+    config = GeneratorConfig(
+        entries=(
+            round(parsed_args.scale * JMDICT_ENTRIES)
+            if parsed_args.scale is not None
+            else parsed_args.entries
+        ),
+        seed=parsed_args.seed,
+        kanji_ratio=parsed_args.kanji_ratio,
+        kana_ratio=parsed_args.kana_ratio,
+        katakana_ratio=parsed_args.katakana_ratio,
+        common_ratio=parsed_args.common_ratio,
+        languages=tuple(parsed_args.languages),
+    )
+    if parsed_args.pos:
+        config.pos_weights = dict(parsed_args.pos)
+    with parsed_args.path.open("w", encoding="utf-8") as handle:
+        WRITERS[parsed_args.format](handle, generate_entries(config))
+    print(
+        f"wrote {config.entries} entries to {parsed_args.path}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
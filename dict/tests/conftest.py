@@ -3,6 +3,8 @@ from pathlib import Path
 
 import pytest
 
+from dict.http import RequestScheduler
+
 
 @pytest.fixture(name="data_dir")
 def fixture_data_dir() -> Path:
@@ -11,3 +13,13 @@ def fixture_data_dir() -> Path:
     :return: path to the data directory
     """
     return Path(__file__).parent / "testdata"
+
+
+@pytest.fixture(autouse=True)
+def fixture_scheduler(monkeypatch) -> None:
+    """Give each test its own request scheduler, so that the requests made by
+    one test never throttle another.
+    """
+    monkeypatch.setattr(
+        "dict.http.SCHEDULER", RequestScheduler(sleep=lambda _: None)
+    )
@@ -0,0 +1,56 @@
+"""Tests for the dict.benchmark module."""
+import json
+from pathlib import Path
+
+import pytest
+
+from dict.benchmark import BENCHMARKS, create_corpus, main, summarize
+from dict.engines.edict2 import parse_edict2_line
+from dict.engines.jmdict import entry_from_line
+
+
+def test_summarize() -> None:
+    """Test computing the statistics of the measurements."""
+    stats = summarize([i / 1000 for i in range(1, 101)])
+    assert stats["count"] == 100
+    assert stats["min_ms"] == pytest.approx(1.0)
+    assert stats["p50_ms"] == pytest.approx(50.5)
+    assert stats["p99_ms"] == pytest.approx(99.01)
+    assert stats["max_ms"] == pytest.approx(100.0)
+
+
+def test_summarize_single() -> None:
+    """Test computing the statistics of a single measurement."""
+    stats = summarize([0.002])
+    assert stats["p50_ms"] == stats["p99_ms"] == pytest.approx(2.0)
+
+
+def test_create_corpus(tmp_path: Path) -> None:
+    """Test that the synthetic dictionaries can be parsed."""
+    corpus = create_corpus(tmp_path, 20, queries=3)
+    edict2_lines = corpus.edict2_path.read_text(encoding="utf-8").splitlines()
+    jmdict_lines = corpus.jmdict_index_path.read_text(
+        encoding="utf-8"
+    ).splitlines()
+    assert len(edict2_lines) == len(jmdict_lines) == 20
+    assert all(parse_edict2_line(line).glossaries for line in edict2_lines)
+    assert all(entry_from_line(line).readings for line in jmdict_lines)
+    assert len(corpus.queries) == 3
+
+
+def test_benchmark_report(tmp_path: Path, capsys) -> None:
+    """Test saving the report and comparing it against a previous run."""
+    output = tmp_path / "report.json"
+    args = ["-n", "30", "-r", "2", "-q", "2", "-b", *BENCHMARKS]
+    main([*args, "-o", str(output)])
+    report = json.loads(output.read_text())
+    assert set(report["results"]) == {f"{name}/30" for name in BENCHMARKS}
+    assert report["results"]["parse/30"]["count"] == 2
+    assert report["results"]["parse/30"]["peak_memory_kib"] > 0
+    assert report["results"]["edict2/30"]["count"] == 4
+    capsys.readouterr()
+
+    main([*args, "-c", str(output)])
+    out = capsys.readouterr().out
+    assert "parse/30" in out
+    assert "x)" in out
@@ -0,0 +1,159 @@
+"""Tests for the dict.cache module."""
+import argparse
+import itertools
+from collections.abc import Hashable, Iterable
+from pathlib import Path
+from typing import IO
+
+from dict.cache import DiskResultCache, NegativeCache, ResultCache
+from dict.engines import BaseEngine
+
+
+class FakeClock:
+    """A manually advanced clock."""
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_negative_cache_expiry() -> None:
+    """Test that the misses are forgotten after the TTL."""
+    clock = FakeClock()
+    cache = NegativeCache(ttl=10, clock=clock)
+    cache.add("key")
+    assert "key" in cache
+    assert "other" not in cache
+    clock.now = 9.9
+    assert "key" in cache
+    clock.now = 10
+    assert "key" not in cache
+    assert not cache
+
+
+def test_negative_cache_size_limit() -> None:
+    """Test that the least recently used misses are evicted first."""
+    cache = NegativeCache(maxsize=2)
+    cache.add("a")
+    cache.add("b")
+    assert "a" in cache
+    cache.add("c")
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_result_cache_size_limit() -> None:
+    """Test that the cache holds at most the given number of results."""
+    cache = ResultCache(maxsize=5)
+    cache.put("a", [1, 2])
+    cache.put("b", [3, 4])
+    assert cache.get("a") == [1, 2]
+    cache.put("c", [5, 6])
+    assert cache.get("a") == [1, 2]
+    assert cache.get("b") is None
+    assert cache.get("c") == [5, 6]
+    assert cache.size == 4
+    cache.put("d", list(range(6)))
+    assert cache.get("d") is None
+    assert len(cache) == 2
+
+
+def test_result_cache_expiry() -> None:
+    """Test that the results are forgotten after the TTL."""
+    clock = FakeClock()
+    cache = ResultCache(ttl=10, clock=clock)
+    cache.put("key", [])
+    assert cache.get("key") == []
+    clock.now = 10
+    assert cache.get("key") is None
+    assert cache.size == 0
+
+
+def test_disk_result_cache(tmp_path: Path) -> None:
+    """Test remembering the results on disk."""
+    clock = FakeClock()
+    cache = DiskResultCache(tmp_path / "cache", ttl=10, clock=clock)
+    assert cache.get(("key", 1)) is None
+    cache.put(("key", 1), ["result"])
+    other_cache = DiskResultCache(tmp_path / "cache", ttl=10, clock=clock)
+    assert other_cache.get(("key", 1)) == ["result"]
+    assert other_cache.get(("key", 2)) is None
+    cache.put("unpicklable", [lambda: None])
+    assert cache.get("unpicklable") is None
+    clock.now = 10
+    assert other_cache.get(("key", 1)) is None
+
+
+class MemoEngine(BaseEngine[str]):
+    """An engine counting its lookups."""
+
+    names = ["memo-engine"]
+    cache_key_args = ["upper"]
+    version = 1
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        super().__init__()
+        self.lookups = 0
+
+    def get_data_version(self) -> Hashable:
+        return self.version
+
+    def lookup_phrase(
+        self, args: argparse.Namespace, phrase: str
+    ) -> Iterable[str]:
+        self.lookups += 1
+        yield from (phrase.upper() if args.upper else phrase)
+
+    def print_results(self, results: Iterable[str], file: IO[str]) -> None:
+        raise NotImplementedError("not implemented")
+
+
+def test_engine_memoization() -> None:
+    """Test that the engines remember the results in memory."""
+    engine = MemoEngine()
+    args = argparse.Namespace(upper=False, other=1)
+    assert list(engine.lookup(args, "abc")) == ["a", "b", "c"]
+    assert list(engine.lookup(args, "abc")) == ["a", "b", "c"]
+    assert engine.lookups == 1
+
+    # the arguments affecting the results are part of the key
+    assert list(engine.lookup(argparse.Namespace(upper=True), "abc")) == [
+        "A",
+        "B",
+        "C",
+    ]
+    assert list(engine.lookup(argparse.Namespace(upper=False), "abc")) == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert engine.lookups == 2
+
+    # the results of an interrupted lookup are not remembered
+    list(itertools.islice(engine.lookup(args, "xyz"), 1))
+    assert list(engine.lookup(args, "xyz")) == ["x", "y", "z"]
+    assert engine.lookups == 4
+
+    # the results are looked up again once the data changes
+    engine.version = 2
+    assert list(engine.lookup(args, "abc")) == ["a", "b", "c"]
+    assert engine.lookups == 5
+
+
+def test_engine_disk_memoization(tmp_path: Path) -> None:
+    """Test that the results are remembered on disk across the instances."""
+    args = argparse.Namespace(upper=False, cache_dir=tmp_path)
+    engine = MemoEngine()
+    assert list(engine.lookup(args, "abc")) == ["a", "b", "c"]
+
+    other_engine = MemoEngine()
+    assert list(other_engine.lookup(args, "abc")) == ["a", "b", "c"]
+    assert list(other_engine.lookup(args, "abc")) == ["a", "b", "c"]
+    assert other_engine.lookups == 0
+    assert (tmp_path / "memo-engine").is_dir()
@@ -0,0 +1,81 @@
+"""Tests for the dict.cassette module."""
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from dict.__main__ import main
+from dict.cassette import Cassette, CassetteError, CassetteMode
+from dict.cassette import main as cassette_main
+
+
+def _record_reverso(data_dir: Path, path: Path) -> None:
+    content = (data_dir / "reverso_in.html").read_bytes()
+    with patch(
+        "requests.get",
+        return_value=Mock(
+            status_code=200,
+            headers={"Content-Type": "text/html; charset=utf-8"},
+            content=content,
+        ),
+    ), Cassette(path, mode=CassetteMode.RECORD):
+        main(["-e", "reverso", "-N", "ridiculous", "-s", "pl", "-d", "en"])
+
+
+@pytest.mark.parametrize("bandwidth", [None, 10_000_000.0])
+def test_cassette_replay(
+    tmp_path: Path, data_dir: Path, capsys, bandwidth
+) -> None:
+    """Test replaying a recorded lookup without network access."""
+    path = tmp_path / "reverso.json"
+    _record_reverso(data_dir, path)
+    capsys.readouterr()
+
+    with patch("requests.get", side_effect=AssertionError), Cassette(
+        path, bandwidth=bandwidth
+    ):
+        main(["-e", "reverso", "-N", "ridiculous", "-s", "pl", "-d", "en"])
+
+    assert (
+        capsys.readouterr().out == (data_dir / "reverso_out.txt").read_text()
+    )
+
+
+def test_cassette_replay_unknown_url(tmp_path: Path, data_dir: Path) -> None:
+    """Test that requests missing from the cassette are reported."""
+    path = tmp_path / "reverso.json"
+    _record_reverso(data_dir, path)
+
+    with Cassette(path), pytest.raises(CassetteError):
+        main(["-e", "reverso", "-N", "other", "-s", "pl", "-d", "en"])
+
+
+def test_cassette_main(tmp_path: Path, data_dir: Path, capsys) -> None:
+    """Test measuring the throughput of a replayed lookup."""
+    path = tmp_path / "reverso.json"
+    _record_reverso(data_dir, path)
+    capsys.readouterr()
+
+    cassette_main(
+        [
+            "replay",
+            str(path),
+            "--latency",
+            "0.001",
+            "--repeat",
+            "3",
+            "--",
+            *["-e", "reverso", "ridiculous", "-s", "pl", "-d", "en"],
+        ]
+    )
+
+    captured = capsys.readouterr()
+    assert not captured.out
+    assert "3 lookups" in captured.err
+
+
+@pytest.mark.parametrize("repeat", ["0", "-1", "x"])
+def test_cassette_main_invalid_repeat(tmp_path: Path, repeat: str) -> None:
+    """Test that the lookup has to be replayed at least once."""
+    with pytest.raises(SystemExit):
+        cassette_main(["replay", str(tmp_path / "x.json"), "-r", repeat])
@@ -0,0 +1,194 @@
+"""Tests for the daemon and its client."""
+import argparse
+import functools
+import io
+import json
+import sys
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO
+
+import pytest
+
+from dict import http
+from dict.__main__ import main
+from dict.daemon import Client, Daemon, DaemonError, serve
+from dict.engines import BaseEngine
+from dict.pager import open_output
+from dict.tests.test_offline import LineEngine
+
+_open_file = functools.partial(open_output, use_pager=False)
+
+
+class CountingEngine(BaseEngine[str]):
+    """An engine counting its instances."""
+
+    names = ["counting-engine"]
+    instances = 0
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        super().__init__()
+        CountingEngine.instances += 1
+
+    @staticmethod
+    def decorate_arg_parser(parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("-u", "--upper", action="store_true")
+
+    def lookup_phrase(
+        self, args: argparse.Namespace, phrase: str
+    ) -> Iterable[str]:
+        if phrase == "fail":
+            raise RuntimeError("lookup failed")
+        if phrase:
+            yield phrase.upper() if args.upper else phrase
+            yield str(CountingEngine.instances)
+
+    def print_results(self, results: Iterable[str], file: IO[str]) -> None:
+        for result in results:
+            print(result, file=file)
+
+
+@pytest.fixture(name="socket_path")
+def fixture_socket_path(tmp_path: Path) -> Iterator[Path]:
+    """Run a daemon in a background thread.
+
+    :return: path to the daemon socket
+    """
+    socket_path = tmp_path / "dict.sock"
+    with Daemon(socket_path) as daemon:
+        thread = threading.Thread(
+            target=daemon.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        thread.start()
+        try:
+            yield socket_path
+        finally:
+            daemon.shutdown()
+            thread.join()
+
+
+def test_client(socket_path: Path, capsys) -> None:
+    """Test looking up phrases with a running daemon."""
+    CountingEngine.instances = 0
+    client = Client(socket_path)
+    args = ["-e", "counting-engine", "-u", "abc"]
+    assert client.lookup(args, None, open_file=_open_file) == 0
+    assert capsys.readouterr().out == "ABC\n1\n"
+
+    # the engine instance is kept between the lookups
+    assert client.lookup(args, "def", open_file=_open_file) == 0
+    assert capsys.readouterr().out == "DEF\n1\n"
+
+
+def test_client_main(socket_path: Path, capsys) -> None:
+    """Test the client mode of the main routine."""
+    main(
+        [
+            "--client",
+            f"--socket={socket_path}",
+            "-N",
+            "-e",
+            "counting-engine",
+            "xyz",
+        ]
+    )
+    assert capsys.readouterr().out.startswith("xyz\n")
+
+
+def test_client_no_results(socket_path: Path, capsys) -> None:
+    """Test the reply when nothing was found."""
+    client = Client(socket_path)
+    assert (
+        client.lookup(["-e", "counting-engine"], "", open_file=_open_file) == 0
+    )
+    assert "no results" in capsys.readouterr().out
+
+
+def test_client_bad_args(socket_path: Path, capsys) -> None:
+    """Test that the argument errors are passed to the client."""
+    client = Client(socket_path)
+    assert client.lookup(["test"], None, open_file=_open_file) == 2
+    assert "required: -e/--engine" in capsys.readouterr().err
+
+
+def test_client_lookup_error(socket_path: Path, capsys) -> None:
+    """Test that a failed lookup does not take the daemon down."""
+    client = Client(socket_path)
+    args = ["-e", "counting-engine"]
+    assert client.lookup(args, "fail", open_file=_open_file) == 1
+    assert "lookup failed" in capsys.readouterr().err
+    assert client.lookup(args, "ok", open_file=_open_file) == 0
+    assert capsys.readouterr().out.startswith("ok\n")
+
+
+def test_daemon_stats(tmp_path: Path, monkeypatch) -> None:
+    """Test that the diagnostics of the lookups are sent to the client."""
+    path = tmp_path / "dict.txt"
+    path.write_text("alpha\nbeta\n")
+    monkeypatch.setattr(LineEngine, "path", path)
+    file = io.BytesIO()
+    with Daemon(tmp_path / "dict.sock") as daemon:
+        args = ["-e", "line-engine", "--stats", "--explain", "-N"]
+        assert daemon.lookup(args, "alpha", file) == 0
+
+    messages = [json.loads(line) for line in file.getvalue().splitlines()]
+    out = "".join(message.get("out", "") for message in messages)
+    err = "".join(message.get("err", "") for message in messages)
+    assert out == "alpha\n"
+    assert "plan: literal scan: alpha" in err
+    assert "lines scanned" in err
+
+
+def test_daemon_help(tmp_path: Path, monkeypatch, capsys) -> None:
+    """Test that the help is sent to the client while the daemon's own
+    streams, which the other lookups print to, stay in place.
+    """
+    decorate_arg_parser = CountingEngine.decorate_arg_parser
+
+    def decorate_and_print(parser: argparse.ArgumentParser) -> None:
+        print("progress", file=sys.stderr)  # as if from another lookup
+        decorate_arg_parser(parser)
+
+    monkeypatch.setattr(
+        CountingEngine, "decorate_arg_parser", staticmethod(decorate_and_print)
+    )
+    file = io.BytesIO()
+    with Daemon(tmp_path / "dict.sock") as daemon:
+        args = ["-e", "counting-engine", "--help"]
+        assert daemon.lookup(args, None, file) == 0
+
+    messages = [json.loads(line) for line in file.getvalue().splitlines()]
+    out = "".join(message.get("out", "") for message in messages)
+    assert out.startswith("usage: dict")
+    assert "--upper" in out
+    assert not any("err" in message for message in messages)
+    assert capsys.readouterr() == ("", "progress\n")
+
+
+def test_daemon_timeout(tmp_path: Path) -> None:
+    """Test that the daemon applies its own timeout to the lookups and
+    rejects the ones of its clients.
+    """
+    file = io.BytesIO()
+    with Daemon(tmp_path / "dict.sock", timeout=2.5) as daemon:
+        args = ["-e", "counting-engine", "--timeout=1", "abc"]
+        assert daemon.lookup(args, None, file) == 2
+        assert daemon.lookup(args[:2] + args[3:], None, io.BytesIO()) == 0
+    assert http.SCHEDULER.timeout == 2.5
+
+    messages = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert "pass it to dict --daemon" in messages[0]["err"]
+
+
+def test_client_no_daemon(tmp_path: Path) -> None:
+    """Test connecting to a daemon that is not running."""
+    with pytest.raises(DaemonError):
+        Client(tmp_path / "dict.sock").lookup(["-e", "counting-engine"], "a")
+
+
+def test_serve_already_running(socket_path: Path) -> None:
+    """Test starting a second daemon on the same socket."""
+    with pytest.raises(DaemonError):
+        serve(socket_path)
@@ -0,0 +1,84 @@
+"""Tests for the Japanese deinflector."""
+import pytest
+
+from dict.deinflect import Deinflection, deinflect
+from dict.engines.jmdict import (
+    PART_OF_SPEECH_DESCRIPTIONS,
+    JMDictEngine,
+    JMDictReading,
+    JMDictResult,
+    JMDictSense,
+)
+
+
+@pytest.mark.parametrize(
+    "word,term,parts_of_speech,chain",
+    [
+        (
+            "食べられなかった",
+            "食べる",
+            ("v1",),
+            ("potential or passive", "negative", "past"),
+        ),
+        ("書かなかった", "書く", ("v5k", "v5k-s"), ("negative", "past")),
+        ("書けない", "書く", ("v5k", "v5k-s"), ("potential", "negative")),
+        ("行った", "行く", ("v5k-s",), ("past",)),
+        ("読んでいます", "読む", ("v5m",), ("-te", "progressive", "polite")),
+        ("飲みたかった", "飲む", ("v5m",), ("-tai", "past")),
+        ("勉強しました", "勉強する", ("vs-i", "vs-s"), ("polite", "past")),
+        ("勉強しました", "勉強", ("vs",), ("suru", "polite", "past")),
+        ("来なかった", "来る", ("vk",), ("negative", "past")),
+        ("こさせる", "くる", ("vk",), ("causative",)),
+        ("高くなかった", "高い", ("adj-i",), ("negative", "past")),
+        ("食べちゃった", "食べる", ("v1",), ("-te", "completion", "past")),
+        ("食べませんでした", "食べる", ("v1",), ("polite", "negative past")),
+    ],
+)
+def test_deinflect(
+    word: str,
+    term: str,
+    parts_of_speech: tuple[str, ...],
+    chain: tuple[str, ...],
+) -> None:
+    """Test finding the dictionary forms of the conjugated words."""
+    assert Deinflection(term, parts_of_speech, chain) in deinflect(word)
+
+
+def test_deinflect_word_itself() -> None:
+    """Test that the word itself is the first candidate."""
+    deinflections = deinflect("食べる")
+    assert deinflections[0] == Deinflection("食べる", (), ())
+    # a noun cannot be deinflected any further
+    assert deinflect("本") == [Deinflection("本", (), ())]
+    assert str(deinflect("食べた")[1]) == "食べる → past"
+
+
+def test_jmdict_parts_of_speech() -> None:
+    """Test that the JMdict entity descriptions are mapped back to the
+    codes matched by the deinflector.
+    """
+    engine = JMDictEngine()
+    result = JMDictResult(
+        ent_seq=1,
+        kanji=[],
+        readings=[JMDictReading(reading="たべる", pri=[])],
+        senses=[
+            JMDictSense(
+                information=None,
+                meanings=["to eat"],
+                parts_of_speech=[
+                    PART_OF_SPEECH_DESCRIPTIONS["v1"],
+                    "transitive verb",
+                ],
+                miscellaneous=[],
+                fields=None,
+            )
+        ],
+    )
+    assert list(engine.get_parts_of_speech(result)) == [
+        "v1",
+        "transitive verb",
+    ]
+    deinflections = {"たべる": deinflect("たべた")[1:]}
+    deinflection = engine.match_deinflection(result, deinflections)
+    assert deinflection == Deinflection("たべる", ("v1",), ("past",))
@@ -10,6 +10,7 @@ from dict.engines.edict2 import (
     Edict2Result,
     parse_edict2_line,
 )
+from dict.http import DOWNLOAD_TIMEOUT
 
 
 def test_parse_edict2_line() -> None:
@@ -71,6 +72,8 @@ def test_edict2(tmp_path: Path, data_dir: Path, capsys) -> None:
 
     with patch(
         "dict.engines.edict2.CACHE_PATH", tmp_path / "edict2.txt"
+    ), patch(
+        "requests.head", return_value=Mock(status_code=200, headers={})
     ), patch(
         "requests.get",
         return_value=Mock(
@@ -82,7 +85,59 @@ def test_edict2(tmp_path: Path, data_dir: Path, capsys) -> None:
         main(["-e", "edict", "-N", "憂鬱"])
 
     fake_get.assert_called_once_with(
-        "http://ftp.edrdg.org/pub/Nihongo/edict2.gz", stream=True
+        "http://ftp.edrdg.org/pub/Nihongo/edict2.gz",
+        stream=True,
+        timeout=DOWNLOAD_TIMEOUT,
     )
 
     assert capsys.readouterr().out == (data_dir / "edict2_out.txt").read_text()
+
+
+def test_edict2_fuzzy(tmp_path: Path, data_dir: Path, capsys) -> None:
+    """Test looking up the edict2 entries with typos."""
+    path = tmp_path / "edict2.txt"
+    path.write_text(
+        (data_dir / "edict2_in.txt").read_text(encoding="utf-8"),
+        encoding="utf-8",
+    )
+
+    with patch("dict.engines.edict2.CACHE_PATH", path), patch(
+        "requests.head", return_value=Mock(status_code=200, headers={})
+    ):
+        main(["-e", "edict", "-N", "--fuzzy=1", "melancholi"])
+
+    assert "憂鬱 (ゆううつ)" in capsys.readouterr().out
+    assert (tmp_path / "edict2.txt.trigrams").exists()
+
+
+def test_edict2_deinflect(tmp_path: Path, capsys) -> None:
+    """Test looking up the dictionary forms of a conjugated word."""
+    path = tmp_path / "edict2.txt"
+    path.write_text(
+        "食べる [たべる] /(v1,vt) to eat/(P)/EntL1358280X/\n"
+        "食べ物 [たべもの] /(n) food/(P)/EntL1358300X/\n"
+        "食べれる [たべれる] /(v5r) test entry of a wrong class/EntL1/\n"
+        "高い [たかい] /(adj-i) high/(P)/EntL1279420X/\n",
+        encoding="utf-8",
+    )
+
+    with patch("dict.engines.edict2.CACHE_PATH", path), patch(
+        "requests.head", return_value=Mock(status_code=200, headers={})
+    ):
+        main(["-e", "edict", "-N", "--deinflect", "食べられなかった"])
+        main(["-e", "edict", "-N", "--deinflect", "食べれない"])
+        main(["-e", "edict", "-N", "--deinflect", "高い"])
+
+    assert capsys.readouterr().out == (
+        "食べる → potential or passive → negative → past\n"
+        "(P,v1,vt)\n"
+        "\x1b[38;5;223m\x1b[48;5;58m食べる (たべる)\x1b[0m\n"
+        "to eat\n"
+        "食べる → potential → negative\n"
+        "(P,v1,vt)\n"
+        "\x1b[38;5;223m\x1b[48;5;58m食べる (たべる)\x1b[0m\n"
+        "to eat\n"
+        "(P,adj-i)\n"
+        "\x1b[38;5;223m\x1b[48;5;58m高い (たかい)\x1b[0m\n"
+        "high\n"
+    )
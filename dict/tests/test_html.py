@@ -0,0 +1,49 @@
+"""Tests for the dict.html module."""
+from collections.abc import Iterable
+
+from dict.html import css_matcher, get_text, iter_elements
+
+
+def test_css_matcher() -> None:
+    """Test that css_matcher checks only the element itself."""
+    is_example = css_matcher("div.example")
+    nodes = list(
+        iter_elements(
+            ['<div class="example"><div class="other"></div></div>'],
+            tags="div",
+        )
+    )
+    assert [is_example(node) for node in nodes] == [False, True]
+    assert not is_example(None)
+
+
+def test_iter_elements_is_incremental() -> None:
+    """Test that elements are yielded before the whole input is consumed."""
+    consumed: list[str] = []
+
+    def chunks() -> Iterable[str]:
+        for chunk in ["<html><body><p>1</p>", "<p>2", "</p>", "</body>"]:
+            consumed.append(chunk)
+            yield chunk
+
+    elements = iter_elements(chunks(), tags="p")
+    assert next(elements).text == "1"
+    assert len(consumed) == 1
+    assert next(elements).text == "2"
+    assert len(consumed) == 3
+    assert not list(elements)
+
+
+def test_get_text() -> None:
+    """Test extracting the text of an element with its markup."""
+    (node,) = iter_elements(
+        [
+            "<div><p>caf&#233; &amp; <em>bar</em><!-- comment -->,"
+            "<br>second <b>line <em>and</em></b> more</p> tail</div>"
+        ],
+        tags="p",
+    )
+    assert get_text(node) == "café & bar,\nsecond line and more"
+    assert (
+        get_text(node, ("[", "]")) == "café & [bar],\nsecond line [and] more"
+    )
@@ -0,0 +1,537 @@
+"""Tests for the dict.http module."""
+import hashlib
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Optional
+from unittest.mock import Mock, call, patch
+
+import pytest
+import requests
+
+from dict.http import (
+    DEFAULT_RETRY_AFTER,
+    DEFAULT_TIMEOUT,
+    MAX_RETRIES,
+    MIN_LATENCY_SAMPLES,
+    CircuitBreaker,
+    CircuitOpenError,
+    DownloadError,
+    HostPolicy,
+    RequestScheduler,
+    TokenBucket,
+    download,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    """A clock that moves only when somebody sleeps."""
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock.
+
+        :param seconds: number of seconds to advance the clock by
+        """
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket() -> None:
+    """Test that the token bucket allows bursts and then throttles."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now = 10.0
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_pause() -> None:
+    """Test that pausing the token bucket delays the reservations."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+    bucket.pause(3.0)
+    assert bucket.reserve() == pytest.approx(3.0)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, DEFAULT_RETRY_AFTER),
+        ("", DEFAULT_RETRY_AFTER),
+        ("5", 5.0),
+        ("-5", 0.0),
+        ("100000", 60.0),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+        ("garbage", DEFAULT_RETRY_AFTER),
+    ],
+)
+def test_parse_retry_after(value: str, expected: float) -> None:
+    """Test parsing the Retry-After header."""
+    assert parse_retry_after(value) == expected
+
+
+def test_scheduler_throttles_per_host() -> None:
+    """Test that the hosts are throttled independently."""
+    clock = FakeClock()
+    scheduler = RequestScheduler(
+        policies={"slow.com": HostPolicy(1.0, burst=1, max_concurrency=1)},
+        default_policy=HostPolicy(100.0, burst=100, max_concurrency=1),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    session = Mock(get=Mock(return_value=Mock(status_code=200)))
+    scheduler.get("http://slow.com/1", session=session)
+    scheduler.get("http://fast.com/1", session=session)
+    scheduler.get("http://slow.com/2", session=session)
+    assert clock.sleeps == [0, 0, pytest.approx(1.0)]
+
+
+def test_scheduler_holds_streamed_requests() -> None:
+    """Test that a streamed response counts against the concurrency limit
+    until it is closed.
+    """
+    scheduler = RequestScheduler(
+        default_policy=HostPolicy(100.0, burst=100, max_concurrency=1),
+        sleep=lambda _: None,
+    )
+    streamed = Mock(status_code=200)
+    close = streamed.close
+    session = Mock(get=Mock(side_effect=[streamed, Mock(status_code=200)]))
+    response = scheduler.get("http://x.com/1", session=session, stream=True)
+
+    thread = threading.Thread(
+        target=scheduler.get,
+        args=("http://x.com/2",),
+        kwargs={"session": session},
+    )
+    thread.start()
+    thread.join(timeout=0.2)
+    assert session.get.call_count == 1
+
+    response.close()
+    thread.join(timeout=5)
+    assert session.get.call_count == 2
+    close.assert_called_once()
+
+
+def test_scheduler_retries_throttled_requests() -> None:
+    """Test that the 429 responses are retried after the requested time."""
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    throttled = Mock(status_code=429, headers={"Retry-After": "7"})
+    success = Mock(status_code=200, headers={})
+    session = Mock(get=Mock(side_effect=[throttled, success]))
+
+    assert scheduler.get("http://x.com", {"q": 1}, session=session) is success
+    assert session.get.mock_calls == [
+        call("http://x.com", {"q": 1}, timeout=DEFAULT_TIMEOUT),
+        call("http://x.com", {"q": 1}, timeout=DEFAULT_TIMEOUT),
+    ]
+    throttled.close.assert_called_once()
+    assert clock.sleeps == [0, pytest.approx(7.0)]
+
+
+def test_scheduler_gives_up_retrying() -> None:
+    """Test that the scheduler returns the 429 response in the end."""
+    scheduler = RequestScheduler(sleep=lambda _: None)
+    throttled = Mock(status_code=429, headers={})
+    session = Mock(get=Mock(return_value=throttled))
+    assert scheduler.get("http://x.com", session=session) is throttled
+    assert session.get.call_count == MAX_RETRIES + 1
+
+
+def test_scheduler_timeouts() -> None:
+    """Test that the requests time out according to the host policy."""
+    scheduler = RequestScheduler(
+        policies={"slow.com": HostPolicy(1.0, 1, 1, timeout=(1.0, 30.0))},
+        sleep=lambda _: None,
+    )
+    session = Mock(get=Mock(return_value=Mock(status_code=200)))
+    scheduler.get("http://slow.com", session=session)
+    scheduler.get("http://x.com", session=session)
+    scheduler.get("http://x.com", session=session, timeout=3.0)
+    scheduler.timeout = 2.0
+    scheduler.get("http://slow.com", session=session)
+    scheduler.get("http://x.com", session=session, timeout=3.0)
+    assert session.get.mock_calls == [
+        call("http://slow.com", timeout=(1.0, 30.0)),
+        call("http://x.com", timeout=DEFAULT_TIMEOUT),
+        call("http://x.com", timeout=3.0),
+        call("http://slow.com", timeout=2.0),
+        call("http://x.com", timeout=3.0),
+    ]
+
+
+def test_circuit_breaker() -> None:
+    """Test that the circuit opens after consecutive failures and lets a
+    single trial request through after a while.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=2, recovery_time=10.0, clock=clock
+    )
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()  # the trial request is in flight
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_circuit_breaker_abandoned_trial() -> None:
+    """Test that a trial request ending without an outcome lets another one
+    through.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_time=10.0, clock=clock
+    )
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.finish_attempt()
+    assert breaker.allow()
+
+
+def test_scheduler_circuit_breaker() -> None:
+    """Test that the requests to a failing host fail fast."""
+    clock = FakeClock()
+    scheduler = RequestScheduler(
+        default_policy=HostPolicy(
+            100.0, 100, 1, failure_threshold=2, recovery_time=10.0
+        ),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    session = Mock(
+        get=Mock(
+            side_effect=[
+                requests.Timeout("timed out"),
+                Mock(status_code=502),
+                Mock(status_code=200),
+            ]
+        )
+    )
+    with pytest.raises(requests.Timeout):
+        scheduler.get("http://down.com", session=session)
+    assert scheduler.get("http://down.com", session=session).status_code == 502
+    with pytest.raises(CircuitOpenError):
+        scheduler.get("http://down.com", session=session)
+    assert session.get.call_count == 2
+
+    clock.now = 10.0
+    assert scheduler.get("http://down.com", session=session).status_code == 200
+
+
+def test_scheduler_circuit_breaker_unexpected_error() -> None:
+    """Test that an error unrelated to the host does not keep the circuit
+    open.
+    """
+    clock = FakeClock()
+    scheduler = RequestScheduler(
+        default_policy=HostPolicy(
+            100.0, 100, 1, failure_threshold=1, recovery_time=10.0
+        ),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    session = Mock(
+        get=Mock(
+            side_effect=[
+                requests.ConnectionError("refused"),
+                ValueError("invalid header"),
+                Mock(status_code=200),
+            ]
+        )
+    )
+    with pytest.raises(requests.ConnectionError):
+        scheduler.get("http://down.com", session=session)
+    clock.now = 10.0
+    with pytest.raises(ValueError):
+        scheduler.get("http://down.com", session=session)
+    assert scheduler.get("http://down.com", session=session).status_code == 200
+
+
+def _hedging_scheduler(max_concurrency: int) -> RequestScheduler:
+    clock = FakeClock()
+    scheduler = RequestScheduler(
+        default_policy=HostPolicy(
+            100.0, 100, max_concurrency, hedge_percentile=0.5
+        ),
+        clock=clock,
+        sleep=lambda _: None,
+    )
+    # the recent requests took no time, the hedging waits for the minimum
+    session = Mock(get=Mock(return_value=Mock(status_code=200)))
+    for _ in range(MIN_LATENCY_SAMPLES):
+        scheduler.get("http://x.com", session=session)
+    return scheduler
+
+
+def test_scheduler_hedged_requests() -> None:
+    """Test that a second request is made once the first one is late, and
+    that the response arriving first is used.
+    """
+    scheduler = _hedging_scheduler(max_concurrency=2)
+    started = threading.Event()
+    released = threading.Event()
+    slow = Mock(status_code=200)
+    fast = Mock(status_code=200)
+
+    def get(_url: str, **_kwargs) -> Mock:
+        if not started.is_set():
+            started.set()
+            released.wait(timeout=5)
+            return slow
+        return fast
+
+    session = Mock(get=Mock(side_effect=get))
+    assert scheduler.get("http://x.com", session=session) is fast
+    assert session.get.call_count == 2
+    released.set()
+
+
+def test_scheduler_hedging_respects_concurrency() -> None:
+    """Test that no second request is made if the host is busy."""
+    scheduler = _hedging_scheduler(max_concurrency=1)
+    response = Mock(status_code=200)
+
+    def get(_url: str, **_kwargs) -> Mock:
+        threading.Event().wait(timeout=0.2)
+        return response
+
+    session = Mock(get=Mock(side_effect=get))
+    assert scheduler.get("http://x.com", session=session) is response
+    assert session.get.call_count == 1
+
+
+class FakeServer:
+    """A server of a single file, optionally supporting range requests."""
+
+    def __init__(
+        self,
+        content: bytes,
+        accept_ranges: bool = True,
+        etag: Optional[str] = '"v1"',
+    ) -> None:
+        """Initialize self.
+
+        :param content: content of the served file
+        :param accept_ranges: whether to honor the Range header
+        :param etag: entity tag of the served file
+        """
+        self.content = content
+        self.accept_ranges = accept_ranges
+        self.etag = etag
+        self.get = Mock(side_effect=self._get)
+        self.head = Mock(side_effect=self._head)
+        self._patches = [
+            patch("requests.get", self.get),
+            patch("requests.head", self.head),
+        ]
+
+    def _head(self, _url: str, **_kwargs) -> Mock:
+        return Mock(status_code=200, headers=self._get_headers(self.content))
+
+    def _get_headers(self, body: bytes) -> dict[str, str]:
+        headers = {"Content-Length": str(len(body))}
+        if self.accept_ranges:
+            headers["Accept-Ranges"] = "bytes"
+        if self.etag is not None:
+            headers["ETag"] = self.etag
+        return headers
+
+    def _get(
+        self, _url: str, headers: Optional[dict[str, str]] = None, **_kwargs
+    ) -> Mock:
+        byte_range = (headers or {}).get("Range")
+        if_range = (headers or {}).get("If-Range", self.etag)
+        if byte_range and self.accept_ranges and if_range == self.etag:
+            start, end = byte_range[len("bytes=") :].split("-")
+            if int(start) >= len(self.content):
+                return Mock(status_code=416)
+            body = self.content[
+                int(start) : int(end) + 1 if end else len(self.content)
+            ]
+            status_code = 206
+        else:
+            body = self.content
+            status_code = 200
+        return Mock(
+            status_code=status_code,
+            headers=self._get_headers(body),
+            iter_content=Mock(return_value=[body]),
+        )
+
+    def __enter__(self) -> "FakeServer":
+        for item in self._patches:
+            item.start()
+        return self
+
+    def __exit__(self, *_args) -> None:
+        for item in self._patches:
+            item.stop()
+
+
+def test_download(tmp_path: Path) -> None:
+    """Test downloading a file in a single request."""
+    path = tmp_path / "file"
+    with FakeServer(b"0123456789") as server:
+        download("http://x.com/file", description="test", path=path)
+    assert path.read_bytes() == b"0123456789"
+    assert list(tmp_path.iterdir()) == [path]
+    server.head.assert_not_called()
+
+
+@pytest.mark.parametrize("accept_ranges", [True, False])
+def test_download_resume(tmp_path: Path, accept_ranges: bool) -> None:
+    """Test resuming an interrupted download."""
+    path = tmp_path / "file"
+    (tmp_path / "file.part").write_bytes(b"0123")
+    (tmp_path / "file.validator").write_text('"v1"')
+    with FakeServer(b"0123456789", accept_ranges=accept_ranges) as server:
+        download("http://x.com/file", description="test", path=path)
+    assert path.read_bytes() == b"0123456789"
+    assert list(tmp_path.iterdir()) == [path]
+    assert server.get.call_args.kwargs["headers"] == {
+        "Range": "bytes=4-",
+        "If-Range": '"v1"',
+    }
+
+
+def _iter_interrupted() -> Iterator[bytes]:
+    yield b"0123"
+    raise ConnectionError
+
+
+def test_download_interrupted(tmp_path: Path) -> None:
+    """Test that an interrupted download is resumed with the version of the
+    file that it started with.
+    """
+    path = tmp_path / "file"
+    with FakeServer(b"0123456789") as server:
+        server.get.side_effect = lambda *args, **kwargs: Mock(
+            **{
+                "status_code": 200,
+                "headers": {"Content-Length": "10", "ETag": '"v1"'},
+                "iter_content.return_value": _iter_interrupted(),
+            }
+        )
+        with pytest.raises(ConnectionError):
+            download("http://x.com/file", description="test", path=path)
+    assert (tmp_path / "file.part").read_bytes() == b"0123"
+    assert (tmp_path / "file.validator").read_text() == '"v1"'
+
+
+@pytest.mark.parametrize("validator", [None, '"v0"'])
+def test_download_resume_changed(
+    tmp_path: Path, validator: Optional[str]
+) -> None:
+    """Test that a partial download of another version of the file is
+    discarded.
+    """
+    path = tmp_path / "file"
+    (tmp_path / "file.part").write_bytes(b"abcd")
+    if validator is not None:
+        (tmp_path / "file.validator").write_text(validator)
+    with FakeServer(b"0123456789"):
+        download("http://x.com/file", description="test", path=path)
+    assert path.read_bytes() == b"0123456789"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_download_segments(tmp_path: Path, monkeypatch) -> None:
+    """Test downloading a file in parallel segments."""
+    monkeypatch.setattr("dict.http.MIN_SEGMENT_SIZE", 10)
+    content = bytes(range(100))
+    path = tmp_path / "file"
+    (tmp_path / "file.part1").write_bytes(content[25:30])
+    (tmp_path / "file.validator").write_text('"v1"')
+    with FakeServer(content) as server:
+        download("http://x.com/file", "test", path=path, segments=4)
+    assert path.read_bytes() == content
+    assert list(tmp_path.iterdir()) == [path]
+    assert sorted(
+        item.kwargs["headers"]["Range"] for item in server.get.mock_calls
+    ) == ["bytes=0-24", "bytes=30-49", "bytes=50-74", "bytes=75-99"]
+    assert all(
+        item.kwargs["headers"]["If-Range"] == '"v1"'
+        for item in server.get.mock_calls
+    )
+
+
+def test_download_segments_changed(tmp_path: Path, monkeypatch) -> None:
+    """Test that the segments of another version of the file are
+    discarded.
+    """
+    monkeypatch.setattr("dict.http.MIN_SEGMENT_SIZE", 10)
+    content = bytes(range(100))
+    path = tmp_path / "file"
+    (tmp_path / "file.part1").write_bytes(b"abcde")
+    (tmp_path / "file.validator").write_text('"v0"')
+    with FakeServer(content) as server:
+        download("http://x.com/file", "test", path=path, segments=4)
+    assert path.read_bytes() == content
+    assert list(tmp_path.iterdir()) == [path]
+    assert "bytes=25-49" in (
+        item.kwargs["headers"]["Range"] for item in server.get.mock_calls
+    )
+
+
+def test_download_checksum(tmp_path: Path) -> None:
+    """Test verifying the checksum of a downloaded file."""
+    path = tmp_path / "file"
+    content = b"0123456789"
+    with FakeServer(content):
+        download(
+            "http://x.com/file",
+            description="test",
+            path=path,
+            sha256=hashlib.sha256(content).hexdigest(),
+        )
+    assert path.read_bytes() == content
+
+    path.unlink()
+    with FakeServer(content), pytest.raises(DownloadError):
+        download("http://x.com/file", "test", path=path, sha256="0" * 64)
+    assert not list(tmp_path.iterdir())
+
+
+def test_download_truncated(tmp_path: Path) -> None:
+    """Test that a download cut short by the server is rejected."""
+    path = tmp_path / "file"
+    with patch(
+        "requests.get",
+        return_value=Mock(
+            status_code=200,
+            headers={"Content-Length": "10"},
+            iter_content=Mock(return_value=[b"01234"]),
+        ),
+    ), pytest.raises(DownloadError):
+        download("http://x.com/file", description="test", path=path)
+    assert not list(tmp_path.iterdir())
@@ -1,28 +1,91 @@
 """Test the JishoEngine class."""
 import json
 from pathlib import Path
-from unittest.mock import Mock, patch
+from typing import Any
+from unittest.mock import Mock, call, patch
 
 from dict.__main__ import main
+from dict.http import DEFAULT_TIMEOUT
+
+
+def _fake_get(data_dir: Path) -> Mock:
+    def get(_url: str, params: dict[str, Any], **_kwargs: Any) -> Mock:
+        if params.get("page", 1) == 1:
+            content = json.loads((data_dir / "jisho_in.json").read_text())
+        else:
+            content = {"data": []}
+        return Mock(raise_for_status=Mock(), json=Mock(return_value=content))
+
+    return Mock(side_effect=get)
 
 
 def test_jisho(data_dir: Path, capsys) -> None:
     """Test the jisho.org engine."""
-    with patch(
-        "requests.get",
-        return_value=Mock(
-            raise_for_status=Mock(),
-            json=Mock(
-                return_value=json.loads(
-                    (data_dir / "jisho_in.json").read_text()
-                )
-            ),
-        ),
-    ) as fake_get:
+    with patch("requests.get", _fake_get(data_dir)) as fake_get:
         main(["-e", "jisho", "-N", "test"])
 
-    fake_get.assert_called_once_with(
-        "http://jisho.org/api/v1/search/words", {"keyword": "test"}
+    assert (
+        call(
+            "http://jisho.org/api/v1/search/words",
+            {"keyword": "test"},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        in fake_get.mock_calls
+    )
+    assert (
+        call(
+            "http://jisho.org/api/v1/search/words",
+            {"keyword": "test", "page": 2},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        in fake_get.mock_calls
     )
 
     assert capsys.readouterr().out == (data_dir / "jisho_out.txt").read_text()
+
+
+def test_jisho_limit(data_dir: Path, capsys) -> None:
+    """Test the jisho.org engine with a result limit."""
+    with patch("requests.get", _fake_get(data_dir)) as fake_get:
+        main(["-e", "jisho", "-N", "test", "--limit", "3"])
+
+    fake_get.assert_called_once_with(
+        "http://jisho.org/api/v1/search/words",
+        {"keyword": "test"},
+        timeout=DEFAULT_TIMEOUT,
+    )
+
+    output = capsys.readouterr().out
+    expected = (data_dir / "jisho_out.txt").read_text()
+    assert expected.startswith(output.rstrip())
+    assert output.count("\n\n") == 2
+
+
+def test_jisho_single_page(data_dir: Path, capsys) -> None:
+    """Test that no more pages are requested after a page that is not
+    full.
+    """
+    content = json.loads((data_dir / "jisho_in.json").read_text())
+    content["data"] = content["data"][:5]
+    response = Mock(raise_for_status=Mock(), json=Mock(return_value=content))
+    with patch("requests.get", Mock(return_value=response)) as fake_get:
+        main(["-e", "jisho", "-N", "test"])
+
+    fake_get.assert_called_once_with(
+        "http://jisho.org/api/v1/search/words",
+        {"keyword": "test"},
+        timeout=DEFAULT_TIMEOUT,
+    )
+    assert capsys.readouterr().out.count("\n\n") == 4
+
+
+def test_jisho_jsonl(data_dir: Path, capsys) -> None:
+    """Test the jisho.org engine with machine-readable output."""
+    with patch("requests.get", _fake_get(data_dir)):
+        main(["-e", "jisho", "test", "--limit", "3", "--format", "jsonl"])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    records = [json.loads(line) for line in lines]
+    assert all(record["japanese"] and record["meanings"] for record in records)
+    assert "\x1B" not in "".join(lines)
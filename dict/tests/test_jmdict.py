@@ -0,0 +1,72 @@
+"""Tests for the JMdict engine."""
+import json
+import pickle
+import re
+from pathlib import Path
+from unittest.mock import patch
+
+from dict.__main__ import main
+from dict.engines.jmdict import (
+    JMDictEngine,
+    JMDictKanji,
+    JMDictReading,
+    JMDictResult,
+    JMDictSense,
+    LazyJMDictResult,
+    entry_from_line,
+    entry_to_line,
+    get_result_weight,
+)
+from dict.serialize import dumps
+
+ENTRY = JMDictResult(
+    ent_seq=1358280,
+    kanji=[JMDictKanji(kanji="食べる", pri=["ichi1"])],
+    readings=[JMDictReading(reading="たべる", pri=["ichi1"])],
+    senses=[
+        JMDictSense(
+            information=None,
+            meanings=["to eat"],
+            parts_of_speech=["Ichidan verb", "transitive verb"],
+            miscellaneous=[],
+            fields=None,
+        )
+    ],
+)
+
+
+def test_lazy_result() -> None:
+    """Test that the lazy results decode the same fields as the eager ones."""
+    line = entry_to_line(ENTRY) + "\n"
+    result = LazyJMDictResult(line)
+    assert "item" not in vars(result)
+
+    # the logic filter doesn't build any of the fields
+    weight = get_result_weight(re.compile("eat"), result)
+    assert weight == get_result_weight(re.compile("eat"), ENTRY)
+    assert get_result_weight(re.compile("drink"), result) is None
+    assert set(vars(result)) == {"line", "deinflection", "item"}
+
+    assert result.kanji == ENTRY.kanji
+    assert result.readings == ENTRY.readings
+    assert result.senses == entry_from_line(line).senses
+    assert result.tags == ENTRY.tags
+    assert dumps(result) == dumps(entry_from_line(line))
+
+    copy = pickle.loads(pickle.dumps(result))
+    assert copy.line == line
+    assert "item" not in vars(copy)
+
+
+def test_jmdict_lookup(tmp_path: Path, capsys) -> None:
+    """Test looking up a phrase in the JMdict index."""
+    path = tmp_path / "jmdict.jsonl"
+    path.write_text(entry_to_line(ENTRY) + "\n", encoding="utf-8")
+
+    with patch.object(JMDictEngine, "get_dictionary_path", return_value=path):
+        main(["-e", "jmdict", "-N", "eat"])
+        assert "to eat\n" in capsys.readouterr().out
+        main(["-e", "jmdict", "-N", "--format", "json", "eat"])
+        results = json.loads(capsys.readouterr().out)
+
+    assert results[0]["readings"] == [{"reading": "たべる", "pri": ["ichi1"]}]
@@ -0,0 +1,70 @@
+"""Tests for the dict.layout module."""
+import io
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from dict.layout import display_width, print_in_columns
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("", 0),
+        ("test", 4),
+        ("miłość", 6),
+        ("食べる", 6),
+        ("ｶﾀｶﾅ", 4),
+        ("é", 1),
+        ("ＡＢ", 4),
+    ],
+)
+def test_display_width(text: str, expected: int) -> None:
+    """Test measuring the display width of text."""
+    assert display_width(text) == expected
+
+
+def _print_in_columns(items: list[str], columns: int) -> list[str]:
+    with patch(
+        "shutil.get_terminal_size",
+        return_value=os.terminal_size((columns, 24)),
+    ):
+        file = io.StringIO()
+        print_in_columns(items, file=file)
+    return file.getvalue().split("\n")
+
+
+def test_print_in_columns() -> None:
+    """Test laying out items in columns."""
+    assert _print_in_columns(["a", "bbb", "cc", "d", "e"], columns=14) == [
+        "- a   - bbb",
+        "- cc  - d",
+        "- e",
+        "",
+        "",
+    ]
+
+
+def test_print_in_columns_wide_characters() -> None:
+    """Test aligning the columns with wide and combining characters."""
+    lines = _print_in_columns(["食べる", "é", "test"], columns=30)
+    assert lines[0] == "- 食べる - é      - test"
+
+
+def test_print_in_columns_narrow_terminal() -> None:
+    """Test that items wider than the terminal go one per row."""
+    assert _print_in_columns(["abc", "def"], columns=3) == [
+        "- abc- def",
+        "",
+    ]
+
+
+def test_print_in_columns_many_items() -> None:
+    """Test that laying out many items takes linear time."""
+    items = [f"item{i}" for i in range(50_000)]
+    start = time.perf_counter()
+    lines = _print_in_columns(items, columns=80)
+    assert time.perf_counter() - start < 1
+    assert len(lines) == 50_000 // 6 + 1 + 2
@@ -0,0 +1,83 @@
+"""Tests for the live lookup mode."""
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from dict.__main__ import main
+from dict.cli import parse_args
+from dict.live import CLEAR_SCREEN, render, run_live
+from dict.tests.test_offline import LineEngine
+
+
+@pytest.fixture(name="dictionary")
+def fixture_dictionary(tmp_path: Path) -> Path:
+    """Prepare a dictionary for the LineEngine."""
+    path = tmp_path / "dict.txt"
+    path.write_text("taberu\ntabako\nnomu\n")
+    LineEngine.path = path
+    return path
+
+
+@pytest.mark.usefixtures("dictionary")
+def test_run_live() -> None:
+    """Test that the results follow the typed phrase."""
+    args = parse_args(["-e", "line-engine", "--live"])
+    file = io.StringIO()
+    phrase = run_live(args, keys=io.StringIO("tabx\x7fe\n"), file=file)
+    assert phrase == "tabe"
+
+    screens = file.getvalue().split(CLEAR_SCREEN)
+    # the first item precedes the first redraw, the last follows the last one
+    assert (
+        len(screens) == len(["", "t", "ta", "tab", "tabx", "tab", "tabe"]) + 2
+    )
+    assert "tabako" in screens[4] and "taberu" in screens[4]
+    assert "no results" in screens[5]
+    assert "tabako" not in screens[7] and "taberu" in screens[7]
+    assert screens[-1] == ""
+
+
+@pytest.mark.usefixtures("dictionary")
+def test_run_live_quit() -> None:
+    """Test quitting the live mode."""
+    args = parse_args(["-e", "line-engine", "--live", "no"])
+    file = io.StringIO()
+    assert run_live(args, keys=io.StringIO("m\x1B"), file=file) is None
+    assert "nomu" in file.getvalue()
+
+
+@pytest.mark.usefixtures("dictionary")
+def test_run_live_invalid_pattern() -> None:
+    """Test typing a pattern that is not a valid regular expression yet."""
+    args = parse_args(["-e", "line-engine", "--live"])
+    file = io.StringIO()
+    assert run_live(args, keys=io.StringIO("(ta\x04"), file=file) is None
+    assert "incomplete pattern" in file.getvalue()
+
+
+def test_render_fits_screen(tmp_path: Path, monkeypatch) -> None:
+    """Test that only the results fitting on the screen are rendered."""
+    path = tmp_path / "dict.txt"
+    path.write_text("".join(f"word{i}\n" for i in range(100)))
+    monkeypatch.setattr(LineEngine, "path", path)
+    monkeypatch.setattr(
+        "shutil.get_terminal_size", lambda: os.terminal_size((80, 4))
+    )
+    rendered = []
+    monkeypatch.setattr(
+        LineEngine,
+        "print_results",
+        lambda self, results, file: rendered.extend(results),
+    )
+    args = parse_args(["-e", "line-engine", "--live"])
+    render(args, "word", io.StringIO())
+    assert len(rendered) == 3
+
+
+def test_live_online_engine(capsys) -> None:
+    """Test that the live mode is refused for the online engines."""
+    with pytest.raises(SystemExit):
+        main(["-e", "jisho", "--live"])
+    assert "requires an offline engine" in capsys.readouterr().err
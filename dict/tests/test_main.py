@@ -1,5 +1,6 @@
 """Tests for the dict.__main__ module."""
 import argparse
+import contextlib
 import io
 from collections.abc import Iterable
 from typing import IO
@@ -7,6 +8,7 @@ from unittest.mock import patch
 
 import pytest
 
+from dict import http
 from dict.__main__ import main, parse_args
 from dict.engines import BaseEngine
 
@@ -86,11 +88,38 @@ def test_main_without_pager(capsys) -> None:
     assert capsys.readouterr().out == "tset\n"
 
 
+def test_main_timeout() -> None:
+    """Test that --timeout applies to all the requests of the lookup."""
+    main(["-e", "dummy-engine", "-N", "-p", "--timeout", "2.5", "test"])
+    assert http.SCHEDULER.timeout == 2.5
+    main(["-e", "dummy-engine", "-N", "-p", "test"])
+    assert http.SCHEDULER.timeout is None
+
+
 def test_main_with_pager() -> None:
     """Test the main routine with the pager."""
-    with patch("dict.__main__.pager") as fake_pager:
+    file = io.StringIO()
+    with patch(
+        "dict.pager.pager", return_value=contextlib.nullcontext(file)
+    ) as fake_pager:
         main(["-e", "dummy-engine", "-p", "test"])
-        fake_pager.assert_called_once_with("tset\n")
+        fake_pager.assert_called_once_with()
+    assert file.getvalue() == "tset\n"
+
+
+def test_main_streams_results(capsys) -> None:
+    """Test that the results are printed before the lookup is finished."""
+
+    def lookup_phrase(
+        _args: argparse.Namespace, _phrase: str
+    ) -> Iterable[str]:
+        yield "first"
+        assert capsys.readouterr().out == "first"
+        yield "second"
+
+    with patch.object(DummyEngine, "lookup_phrase", side_effect=lookup_phrase):
+        main(["-e", "dummy-engine", "--no-pager", "-p", "test"])
+    assert capsys.readouterr().out == "\nsecond\n"
 
 
 def test_main_no_results(capsys) -> None:
@@ -99,6 +128,25 @@ def test_main_no_results(capsys) -> None:
     assert "no results" in capsys.readouterr().out
 
 
+@pytest.mark.parametrize(
+    "output_format,phrase,expected",
+    [
+        ("json", "test", '["tset"]\n'),
+        ("json", "", "[]\n"),
+        ("jsonl", "test", '"tset"\n'),
+        ("jsonl", "", ""),
+    ],
+)
+def test_main_machine_readable(
+    output_format: str, phrase: str, expected: str, capsys
+) -> None:
+    """Test the machine-readable output formats."""
+    with patch("dict.pager.pager") as fake_pager:
+        main(["-e", "dummy-engine", "-p", f"--format={output_format}", phrase])
+        fake_pager.assert_not_called()
+    assert capsys.readouterr().out == expected
+
+
 def test_main_interactive_mode(monkeypatch, capsys) -> None:
     """Test the main routine in interactive mode."""
     monkeypatch.setattr("sys.stdin", io.StringIO("test\n"))
@@ -0,0 +1,473 @@
+"""Tests for the offline dictionary utilities."""
+import argparse
+import os
+import re
+import sys
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import IO, Any, Optional
+from unittest.mock import patch
+
+import pytest
+
+from dict.__main__ import main
+from dict.deinflect import Deinflection
+from dict.engines.offline import (
+    OfflineEngine,
+    SearchStats,
+    find_lines_containing_any,
+    fold_ascii,
+    get_trie_pattern,
+    is_refinement,
+    iter_lines_containing,
+    iter_matching_lines,
+    read_dictionary,
+)
+from dict.planner import PLAN_REFINE
+
+TEXT = "alpha beta\ngamma\ndelta alpha\n\nepsilon"
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["alpha", "^alpha", "alpha$", "a$", "^$", "", "ta\\s+", "zeta", "n$"],
+)
+def test_iter_matching_lines(pattern: str) -> None:
+    """Test that searching the whole text finds the same lines as searching
+    each line separately.
+    """
+    expected = [
+        line
+        for line in TEXT.splitlines(keepends=True)
+        if re.search(pattern, line)
+    ]
+    actual = list(iter_matching_lines(TEXT, re.compile(pattern, flags=re.M)))
+    if pattern == "ta\\s+":
+        # may span the line boundary, the first line is reported anyway
+        assert set(expected) <= set(actual)
+    else:
+        assert actual == expected
+
+
+def test_iter_lines_containing() -> None:
+    """Test finding the lines containing a literal case-insensitively."""
+    text = "Alpha beta\ngamma\nDELTA ALPHA\nalphabet"
+    assert list(iter_lines_containing(text, fold_ascii(text), "alpha")) == [
+        "Alpha beta\n",
+        "DELTA ALPHA\n",
+        "alphabet",
+    ]
+    assert not list(iter_lines_containing(text, text, "zeta"))
+
+
+def test_fold_ascii() -> None:
+    """Test that the case conversion keeps the length of the text."""
+    text = "İstanbul ıspanak ſtraße ÉCOLE"
+    assert fold_ascii(text) == "istanbul ispanak straße école"
+    assert len(fold_ascii(text)) == len(text)
+
+
+@pytest.mark.parametrize(
+    "literals,pattern",
+    [
+        (["eat"], "eat"),
+        (["eat", "eaten"], "eat(?:en)?"),
+        (["tea", "ten", "a.b"], "(?:a\\.b|te(?:a|n))"),
+        (["a", "ab", "abc"], "a(?:b(?:c)?)?"),
+    ],
+)
+def test_get_trie_pattern(literals: list[str], pattern: str) -> None:
+    """Test combining the literals into a single pattern."""
+    assert get_trie_pattern(literals) == pattern
+    for literal in literals:
+        assert re.fullmatch(pattern, literal)
+
+
+def test_find_lines_containing_any() -> None:
+    """Test finding the lines containing each literal in a single pass."""
+    text = "eaten tea\nTEN\nbeaten\nnothing"
+    assert find_lines_containing_any(
+        text, ["Eat", "eat", "eaten", "ten", "Ten", "tea", "zeta"]
+    ) == {
+        "Eat": {0: "eaten tea\n", 14: "beaten\n"},
+        "eat": {0: "eaten tea\n", 14: "beaten\n"},
+        "eaten": {0: "eaten tea\n", 14: "beaten\n"},
+        "ten": {0: "eaten tea\n", 10: "TEN\n", 14: "beaten\n"},
+        "Ten": {0: "eaten tea\n", 10: "TEN\n", 14: "beaten\n"},
+        "tea": {0: "eaten tea\n"},
+        "zeta": {},
+    }
+
+
+def test_read_dictionary(tmp_path: Path) -> None:
+    """Test that the dictionary is reloaded only after being modified."""
+    path = tmp_path / "dict.txt"
+    path.write_text("first\n")
+    assert read_dictionary(path) == "first\n"
+    assert read_dictionary(path) is read_dictionary(path)
+
+    path.write_text("second line\n")
+    os.utime(path, ns=(0, 0))
+    assert read_dictionary(path) == "second line\n"
+
+
+class LineEngine(OfflineEngine[str]):
+    """An engine returning the matching lines."""
+
+    names = ["line-engine"]
+    path = Path()
+
+    def get_dictionary_path(self) -> Path:
+        return self.path
+
+    def parse_line(self, line: str) -> str:
+        return line.strip()
+
+    def get_result_weight(
+        self, logic_pattern: re.Pattern[str], result: str
+    ) -> Optional[Any]:
+        return len(result) if logic_pattern.search(result) else None
+
+    def get_search_terms(self, result: str) -> Iterable[str]:
+        return [result]
+
+    def get_headwords(self, result: str) -> Iterable[str]:
+        return [result]
+
+    def get_parts_of_speech(self, result: str) -> Iterable[str]:
+        return []
+
+    def annotate_deinflection(
+        self, result: str, deinflection: Deinflection
+    ) -> str:
+        return f"{result} ({deinflection})"
+
+    def print_results(self, results: Iterable[str], file: IO[str]) -> None:
+        for result in results:
+            print(result, file=file)
+
+
+@pytest.mark.parametrize(
+    "previous,phrase,expected",
+    [
+        ("tabe", "taber", True),
+        ("abe", "taberu", True),
+        ("Tabe", "taber", True),
+        ("taber", "tabe", False),
+        ("tabe", "tab.", False),
+        ("tab.", "tabe", False),
+        ("食べ", "食べる", True),
+    ],
+)
+def test_is_refinement(previous: str, phrase: str, expected: bool) -> None:
+    """Test recognizing the phrases that narrow down the previous ones."""
+    assert is_refinement(previous, phrase) == expected
+
+
+def test_refinement(tmp_path: Path) -> None:
+    """Test that refined queries search only the previous candidates."""
+    path = tmp_path / "dict.txt"
+    path.write_text("".join(f"word{i}\n" for i in range(100)) + "taberu\n")
+    engine = LineEngine()
+    engine.path = path
+    args = argparse.Namespace()
+
+    with patch(
+        "dict.engines.offline.iter_lines_containing",
+        wraps=iter_lines_containing,
+    ) as scan, patch(
+        "dict.engines.offline.iter_matching_lines",
+        wraps=iter_matching_lines,
+    ) as search:
+        assert engine.lookup_phrase(args, "tabe") == ["taberu"]
+        assert engine.lookup_phrase(args, "taber") == ["taberu"]
+        assert engine.lookup_phrase(args, "word9$") == ["word9"]
+
+    # the dictionary is scanned only for the unrelated queries
+    assert [call.args[2] for call in scan.mock_calls] == ["tabe", "word9"]
+    searched = [len(call.args[0]) for call in search.mock_calls]
+    assert searched == [
+        len("taberu\n"),
+        len("taberu\n"),
+        len("word9\n") + sum(len(f"word9{i}\n") for i in range(10)),
+    ]
+
+
+def test_refinement_interleaved(tmp_path: Path) -> None:
+    """Test that a plan refines the candidates it was made for, even if
+    another lookup has replaced them in the meantime.
+    """
+    path = tmp_path / "dict.txt"
+    path.write_text("".join(f"word{i}\n" for i in range(100)) + "taberu\n")
+    engine = LineEngine()
+    engine.path = path
+    args = argparse.Namespace()
+    text = read_dictionary(path)
+
+    engine.lookup_phrase(args, "word1")
+    plan = engine.plan_query(args, path, text, "word1")
+    assert plan.strategy == PLAN_REFINE
+    engine.lookup_phrase(args, "taberu")
+    assert len(engine.find_lines(text, "word1", plan=plan)) == 11
+
+
+def test_refinement_concurrent(tmp_path: Path) -> None:
+    """Test the lookups sharing an engine in many threads."""
+    path = tmp_path / "dict.txt"
+    path.write_text("".join(f"word{i}\n" for i in range(200)))
+    engine = LineEngine()
+    engine.path = path
+    args = argparse.Namespace()
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    errors = []
+
+    def look_up(prefix: str) -> None:
+        try:
+            for _ in range(200):
+                for phrase in (prefix, prefix + "1"):
+                    expected = sum(
+                        f"word{i}".startswith(phrase) for i in range(200)
+                    )
+                    results = list(engine.lookup_phrase(args, phrase))
+                    assert len(results) == expected
+        except AssertionError as ex:
+            errors.append(ex)
+
+    threads = [
+        threading.Thread(target=look_up, args=(f"word{i}",))
+        for i in range(1, 9)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert not errors
+
+
+def test_search_stats(tmp_path: Path) -> None:
+    """Test counting the entries passing each step of the search."""
+    path = tmp_path / "dict.txt"
+    path.write_text("".join(f"word{i}\n" for i in range(100)) + "taberu\n")
+    engine = LineEngine()
+    engine.path = path
+    engine.collect_search_stats = True
+    args = argparse.Namespace()
+
+    assert set(engine.lookup_phrase(args, "word1")) == {
+        "word1",
+        *(f"word1{i}" for i in range(10)),
+    }
+    # only the lines containing the literal are searched
+    assert engine.last_search_stats == SearchStats(
+        lookups=1,
+        lines_scanned=11,
+        physical_hits=11,
+        lines_parsed=11,
+        logic_matches=11,
+        results_returned=11,
+    )
+
+    # refines the previous query, so only its candidates are scanned
+    assert engine.lookup_phrase(args, "word12") == ["word12"]
+    assert engine.last_search_stats.lines_scanned == 11
+    assert engine.last_search_stats.hit_ratio == 1.0
+    assert engine.lookup_phrase(args, "word12x") == []
+    assert engine.last_search_stats == SearchStats(lookups=1, lines_scanned=1)
+
+    assert engine.search_stats.lookups == 3
+    assert engine.search_stats.lines_scanned == 11 + 11 + 1
+    assert engine.search_stats.results_returned == 12
+
+
+def test_search_stats_not_requested(tmp_path: Path) -> None:
+    """Test that the lines of a full scan are not counted without --stats."""
+    path = tmp_path / "dict.txt"
+    path.write_text("taberu\nnomu\n")
+    engine = LineEngine()
+    engine.path = path
+
+    with patch.object(
+        LineEngine, "_get_line_starts", return_value=[0, 7]
+    ) as get_line_starts:
+        args = argparse.Namespace()
+        assert engine.lookup_phrase(args, "^[nt]") == ["taberu", "nomu"]
+        get_line_starts.assert_not_called()
+        assert engine.last_search_stats is None
+
+        args = argparse.Namespace(stats=True)
+        assert engine.lookup_phrase(args, "[ao][bm][eu]$") == ["nomu"]
+        get_line_starts.assert_called_once()
+        assert engine.last_search_stats == SearchStats(
+            lookups=1,
+            lines_scanned=2,
+            physical_hits=2,
+            lines_parsed=2,
+            logic_matches=1,
+            results_returned=1,
+        )
+
+
+def test_lookup_many(tmp_path: Path) -> None:
+    """Test that looking up many phrases at once finds the same results as
+    looking them up one by one, scanning the dictionary only once.
+    """
+    path = tmp_path / "dict.txt"
+    path.write_text("eaten tea\nTEN\nbeaten\nteapot\nnothing\n")
+    engine = LineEngine()
+    engine.path = path
+    engine.collect_search_stats = True
+    args = argparse.Namespace()
+    phrases = ["eat", "ten", "TEA", "te.", "zeta", "eat"]
+
+    expected = {
+        phrase: engine.lookup_phrase(args, phrase) for phrase in phrases
+    }
+    with patch(
+        "dict.engines.offline.find_lines_containing_any",
+        wraps=find_lines_containing_any,
+    ) as scan:
+        results = engine.lookup_many(args, phrases)
+    assert results == expected
+    assert list(results) == ["eat", "ten", "TEA", "te.", "zeta"]
+    assert results["ten"] == ["eaten tea", "beaten", "TEN"]
+    # the regular expression is looked up on its own
+    scan.assert_called_once()
+    assert engine.last_search_stats == SearchStats(
+        lookups=4,
+        lines_scanned=5,
+        physical_hits=7,
+        lines_parsed=4,
+        logic_matches=7,
+        results_returned=7,
+    )
+
+
+def test_lookup_many_mixed_case(tmp_path: Path) -> None:
+    """Test looking up the phrases that are prefixes of one another, except
+    for their case.
+    """
+    path = tmp_path / "dict.txt"
+    path.write_text("eaten\nEat\nStraße\n", encoding="utf-8")
+    engine = LineEngine()
+    engine.path = path
+    args = argparse.Namespace()
+    assert engine.lookup_many(args, ["Eat", "eaten", "STRA", "straße"]) == {
+        "Eat": ["eaten", "Eat"],
+        "eaten": ["eaten"],
+        "STRA": ["Straße"],
+        "straße": ["Straße"],
+    }
+
+
+def test_search_stats_hit_ratio() -> None:
+    """Test the precision of the physical prefilter."""
+    assert SearchStats().hit_ratio is None
+    stats = SearchStats(physical_hits=4, logic_matches=1)
+    assert stats.hit_ratio == 0.25
+    assert "logic matches: 1 (25% of hits)" in stats.format()
+
+
+def test_fuzzy(tmp_path: Path) -> None:
+    """Test looking up the entries with typos."""
+    path = tmp_path / "dict.txt"
+    path.write_text("taberu\nnomu\ntaberareru\ntabete\n")
+    engine = LineEngine()
+    engine.path = path
+    engine.collect_search_stats = True
+    args = argparse.Namespace(fuzzy=1)
+
+    assert engine.lookup_phrase(args, "tabero") == ["taberu"]
+    assert engine.lookup_phrase(args, "tabe.u") == ["taberu"]
+    assert engine.last_search_stats == SearchStats(
+        lookups=1,
+        physical_hits=1,
+        lines_parsed=1,
+        logic_matches=1,
+        results_returned=1,
+    )
+    # the closest matches go first
+    assert engine.lookup_phrase(argparse.Namespace(fuzzy=2), "taberu") == [
+        "taberu",
+        "tabete",
+    ]
+
+    # the index is saved next to the dictionary and reused
+    index_path = tmp_path / "dict.txt.trigrams"
+    assert index_path.exists()
+    engine = LineEngine()
+    engine.path = path
+    with patch("dict.trigram.TrigramIndex.build") as build:
+        assert engine.lookup_phrase(args, "nom") == ["nomu"]
+    build.assert_not_called()
+
+    # and rebuilt once the dictionary changes
+    path.write_text("taberu\nnomu\nnomimasu\n")
+    os.utime(path, ns=(0, 0))
+    assert engine.lookup_phrase(args, "nomimasy") == ["nomimasu"]
+
+
+@pytest.mark.parametrize(
+    "phrase",
+    ["word1", "^word1$", "WORD.2", "wor(d1)+", "^w.*9$", "d1|d2", "ß", "ord"],
+)
+def test_plans(tmp_path: Path, phrase: str) -> None:
+    """Test that every plan finds the same results."""
+    path = tmp_path / "dict.txt"
+    path.write_text(
+        "".join(f"word{i}\n" for i in range(30)) + "straße\nİstanbul\n",
+        encoding="utf-8",
+    )
+    expected = {
+        line
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if re.search(phrase, line, flags=re.I)
+    }
+    for index in (False, True):
+        engine = LineEngine()
+        engine.path = path
+        args = argparse.Namespace(index=index)
+        assert set(engine.lookup_phrase(args, phrase)) == expected
+
+
+def test_main_explain(tmp_path: Path, capsys) -> None:
+    """Test printing the chosen plans with --explain."""
+    path = tmp_path / "dict.txt"
+    path.write_text("alpha\nbeta\nalphabet\n")
+    with patch.object(LineEngine, "path", path):
+        main(["-e", "line-engine", "-N", "--explain", "^alp.a$"])
+        main(["-e", "line-engine", "-N", "--explain", "--index", "^alp.a$"])
+        main(["-e", "line-engine", "-N", "--explain", "a|b"])
+
+    captured = capsys.readouterr()
+    assert captured.out == "alpha\n" * 2 + "alphabet\nalpha\nbeta\n"
+    assert captured.err.splitlines() == [
+        "plan: literal scan: ^alp",
+        "plan: index: ^alp, a$",
+        "plan: full scan",
+    ]
+
+
+def test_main_stats(tmp_path: Path, capsys) -> None:
+    """Test printing the counters with --stats."""
+    path = tmp_path / "dict.txt"
+    path.write_text("alpha\nbeta\nalphabet\n")
+    with patch.object(LineEngine, "path", path):
+        main(["-e", "line-engine", "-N", "--stats", "alpha"])
+        main(["-e", "line-engine", "-N", "--stats", "alpha"])
+
+    captured = capsys.readouterr()
+    assert captured.out == "alphabet\nalpha\n" * 2
+    # the result cache is bypassed, so both lookups are counted
+    assert (
+        captured.err.splitlines()
+        == [
+            "lines scanned: 2, physical hits: 2, lines parsed: 2, "
+            "logic matches: 2 (100% of hits), results returned: 2"
+        ]
+        * 2
+    )
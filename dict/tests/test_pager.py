@@ -0,0 +1,81 @@
+"""Tests for the dict.pager module."""
+import io
+import subprocess
+from collections.abc import Callable
+from typing import IO, Any
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from dict.pager import RstripStream, pager, with_column_size
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [],
+        ["\n\n"],
+        ["a"],
+        ["a\n", "\n", "b \n", "c", "  \n\n"],
+        ["- a  ", "- b  ", "\n"],
+    ],
+)
+def test_rstrip_stream(chunks: list[str]) -> None:
+    """Test that RstripStream drops only the trailing whitespace."""
+    file = io.StringIO()
+    with RstripStream(file) as stream:
+        for chunk in chunks:
+            stream.write(chunk)
+    assert file.getvalue() == "".join(chunks).rstrip() + "\n"
+
+
+def test_with_column_size() -> None:
+    """Test computing the column size with a bounded lookahead."""
+    items = ["aa", "a", "aaaa", "aaa", "aaaaa", "a"]
+    assert list(with_column_size(items, len, lookahead=3)) == [
+        ("aa", 4),
+        ("a", 4),
+        ("aaaa", 4),
+        ("aaa", 4),
+        ("aaaaa", 5),
+        ("a", 5),
+    ]
+
+
+def _run_pager(command: str, body: Callable[[IO[str]], None]) -> None:
+    real_popen = subprocess.Popen
+
+    def popen(*_args: Any, **kwargs: Any) -> subprocess.Popen:
+        # pylint: disable=consider-using-with
+        return real_popen(command, **kwargs)
+
+    with patch("subprocess.Popen", popen), pager() as file:
+        body(file)
+
+
+def test_pager_quit() -> None:
+    """Test that quitting the pager before the end of the text is not an
+    error.
+    """
+
+    def body(file: IO[str]) -> None:
+        for _ in range(10000):
+            file.write("x" * 100 + "\n")
+            file.flush()
+
+    _run_pager("true", body)
+
+
+def test_pager_reraises_errors() -> None:
+    """Test that the errors of the lookup are not mistaken for a quit pager,
+    even though they are OSErrors too.
+    """
+
+    def body(file: IO[str]) -> None:
+        file.write("first result\n")
+        file.flush()
+        raise requests.ConnectionError("connection reset")
+
+    with pytest.raises(requests.ConnectionError):
+        _run_pager("cat > /dev/null", body)
@@ -0,0 +1,73 @@
+"""Tests for the query planner."""
+import pytest
+
+from dict.planner import (
+    PLAN_FULL_SCAN,
+    PLAN_INDEX,
+    PLAN_LITERAL_SCAN,
+    RequiredLiteral,
+    extract_literals,
+    plan_query,
+)
+from dict.trigram import TrigramIndex
+
+
+@pytest.mark.parametrize(
+    "phrase,expected",
+    [
+        ("taberu", ["taberu"]),
+        ("^食べ.*る$", ["^食べ", "る$"]),
+        ("ta(be)ru", ["taberu"]),
+        ("(?:abc)+x", ["abc", "x"]),
+        ("(abc)*x", ["x"]),
+        ("ab?c", ["a", "c"]),
+        ("[kt]aberu", ["aberu"]),
+        (r"\bcat\b", ["cat"]),
+        (r"a\.b", ["a.b"]),
+        ("abc|abd", ["ab"]),
+        ("abc|xbc", []),
+        ("^$", []),
+        (".*", []),
+    ],
+)
+def test_extract_literals(phrase: str, expected: list[str]) -> None:
+    """Test finding the substrings of every match of a pattern."""
+    assert [str(literal) for literal in extract_literals(phrase)] == expected
+
+
+def test_literal_trigrams() -> None:
+    """Test that only the anchored ends of the literals are padded."""
+    assert RequiredLiteral("Ab").get_trigrams() == set()
+    assert RequiredLiteral("Ab", anchored_start=True).get_trigrams() == {
+        "\0\0a",
+        "\0ab",
+    }
+    assert RequiredLiteral("abc", anchored_end=True).get_trigrams() == {
+        "abc",
+        "bc\0",
+        "c\0\0",
+    }
+    # the indexed terms are stripped
+    assert RequiredLiteral(" ab", anchored_start=True).get_trigrams() == set()
+
+
+@pytest.mark.parametrize(
+    "phrase,indexed,expected",
+    [
+        ("tabe", True, "index: tabe"),
+        ("tabe", False, "literal scan: tabe"),
+        ("^食べ.*る$", True, "index: ^食べ, る$"),
+        ("^食べ.*る$", False, "literal scan: ^食べ"),
+        ("ta.*taberu", False, "literal scan: taberu"),
+        ("ta", True, "literal scan: ta"),
+        ("ß.", False, PLAN_FULL_SCAN),
+        ("a|b", True, PLAN_FULL_SCAN),
+    ],
+)
+def test_plan_query(phrase: str, indexed: bool, expected: str) -> None:
+    """Test choosing the plan."""
+    index = TrigramIndex.build(1, []) if indexed else None
+    plan = plan_query(phrase, index)
+    assert str(plan) == expected
+    assert (plan.index is not None) == (plan.strategy == PLAN_INDEX)
+    assert plan.strategy in (PLAN_INDEX, PLAN_LITERAL_SCAN, PLAN_FULL_SCAN)
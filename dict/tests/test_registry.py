@@ -0,0 +1,110 @@
+"""Tests for the engine registry."""
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from dict.engines import BaseEngine
+from dict.engines.registry import (
+    BUILTIN_ENGINES,
+    EngineNames,
+    get_engine_names,
+    get_plugin_engines,
+    load_engine,
+)
+
+
+class RegisteredEngine(BaseEngine[str]):  # pylint: disable=abstract-method
+    """An engine registered by merely subclassing the BaseEngine."""
+
+    names = ["registered-engine", "registered"]
+
+
+@pytest.fixture(name="plugins")
+def fixture_plugins():
+    """Pretend an engine is provided by an installed package."""
+    plugins = {"plugin-engine": "dict.tests.test_registry:RegisteredEngine"}
+    with patch(
+        "dict.engines.registry.get_plugin_engines", return_value=plugins
+    ):
+        yield plugins
+
+
+def test_builtin_engines_are_importable() -> None:
+    """Test that every built-in engine points to an engine with that name."""
+    for name in BUILTIN_ENGINES:
+        cls = load_engine(name)
+        assert issubclass(cls, BaseEngine)
+        assert name in cls.names
+
+
+def test_subclasses_are_registered() -> None:
+    """Test that the imported engines are available under all their names."""
+    assert load_engine("registered-engine") is RegisteredEngine
+    assert load_engine("registered") is RegisteredEngine
+    assert "registered" in EngineNames()
+    assert "registered" in get_engine_names()
+
+
+@pytest.mark.usefixtures("plugins")
+def test_plugin_engines() -> None:
+    """Test loading the engines advertised through entry points."""
+    assert "plugin-engine" in EngineNames()
+    assert list(EngineNames())[: len(BUILTIN_ENGINES)] == list(BUILTIN_ENGINES)
+    assert "plugin-engine" in list(EngineNames())
+    assert load_engine("plugin-engine") is RegisteredEngine
+
+
+def test_builtin_engines_do_not_scan_plugins() -> None:
+    """Test that choosing a built-in engine does not scan entry points."""
+    with patch("dict.engines.registry.get_plugin_engines") as get_plugins:
+        assert "jisho" in EngineNames()
+    get_plugins.assert_not_called()
+
+
+def test_unknown_engine() -> None:
+    """Test loading an engine that does not exist."""
+    get_plugin_engines.cache_clear()
+    assert "nonexistent" not in EngineNames()
+    with pytest.raises(KeyError):
+        load_engine("nonexistent")
+
+
+def _get_imported_modules(code: str, modules: list[str]) -> list[str]:
+    code += (
+        "\nimport sys\n"
+        f"print(*[name for name in {modules!r} if name in sys.modules])\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.splitlines()[-1].split()
+
+
+def test_lazy_imports(tmp_path: Path) -> None:
+    """Test that selecting an engine imports only what it depends on."""
+    heavy = ["lxml", "cssselect", "tqdm", "xdg", "dict.engines.edict2"]
+    code = (
+        "from dict.__main__ import parse_args\n"
+        "parse_args(['-e', 'jisho', 'test'])\n"
+    )
+    assert _get_imported_modules(code, heavy) == []
+
+    # the offline lookups do not need the HTTP client
+    path = tmp_path / "edict2.txt"
+    path.write_text(
+        "食べる [たべる] /(v1,vt) to eat/(P)/EntL1358280X/\n", encoding="utf-8"
+    )
+    code = (
+        "from pathlib import Path\n"
+        "from unittest.mock import patch\n"
+        "from dict.__main__ import main\n"
+        f"with patch('dict.engines.edict2.CACHE_PATH', Path({str(path)!r})):\n"
+        "    main(['-e', 'edict2', '-N', '--timeout=3', 'eat'])\n"
+    )
+    assert _get_imported_modules(code, ["requests", "dict.http"]) == []
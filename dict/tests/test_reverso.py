@@ -1,4 +1,5 @@
 """Test the ReversoEngine class."""
+import io
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -12,7 +13,9 @@ def test_reverso(data_dir: Path, capsys) -> None:
         "requests.get",
         return_value=Mock(
             raise_for_status=Mock(),
-            text=(data_dir / "reverso_in.html").read_text(),
+            iter_content=Mock(
+                return_value=[(data_dir / "reverso_in.html").read_text()]
+            ),
         ),
     ) as fake_get:
         main(["-e", "reverso", "-N", "ridiculous", "-s", "pl", "-d", "en"])
@@ -40,3 +43,19 @@ def test_reverso_no_results(capsys) -> None:
     fake_get.assert_called_once()
 
     assert strip_ansi_sequences(capsys.readouterr().out) == "no results\n"
+
+
+def test_reverso_no_results_cached(monkeypatch, capsys) -> None:
+    """Test that repeated misses are answered from the negative cache."""
+    monkeypatch.setattr("sys.stdin", io.StringIO("ridiculous\n" * 3))
+    with patch(
+        "requests.get",
+        return_value=Mock(status_code=404),
+    ) as fake_get:
+        main(["-e", "reverso", "-N", "--source-lang=pl", "--dest-lang=en"])
+
+    fake_get.assert_called_once()
+
+    assert (
+        strip_ansi_sequences(capsys.readouterr().out).count("no results") == 3
+    )
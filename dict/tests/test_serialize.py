@@ -0,0 +1,69 @@
+"""Tests for the JSON serialization of the results."""
+import io
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import pytest
+
+from dict.serialize import dumps, write_json, write_jsonl
+
+
+@dataclass
+class Inner:
+    """A nested dataclass."""
+
+    text: str
+    number: Optional[int]
+
+
+@dataclass
+class Outer:
+    """A dataclass containing other ones."""
+
+    items: list[Inner]
+    mapping: dict[str, Inner]
+
+    @property
+    def count(self) -> int:
+        """A property, which should not be serialized."""
+        return len(self.items)
+
+
+def test_dumps() -> None:
+    """Test serializing nested dataclasses."""
+    obj = Outer(
+        items=[Inner(text="żółw", number=1), Inner(text="b", number=None)],
+        mapping={"key": Inner(text="c", number=3)},
+    )
+    text = dumps([obj])
+    assert "żółw" in text
+    assert json.loads(text) == [
+        {
+            "items": [
+                {"text": "żółw", "number": 1},
+                {"text": "b", "number": None},
+            ],
+            "mapping": {"key": {"text": "c", "number": 3}},
+        }
+    ]
+
+
+def test_dumps_unsupported() -> None:
+    """Test serializing an object that is not a dataclass."""
+    with pytest.raises(TypeError):
+        dumps(object())
+
+
+def test_write_json() -> None:
+    """Test writing the results as a JSON array."""
+    file = io.StringIO()
+    write_json(iter([Inner(text="a", number=1), "b"]), file)
+    assert json.loads(file.getvalue()) == [{"text": "a", "number": 1}, "b"]
+
+
+def test_write_jsonl() -> None:
+    """Test writing the results as JSON lines."""
+    file = io.StringIO()
+    write_jsonl(iter([Inner(text="a", number=1), "b"]), file)
+    assert file.getvalue() == '{"text":"a","number":1}\n"b"\n'
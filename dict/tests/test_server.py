@@ -0,0 +1,164 @@
+"""Tests for the HTTP lookup server."""
+import argparse
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import IO, Any
+
+import pytest
+
+from dict.engines import BaseEngine
+from dict.server import LookupServer, get_lookup_options
+
+
+@dataclass
+class ServerTestResult:
+    """A result of the test engine."""
+
+    phrase: str
+    tags: list[str]
+
+
+class ServerTestEngine(BaseEngine[ServerTestResult]):
+    """An engine echoing the phrase back."""
+
+    names = ["server-test-engine"]
+    release = threading.Event()
+
+    @staticmethod
+    def decorate_arg_parser(parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("-t", "--tag", default="none")
+        parser.add_argument("-u", "--upper", action="store_true")
+
+    def lookup_phrase(
+        self, args: argparse.Namespace, phrase: str
+    ) -> Iterable[ServerTestResult]:
+        if phrase == "fail":
+            raise RuntimeError("lookup failed")
+        if phrase == "wait":
+            self.release.wait(timeout=5)
+        if phrase:
+            yield ServerTestResult(
+                phrase=phrase.upper() if args.upper else phrase,
+                tags=[args.tag],
+            )
+
+    def print_results(
+        self, results: Iterable[ServerTestResult], file: IO[str]
+    ) -> None:
+        raise NotImplementedError("not implemented")
+
+
+def _start(server: LookupServer) -> threading.Thread:
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}
+    )
+    thread.start()
+    return thread
+
+
+@pytest.fixture(name="server")
+def fixture_server() -> Iterator[LookupServer]:
+    """Run a server in a background thread."""
+    with LookupServer(("127.0.0.1", 0), workers=2) as server:
+        thread = _start(server)
+        try:
+            yield server
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+def _get(server: LookupServer, query: str) -> tuple[int, Any]:
+    url = f"http://127.0.0.1:{server.server_port}{query}"
+    try:
+        with urllib.request.urlopen(url) as response:
+            assert "lookup;dur=" in response.headers["Server-Timing"]
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as ex:
+        with ex:
+            return ex.code, json.loads(ex.read() or "null")
+
+
+def test_lookup(server: LookupServer) -> None:
+    """Test a successful lookup."""
+    assert _get(
+        server, "/lookup?engine=server-test-engine&q=abc&tag=x&upper"
+    ) == (
+        200,
+        {
+            "engine": "server-test-engine",
+            "phrase": "abc",
+            "results": [{"phrase": "ABC", "tags": ["x"]}],
+        },
+    )
+
+
+def test_lookup_shares_engines(server: LookupServer) -> None:
+    """Test that the engine is created once for all the requests."""
+    for phrase in ("a", "b"):
+        status, _ = _get(
+            server, f"/lookup?engine=server-test-engine&q={phrase}"
+        )
+        assert status == 200
+    assert list(map(type, server.engines.values())) == [ServerTestEngine]
+
+
+@pytest.mark.parametrize(
+    "query,status",
+    [
+        ("/lookup?q=abc", 400),
+        ("/lookup?engine=server-test-engine", 400),
+        ("/lookup?engine=nonexistent&q=abc", 400),
+        ("/lookup?engine=server-test-engine&q=abc&unknown=1", 400),
+        ("/lookup?engine=server-test-engine&q=abc&cache-dir=/tmp", 400),
+        ("/lookup?engine=server-test-engine&q=abc&cache=/tmp", 400),
+        ("/lookup?engine=server-test-engine&q=abc&trace=/tmp/x", 400),
+        ("/lookup?engine=server-test-engine&q=abc&daemon", 400),
+        ("/lookup?engine=server-test-engine&q=abc&-engine=x", 400),
+        ("/lookup?engine=server-test-engine&q=abc&t=x", 400),
+        ("/lookup?engine=server-test-engine&q=fail", 500),
+        ("/other", 404),
+    ],
+)
+def test_errors(server: LookupServer, query: str, status: int) -> None:
+    """Test the replies to invalid or failed requests."""
+    actual_status, body = _get(server, query)
+    assert actual_status == status
+    assert body["error"]
+
+
+def test_overload() -> None:
+    """Test refusing the requests once the workers and the queue are full."""
+    ServerTestEngine.release.clear()
+    with LookupServer(("127.0.0.1", 0), workers=1, backlog=0) as server:
+        thread = _start(server)
+        waiting = threading.Thread(
+            target=_get,
+            args=(server, "/lookup?engine=server-test-engine&q=wait"),
+        )
+        waiting.start()
+        try:
+            status = 200
+            for _ in range(100):
+                status, _ = _get(
+                    server, "/lookup?engine=server-test-engine&q=a"
+                )
+                if status == 503:
+                    break
+            assert status == 503
+        finally:
+            ServerTestEngine.release.set()
+            waiting.join()
+            server.shutdown()
+            thread.join()
+
+
+def test_get_lookup_options() -> None:
+    """Test that only the engine's own options are accepted."""
+    assert get_lookup_options("server-test-engine") == {"tag", "upper"}
+    assert "stats" not in get_lookup_options("edict2")
+    assert "deinflect" in get_lookup_options("edict2")
@@ -1,10 +1,14 @@
 """Test the SJPEngine class."""
+import argparse
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+import requests
 
 from dict.__main__ import main
+from dict.engines.sjp import SJPEngine
+from dict.http import DEFAULT_TIMEOUT
 
 
 @pytest.mark.parametrize(
@@ -26,14 +30,33 @@ def test_sjp(
         "requests.get",
         return_value=Mock(
             raise_for_status=Mock(),
-            text=(data_dir / f"{test_file_prefix}_in.html").read_text(),
+            iter_content=Mock(
+                return_value=[
+                    (data_dir / f"{test_file_prefix}_in.html").read_text()
+                ]
+            ),
         ),
     ) as fake_get:
         main(["-e", "sjp", "-N", test_phrase])
 
-    fake_get.assert_called_once_with(expected_url)
+    fake_get.assert_called_once_with(
+        expected_url, stream=True, timeout=DEFAULT_TIMEOUT
+    )
 
     assert (
         capsys.readouterr().out
         == (data_dir / f"{test_file_prefix}_out.txt").read_text()
     )
+
+
+def test_sjp_error() -> None:
+    """Test that the response is closed on an HTTP error."""
+    fake_response = Mock()
+    fake_response.raise_for_status.side_effect = requests.HTTPError
+    close = fake_response.close
+    engine = SJPEngine()
+    with patch("requests.get", return_value=fake_response), pytest.raises(
+        requests.HTTPError
+    ):
+        next(iter(engine.lookup_phrase(argparse.Namespace(), "test")))
+    close.assert_called_once()
@@ -5,37 +5,28 @@ from unittest.mock import Mock, patch
 import pytest
 
 from dict.__main__ import main
+from dict.http import DEFAULT_TIMEOUT
 
 
 @pytest.mark.parametrize(
-    "test_file_prefix,test_phrase,status_code,expected_url",
+    "test_file_prefix,test_phrase,expected_url",
     [
         (
             "synonim_valid",
             "miłość",
-            200,
             "https://synonim.net/synonim/mi%C5%82o%C5%9B%C4%87",
         ),
         (
             "synonim_headerless",
             "uzupełniać",
-            200,
             "https://synonim.net/synonim/uzupe%C5%82nia%C4%87",
         ),
-        (
-            "synonim_invalid",
-            "fraktur",
-            404,
-            "https://synonim.net/synonim/fraktur",
-        ),
     ],
 )
 def test_synonim(
-    # pylint: disable=too-many-arguments
     data_dir: Path,
     capsys,
     test_file_prefix: str,
-    status_code: int,
     test_phrase: str,
     expected_url: str,
 ) -> None:
@@ -43,8 +34,12 @@ def test_synonim(
     fake_get = Mock(
         return_value=Mock(
             raise_for_status=Mock(),
-            status_code=status_code,
-            text=(data_dir / f"{test_file_prefix}_in.html").read_text(),
+            status_code=200,
+            iter_content=Mock(
+                return_value=[
+                    (data_dir / f"{test_file_prefix}_in.html").read_text()
+                ]
+            ),
         ),
     )
     with patch(
@@ -53,9 +48,37 @@ def test_synonim(
     ):
         main(["-e", "synonim", "-N", test_phrase])
 
-        fake_get.assert_called_once_with(expected_url)
+        fake_get.assert_called_once_with(
+            expected_url, stream=True, timeout=DEFAULT_TIMEOUT
+        )
 
     assert (
         capsys.readouterr().out
         == (data_dir / f"{test_file_prefix}_out.txt").read_text()
     )
+
+
+def test_synonim_no_results(data_dir: Path, capsys) -> None:
+    """Test the synonim.net engine (no results)."""
+    fake_get = Mock(
+        return_value=Mock(
+            status_code=404,
+            iter_content=Mock(
+                return_value=[
+                    (data_dir / "synonim_invalid_in.html").read_text()
+                ]
+            ),
+        ),
+    )
+    with patch("requests.Session", return_value=Mock(get=fake_get)):
+        main(["-e", "synonim", "-N", "fraktur"])
+
+    fake_get.assert_called_once_with(
+        "https://synonim.net/synonim/fraktur",
+        stream=True,
+        timeout=DEFAULT_TIMEOUT,
+    )
+    assert (
+        capsys.readouterr().out
+        == (data_dir / "synonim_invalid_out.txt").read_text()
+    )
@@ -0,0 +1,117 @@
+"""Tests for the dict.synthetic module."""
+import io
+from pathlib import Path
+
+from dict.engines.edict2 import parse_edict2_line
+from dict.engines.jmdict import build_entries_from_xml
+from dict.synthetic import (
+    JMDICT_ENTRIES,
+    TAG_DESCRIPTIONS,
+    GeneratorConfig,
+    generate_entries,
+    main,
+    write_edict2,
+    write_jmdict_xml,
+)
+
+
+def test_generate_entries_reproducible() -> None:
+    """Test that the same seed produces the same entries."""
+    config = GeneratorConfig(entries=50, seed=1)
+    entries = list(generate_entries(config))
+    assert len(entries) == 50
+    assert entries == list(generate_entries(config))
+    assert entries != list(generate_entries(GeneratorConfig(50, seed=2)))
+
+
+def test_script_mix() -> None:
+    """Test choosing the writing systems of the entries."""
+    entries = list(
+        generate_entries(
+            GeneratorConfig(
+                entries=50, kanji_ratio=0, kana_ratio=0, katakana_ratio=1
+            )
+        )
+    )
+    assert not any(entry.kanji for entry in entries)
+    assert all(
+        "゠" <= char <= "ヿ" for entry in entries for char in entry.readings[0]
+    )
+
+
+def test_pos_weights() -> None:
+    """Test choosing the distribution of the parts of speech."""
+    entries = generate_entries(
+        GeneratorConfig(entries=50, pos_weights={"v1": 1.0})
+    )
+    for entry in entries:
+        for sense in entry.senses:
+            assert sense.parts_of_speech[0] == "v1"
+            assert sense.parts_of_speech[1] in ("vt", "vi")
+            assert sense.glosses["eng"][0].startswith("to ")
+
+
+def test_write_edict2() -> None:
+    """Test that the EDICT2 lines are parsed back into the same entries."""
+    entries = list(generate_entries(GeneratorConfig(entries=200)))
+    file = io.StringIO()
+    write_edict2(file, entries)
+    lines = file.getvalue().splitlines()
+    assert len(lines) == len(entries)
+
+    for entry, line in zip(entries, lines):
+        result = parse_edict2_line(line)
+        assert result.ent_seq == str(entry.ent_seq)
+        assert result.has_audio == entry.has_audio
+        assert ("P" in result.tags) == bool(entry.priorities)
+        assert {jap.kana for jap in result.japanese} == set(entry.readings)
+        assert {jap.kanji for jap in result.japanese} == set(
+            entry.kanji or entry.readings
+        )
+        # the glosses of the numbered senses are joined together
+        if len(entry.senses) > 1:
+            expected = [
+                "/".join(sense.glosses["eng"]) for sense in entry.senses
+            ]
+        else:
+            expected = entry.senses[0].glosses["eng"]
+        assert [glossary.english for glossary in result.glossaries] == expected
+
+
+def test_write_jmdict_xml(tmp_path: Path) -> None:
+    """Test that the JMdict XML is converted back into the same entries."""
+    config = GeneratorConfig(entries=100, languages=("eng", "ger"))
+    entries = list(generate_entries(config))
+    path = tmp_path / "jmdict.xml"
+    with path.open("w", encoding="utf-8") as handle:
+        write_jmdict_xml(handle, entries)
+
+    results = list(build_entries_from_xml(path))
+    assert len(results) == len(entries)
+    for entry, result in zip(entries, results):
+        assert result.ent_seq == entry.ent_seq
+        assert [kanji.kanji for kanji in result.kanji] == entry.kanji
+        assert [reading.reading for reading in result.readings] == (
+            entry.readings
+        )
+        assert [reading.pri for reading in result.readings][0] == (
+            entry.priorities
+        )
+        for sense, result_sense in zip(entry.senses, result.senses):
+            assert result_sense.meanings == (
+                sense.glosses["eng"] + sense.glosses["ger"]
+            )
+            assert result_sense.parts_of_speech == [
+                TAG_DESCRIPTIONS.get(pos, pos) for pos in sense.parts_of_speech
+            ]
+
+
+def test_main(tmp_path: Path) -> None:
+    """Test generating a dictionary from the command line."""
+    path = tmp_path / "edict2.txt"
+    main(["edict2", str(path), "--scale", str(10 / JMDICT_ENTRIES)])
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 10
+
+    path = tmp_path / "jmdict.xml"
+    main(["jmdict", str(path), "-n", "5", "--pos", "n=1", "--pos", "adv=1"])
+    assert len(list(build_entries_from_xml(path))) == 5
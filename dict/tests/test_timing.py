@@ -0,0 +1,134 @@
+"""Tests for the dict.timing module."""
+import gzip
+import json
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from dict import timing
+from dict.__main__ import main
+from dict.timing import Timings
+
+
+class FakeClock:
+    """A clock advancing by a second every time it is read."""
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time.
+
+        :return: number of seconds
+        """
+        self.now += 1.0
+        return self.now
+
+
+def test_span_disabled() -> None:
+    """Test that the spans are not recorded outside of Timings."""
+    timings = Timings()
+    with timing.span("phase"):
+        pass
+    assert list(timing.iter_spans("phase", [1, 2])) == [1, 2]
+    assert not timings.spans
+
+
+def test_span_nested() -> None:
+    """Test that the time of the nested spans is excluded from self time."""
+    with Timings(clock=FakeClock()) as timings:
+        with timing.span("outer", phrase="test"):
+            with timing.span("inner"):
+                pass
+            with timing.span("inner"):
+                pass
+
+    assert [(span.name, span.duration) for span in timings.spans] == [
+        ("inner", 1.0),
+        ("inner", 1.0),
+        ("outer", 5.0),
+    ]
+    summary = timings.summarize()
+    assert [
+        (phase.name, phase.count, phase.total, phase.self_total)
+        for phase in summary
+    ] == [("outer", 1, 5.0, 3.0), ("inner", 2, 2.0, 2.0)]
+    assert "outer" in timings.format_summary()
+
+
+def test_iter_spans() -> None:
+    """Test recording the time of producing each item."""
+    with Timings(clock=FakeClock()) as timings:
+        assert list(timing.iter_spans("item", [1, 2])) == [1, 2]
+    # two items and the end of the iteration
+    assert [span.name for span in timings.spans] == ["item"] * 3
+
+
+def test_chrome_trace(tmp_path: Path) -> None:
+    """Test exporting the spans in the Chrome trace event format."""
+    with Timings(clock=FakeClock()) as timings:
+        with timing.span("phase", url="https://example.com"):
+            pass
+
+    path = tmp_path / "trace.json"
+    timings.write_chrome_trace(path)
+    trace = json.loads(path.read_text())
+    assert len(trace["traceEvents"]) == 1
+    event = trace["traceEvents"][0]
+    assert event["name"] == "phase"
+    assert event["ph"] == "X"
+    assert event["ts"] == 1e6
+    assert event["dur"] == 1e6
+    assert event["args"] == {"url": "https://example.com"}
+
+
+def test_main_timings(tmp_path: Path, data_dir: Path, capsys) -> None:
+    """Test reporting the phases of an offline lookup."""
+    test_content = gzip.compress(
+        (data_dir / "edict2_in.txt").read_text().encode("euc-jp")
+    )
+    trace_path = tmp_path / "trace.json"
+
+    with patch(
+        "dict.engines.edict2.CACHE_PATH", tmp_path / "edict2.txt"
+    ), patch(
+        "requests.head", return_value=Mock(status_code=200, headers={})
+    ), patch(
+        "requests.get",
+        return_value=Mock(
+            raise_for_status=Mock(),
+            headers={"Content-Length": len(test_content)},
+            iter_content=Mock(return_value=[test_content]),
+        ),
+    ):
+        main(
+            [
+                "-e",
+                "edict",
+                "-N",
+                "--timings",
+                f"--trace={trace_path}",
+                "憂鬱",
+            ]
+        )
+
+    captured = capsys.readouterr()
+    assert captured.out == (data_dir / "edict2_out.txt").read_text()
+    assert "read dictionary" in captured.err
+    names = {
+        event["name"]
+        for event in json.loads(trace_path.read_text())["traceEvents"]
+    }
+    assert {
+        "parse arguments",
+        "lookup",
+        "download",
+        "http",
+        "decompress",
+        "read dictionary",
+        "scan",
+        "parse",
+        "rank",
+        "render",
+    } <= names
+    assert timing._TIMINGS is None  # pylint: disable=protected-access
@@ -0,0 +1,81 @@
+"""Tests for the trigram index."""
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from dict.trigram import TrigramIndex, edit_distance, get_trigrams
+
+LINES = [
+    ["taberu", "to eat"],
+    ["nomu", "to drink"],
+    ["taberareru", "to be eaten"],
+    ["食べる"],
+]
+
+
+@pytest.mark.parametrize(
+    "first,second,max_distance,expected",
+    [
+        ("taberu", "taberu", 0, 0),
+        ("taberu", "tabero", 1, 1),
+        ("taberu", "tberu", 1, 1),
+        ("taberu", "tabberu", 1, 1),
+        ("taberu", "tebaru", 1, None),
+        ("taberu", "tebaru", 2, 2),
+        ("taberu", "taberareru", 3, None),
+        ("", "abc", 3, 3),
+    ],
+)
+def test_edit_distance(
+    first: str, second: str, max_distance: int, expected: Optional[int]
+) -> None:
+    """Test computing the bounded Levenshtein distance."""
+    assert edit_distance(first, second, max_distance) == expected
+    # pylint: disable=arguments-out-of-order
+    assert edit_distance(second, first, max_distance) == expected
+
+
+def test_get_trigrams() -> None:
+    """Test that the short terms produce padded trigrams."""
+    assert get_trigrams("ab") == {"\0\0a", "\0ab", "ab\0", "b\0\0"}
+
+
+def test_find_lines() -> None:
+    """Test finding the lines within the edit distance of the phrase."""
+    index = TrigramIndex.build(1, LINES)
+    assert index.find_lines("taberu", 0) == {0: 0}
+    assert index.find_lines("Tabero", 1) == {0: 1}
+    # multi-word terms are indexed word by word too
+    assert index.find_lines("drnk", 1) == {1: 1}
+    assert index.find_lines("to eat", 0) == {0: 0}
+    assert index.find_lines("eaten", 1) == {2: 0}
+    assert index.find_lines("eaten", 2) == {0: 2, 2: 0}
+    assert index.find_lines("食べろ", 1) == {3: 1}
+    assert not index.find_lines("xyz", 1)
+    # too short to filter by the trigrams, matches "to"
+    assert index.find_lines("ta", 2) == {0: 1, 1: 1, 2: 1}
+
+
+def test_find_lines_containing() -> None:
+    """Test finding the lines with a term containing all the trigrams."""
+    index = TrigramIndex.build(1, LINES)
+    assert index.find_lines_containing({"tab", "ber"}) == [0, 2]
+    assert index.find_lines_containing({"tab", "rar"}) == [2]
+    assert index.find_lines_containing({"eat", "drink"[:3]}) == []
+    assert index.find_lines_containing({"xyz"}) == []
+
+
+def test_save_load(tmp_path: Path) -> None:
+    """Test that the index is loaded only for the same dictionary version."""
+    path = tmp_path / "index"
+    assert TrigramIndex.load(path, 1) is None
+
+    TrigramIndex.build(1, LINES).save(path)
+    index = TrigramIndex.load(path, 1)
+    assert index is not None
+    assert index.find_lines("drnk", 1) == {1: 1}
+    assert TrigramIndex.load(path, 2) is None
+
+    path.write_bytes(b"garbage")
+    assert TrigramIndex.load(path, 1) is None
@@ -4,6 +4,7 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 
 from dict.__main__ import main
+from dict.http import DEFAULT_TIMEOUT
 
 
 def test_urban(data_dir: Path, capsys) -> None:
@@ -22,7 +23,9 @@ def test_urban(data_dir: Path, capsys) -> None:
         main(["-e", "urban", "-N", "sizzle"])
 
     fake_get.assert_called_once_with(
-        "http://api.urbandictionary.com/v0/define", {"term": "sizzle"}
+        "http://api.urbandictionary.com/v0/define",
+        {"term": "sizzle"},
+        timeout=DEFAULT_TIMEOUT,
     )
 
     assert capsys.readouterr().out == (data_dir / "urban_out.txt").read_text()
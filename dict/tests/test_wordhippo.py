@@ -3,8 +3,10 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+import requests
 
 from dict.__main__ import main
+from dict.engines.wordhippo import WordHippoEngine
 
 
 @pytest.mark.parametrize(
@@ -40,7 +42,11 @@ def test_wordhippo(
         "requests.get",
         return_value=Mock(
             raise_for_status=Mock(),
-            text=(data_dir / f"{test_file_prefix}_in.html").read_text(),
+            iter_content=Mock(
+                return_value=[
+                    (data_dir / f"{test_file_prefix}_in.html").read_text()
+                ]
+            ),
         ),
     ) as fake_get:
         main(["-e", "wordhippo", "-N", *args])
@@ -52,3 +58,18 @@ def test_wordhippo(
         capsys.readouterr().out
         == (data_dir / f"{test_file_prefix}_out.txt").read_text()
     )
+
+
+@pytest.mark.parametrize(
+    "get_results", [WordHippoEngine.get_synonyms, WordHippoEngine.get_meanings]
+)
+def test_wordhippo_error(get_results) -> None:
+    """Test that the response is closed when the server returns an error."""
+    response = Mock(
+        raise_for_status=Mock(side_effect=requests.HTTPError("500"))
+    )
+    close = response.close
+    with patch("requests.get", return_value=response):
+        with pytest.raises(requests.HTTPError):
+            list(get_results("test"))
+    close.assert_called_once()
@@ -14,24 +14,6 @@ def wrap_long_text(text: str, length: int = 70) -> str:
     )
 
 
-def expand_sgml(text: str) -> str:
-    """Replaces &#...; SGML entities to their Unicode character equivalents.
-
-    :param text: HTML to transform
-    :return: transformed text
-    """
-    return re.sub(r"&#(\d+);", lambda m: chr(int(m.group(1))), text)
-
-
-def strip_html(text: str) -> str:
-    """Strip HTML tags from the input text.
-
-    :param text: HTML to sanitize
-    :return: sanitized text
-    """
-    return re.sub("<[^>]*>", "", text)
-
-
 def strip_ansi_sequences(text: str) -> str:
     """Strip ANSI sequences from the input text.
 
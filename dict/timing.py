@@ -0,0 +1,211 @@
+"""Measuring the time taken by the phases of the lookups.
+
+The code marks its phases, such as downloading, scanning the dictionary or
+rendering the results, with spans:
+
+    with timing.span("scan"):
+        ...
+
+The spans are recorded only while a Timings object is in use as a context
+manager; otherwise span() returns a shared no-op context manager, so the
+instrumentation costs a single function call per phase. The recorded spans
+can be summarized per phase or exported in the Chrome trace event format,
+to be inspected in chrome://tracing or https://ui.perfetto.dev.
+"""
+import contextlib
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ContextManager, Optional, TypeVar, cast
+
+from dict.serialize import dumps
+
+T = TypeVar("T")
+
+
+@dataclass
+class Span:
+    """A single recorded phase."""
+
+    name: str
+    start: float  # seconds since the recording started
+    duration: float  # seconds
+    self_duration: float  # seconds, excluding the nested spans
+    thread_id: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class PhaseSummary:
+    """Aggregated time of all the spans with the same name."""
+
+    name: str
+    count: int
+    total: float  # seconds
+    self_total: float  # seconds, excluding the nested spans
+
+
+class Timings:
+    """A recorder of spans.
+
+    Use it as a context manager to record the spans opened with span()
+    anywhere in the program, in all threads.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """Initialize self.
+
+        :param clock: monotonic time source
+        """
+        self.spans: list[Span] = []
+        self._clock = clock
+        self._origin = clock()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """Record the time taken by the enclosed code.
+
+        :param name: name of the phase
+        :param args: additional information to attach to the span
+        :return: a context manager delimiting the span
+        """
+        # time taken by the nested spans of each open span of this thread
+        stack: list[float] = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = self._clock()
+        try:
+            yield
+        finally:
+            duration = self._clock() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += duration
+            with self._lock:
+                self.spans.append(
+                    Span(
+                        name=name,
+                        start=start - self._origin,
+                        duration=duration,
+                        self_duration=duration - nested,
+                        thread_id=threading.get_ident(),
+                        args=args,
+                    )
+                )
+
+    def summarize(self) -> list[PhaseSummary]:
+        """Aggregate the spans by their names.
+
+        :return: summaries of the phases, the longest first
+        """
+        phases: dict[str, PhaseSummary] = {}
+        with self._lock:
+            for span_ in self.spans:
+                phase = phases.setdefault(
+                    span_.name, PhaseSummary(span_.name, 0, 0.0, 0.0)
+                )
+                phase.count += 1
+                phase.total += span_.duration
+                phase.self_total += span_.self_duration
+        return sorted(
+            phases.values(), key=lambda phase: phase.total, reverse=True
+        )
+
+    def format_summary(self) -> str:
+        """Format the summary of the phases as a table.
+
+        :return: table with one phase per row
+        """
+        lines = [f"{'phase':20} {'count':>6} {'total':>11} {'self':>11}"]
+        for phase in self.summarize():
+            lines.append(
+                f"{phase.name:20} {phase.count:6d} "
+                f"{phase.total * 1e3:8.2f} ms {phase.self_total * 1e3:8.2f} ms"
+            )
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Convert the spans to the Chrome trace event format.
+
+        :return: JSON-serializable trace
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": span_.name,
+                    "cat": "dict",
+                    "ph": "X",
+                    "ts": span_.start * 1e6,
+                    "dur": span_.duration * 1e6,
+                    "pid": pid,
+                    "tid": span_.thread_id,
+                    "args": span_.args,
+                }
+                for span_ in self.spans
+            ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Save the spans in the Chrome trace event format.
+
+        :param path: path to the JSON file to create
+        """
+        path.write_text(dumps(self.to_chrome_trace()))
+
+    def __enter__(self) -> "Timings":
+        global _TIMINGS  # pylint: disable=global-statement
+        _TIMINGS = self
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        global _TIMINGS  # pylint: disable=global-statement
+        _TIMINGS = None
+
+
+_TIMINGS: Optional[Timings] = None  # set by entering a Timings
+_NO_SPAN: ContextManager[None] = contextlib.nullcontext()
+_END = object()
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """Record the time taken by the enclosed code, if the timings are being
+    recorded.
+
+    :param name: name of the phase
+    :param args: additional information to attach to the span
+    :return: a context manager delimiting the span
+    """
+    timings = _TIMINGS
+    if timings is None:
+        return _NO_SPAN
+    return timings.span(name, **args)
+
+
+def iter_spans(name: str, items: Iterable[T]) -> Iterable[T]:
+    """Record the time taken by producing each item, if the timings are
+    being recorded.
+
+    Used for the iterators that do the actual work lazily, such as reading
+    the body of a streamed HTTP response.
+
+    :param name: name of the phase
+    :param items: items to iterate over
+    :return: the same items
+    """
+    if _TIMINGS is None:
+        return items
+    return _iter_spans(name, iter(items))
+
+
+def _iter_spans(name: str, iterator: Iterator[T]) -> Iterator[T]:
+    while True:
+        with span(name):
+            item = next(iterator, _END)
+        if item is _END:
+            return
+        yield cast(T, item)
@@ -0,0 +1,271 @@
+"""Trigram index for approximate lookups in the offline dictionaries.
+
+The index maps the trigrams of the distinct searchable terms of a dictionary,
+such as readings, spellings and glosses, to the terms containing them, and
+each term to the lines it occurs in. A term within the edit distance k of a
+query shares all but at most 3k of the query's trigrams, so intersecting the
+posting lists of the query's trigrams leaves only a handful of candidates,
+which are then verified by computing the actual edit distance.
+"""
+import os
+import pickle
+import tempfile
+from array import array
+from collections import Counter
+from collections.abc import Hashable, Iterable
+from pathlib import Path
+from typing import Optional
+
+# bumped whenever the format of the index file changes
+FORMAT_VERSION = 2
+
+# the terms are padded, so that their beginnings and ends, as well as the
+# terms shorter than three characters, produce trigrams too
+_PADDING = "\x00\x00"
+
+# the dotted and dotless i are the only characters matched by re.IGNORECASE
+# that the case folding keeps apart
+_FOLD_EXCEPTIONS = str.maketrans({"\u0130": "i", "\u0131": "i"})
+
+
+def get_trigrams(
+    term: str, at_start: bool = True, at_end: bool = True
+) -> set[str]:
+    """Return the distinct trigrams of a term.
+
+    :param term: term to split, already normalized
+    :param at_start: whether to include the padded trigrams at the beginning,
+        i.e. whether the term is not a part of a longer one
+    :param at_end: whether to include the padded trigrams at the end
+    :return: trigrams
+    """
+    padded = (
+        (_PADDING if at_start else "") + term + (_PADDING if at_end else "")
+    )
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def fold(text: str) -> str:
+    """Fold the case of a text, so that the case-insensitive matches compare
+    equal.
+
+    :param text: text to fold
+    :return: case-folded text
+    """
+    return text.translate(_FOLD_EXCEPTIONS).casefold()
+
+
+def normalize(term: str) -> str:
+    """Normalize a term to be indexed or looked up.
+
+    :param term: term to normalize
+    :return: case-folded term without surrounding whitespace
+    """
+    return fold(term.strip())
+
+
+def edit_distance(first: str, second: str, max_distance: int) -> Optional[int]:
+    """Compute the Levenshtein distance between two strings, if it does not
+    exceed the given bound.
+
+    :param first: first string
+    :param second: second string
+    :param max_distance: maximum distance of interest
+    :return: the distance, or None if it is greater than max_distance
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return None
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (first_char != second_char),
+                )
+            )
+        if min(current) > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+class TrigramIndex:
+    """An index of the terms occurring in the lines of a dictionary."""
+
+    def __init__(
+        self,
+        version: Hashable,
+        terms: list[str],
+        term_lines: list[array],
+        postings: dict[str, array],
+    ) -> None:
+        """Initialize self.
+
+        :param version: version of the indexed dictionary
+        :param terms: distinct normalized terms
+        :param term_lines: numbers of the lines containing each term
+        :param postings: numbers of the terms containing each trigram
+        """
+        self.version = version
+        self.terms = terms
+        self.term_lines = term_lines
+        self.postings = postings
+
+    @classmethod
+    def build(
+        cls, version: Hashable, lines: Iterable[Iterable[str]]
+    ) -> "TrigramIndex":
+        """Index the terms of each line.
+
+        Multi-word terms are indexed both as a whole and word by word.
+
+        :param version: version of the indexed dictionary
+        :param lines: terms of each consecutive line
+        :return: the index
+        """
+        term_ids: dict[str, int] = {}
+        term_lines: list[array] = []
+        for line_number, line_terms in enumerate(lines):
+            normalized = set()
+            for term in line_terms:
+                term = normalize(term)
+                normalized.add(term)
+                words = term.split()
+                if len(words) > 1:
+                    normalized.update(words)
+            for term in normalized:
+                if not term:
+                    continue
+                term_id = term_ids.setdefault(term, len(term_ids))
+                if term_id == len(term_lines):
+                    term_lines.append(array("L"))
+                term_lines[term_id].append(line_number)
+
+        postings: dict[str, array] = {}
+        for term, term_id in term_ids.items():
+            for trigram in get_trigrams(term):
+                if trigram not in postings:
+                    postings[trigram] = array("L")
+                postings[trigram].append(term_id)
+        return cls(version, list(term_ids), term_lines, postings)
+
+    def find_terms(self, phrase: str, max_distance: int) -> dict[int, int]:
+        """Find the terms within a given edit distance of the phrase.
+
+        :param phrase: phrase to look for
+        :param max_distance: maximum number of edits
+        :return: distances of the matching terms, by the term numbers
+        """
+        phrase = normalize(phrase)
+        trigrams = get_trigrams(phrase)
+        min_shared = len(trigrams) - 3 * max_distance
+
+        candidates: Iterable[int]
+        if min_shared > 0:
+            counts: Counter[int] = Counter()
+            for trigram in trigrams:
+                counts.update(self.postings.get(trigram, ()))
+            candidates = [
+                term_id
+                for term_id, count in counts.items()
+                if count >= min_shared
+            ]
+        else:
+            # the phrase is too short for the trigrams to rule anything out
+            candidates = range(len(self.terms))
+
+        ret = {}
+        for term_id in candidates:
+            distance = edit_distance(phrase, self.terms[term_id], max_distance)
+            if distance is not None:
+                ret[term_id] = distance
+        return ret
+
+    def find_lines(self, phrase: str, max_distance: int) -> dict[int, int]:
+        """Find the lines containing a term within a given edit distance of
+        the phrase.
+
+        :param phrase: phrase to look for
+        :param max_distance: maximum number of edits
+        :return: distances of the closest terms, by the line numbers
+        """
+        ret: dict[int, int] = {}
+        for term_id, distance in self.find_terms(phrase, max_distance).items():
+            for line_number in self.term_lines[term_id]:
+                if distance < ret.get(line_number, max_distance + 1):
+                    ret[line_number] = distance
+        return ret
+
+    def find_lines_containing(self, trigrams: Iterable[str]) -> list[int]:
+        """Find the lines containing a term with all the given trigrams.
+
+        :param trigrams: trigrams to look for
+        :return: sorted numbers of the matching lines
+        """
+        term_ids: Optional[set[int]] = None
+        # the shortest posting lists first, to keep the intersection small
+        for trigram in sorted(
+            trigrams, key=lambda trigram: len(self.postings.get(trigram, ()))
+        ):
+            posting = self.postings.get(trigram, ())
+            if term_ids is None:
+                term_ids = set(posting)
+            else:
+                term_ids.intersection_update(posting)
+            if not term_ids:
+                return []
+
+        line_numbers: set[int] = set()
+        for term_id in term_ids or ():
+            line_numbers.update(self.term_lines[term_id])
+        return sorted(line_numbers)
+
+    def save(self, path: Path) -> None:
+        """Save the index to a file.
+
+        :param path: path to the file
+        """
+        data = pickle.dumps(
+            (
+                FORMAT_VERSION,
+                self.version,
+                self.terms,
+                self.term_lines,
+                self.postings,
+            ),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first, so that concurrent readers never
+        # see a partially written index
+        handle, temp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(handle, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, version: Hashable) -> Optional["TrigramIndex"]:
+        """Load the index from a file.
+
+        :param path: path to the file
+        :param version: expected version of the indexed dictionary
+        :return: the index, or None if the file does not exist or belongs to
+            a different version of the dictionary
+        """
+        try:
+            with path.open("rb") as handle:
+                (
+                    format_version,
+                    stored_version,
+                    terms,
+                    term_lines,
+                    postings,
+                ) = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None  # missing or written by an incompatible version
+        if format_version != FORMAT_VERSION or stored_version != version:
+            return None
+        return cls(version, terms, term_lines, postings)